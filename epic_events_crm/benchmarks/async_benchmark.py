@@ -0,0 +1,110 @@
+"""
+Débit des services : synchrone (threads) vs asynchrone (asyncio).
+
+N appelants concurrents (50 par défaut) enchaînent des lectures
+get_events / get_contracts (profil "listing", pages de --page-size lignes)
+avec un principal administrateur, jusqu'à --calls appels au total :
+  - sync : un thread par appelant, session partagée par thread ;
+  - async : une tâche par appelant, une AsyncSession par opération.
+
+Les deux moteurs utilisent DB_POOL_SIZE / DB_MAX_OVERFLOW : au-delà, les
+appelants attendent une connexion libre.
+
+Usage (depuis le dossier epic_events_crm) :
+    python -m benchmarks.async_benchmark [--concurrency 50] [--calls 2000]
+        [--page-size 20]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config import (DB_MAX_OVERFLOW, DB_POOL_SIZE, db_session,
+                           get_async_engine)
+from config.init_permissions import ROLE_PERMISSIONS
+from utils.principal_utils import Principal, set_current_principal
+from utils.service_utils import build_async_service, build_service
+
+
+# Opérations enchaînées par chaque appelant : (service, méthode)
+OPERATIONS = [("event", "get_events"), ("contract", "get_contracts")]
+
+
+def admin_principal() -> Principal:
+    """Principal administrateur (aucun accès au token ni à la base)"""
+    return Principal(id=0, email="benchmark", full_name="benchmark",
+                     role="admin",
+                     permissions=frozenset(ROLE_PERMISSIONS["admin"]))
+
+
+def report(label: str, calls: int, elapsed: float):
+    print(f"{label:<8} {calls:>7} appels  {elapsed:8.2f} s  "
+          f"{calls / elapsed if elapsed else 0:>9.0f} appels/s")
+
+
+def split_calls(calls: int, concurrency: int) -> list:
+    """Répartit les appels entre les appelants"""
+    share, extra = divmod(calls, concurrency)
+    return [share + (1 if i < extra else 0) for i in range(concurrency)]
+
+
+def run_sync(args) -> float:
+    services = {name: build_service(name) for name, _ in OPERATIONS}
+    principal = admin_principal()
+
+    def caller(calls: int):
+        set_current_principal(principal)
+        try:
+            for i in range(calls):
+                name, method = OPERATIONS[i % len(OPERATIONS)]
+                getattr(services[name], method)(profile="listing",
+                                                limit=args.page_size)
+        finally:
+            db_session.remove()
+
+    caller(len(OPERATIONS))  # préchauffage du pool et des mappers
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(caller,
+                          split_calls(args.calls, args.concurrency)))
+    return time.perf_counter() - start
+
+
+async def run_async(args) -> float:
+    services = {name: build_async_service(name) for name, _ in OPERATIONS}
+    # Hérité par les tâches créées ensuite (contextvars)
+    set_current_principal(admin_principal())
+
+    async def caller(calls: int):
+        for i in range(calls):
+            name, method = OPERATIONS[i % len(OPERATIONS)]
+            await getattr(services[name], method)(profile="listing",
+                                                  limit=args.page_size)
+
+    try:
+        await caller(len(OPERATIONS))
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            caller(calls)
+            for calls in split_calls(args.calls, args.concurrency)
+            ))
+        return time.perf_counter() - start
+    finally:
+        await get_async_engine().dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.concurrency} appelants, pool {DB_POOL_SIZE} "
+          f"(+{DB_MAX_OVERFLOW}) connexions")
+    report("sync", args.calls, run_sync(args))
+    report("async", args.calls, asyncio.run(run_async(args)))
+
+
+if __name__ == '__main__':
+    main()
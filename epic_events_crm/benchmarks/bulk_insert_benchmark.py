@@ -0,0 +1,115 @@
+"""
+Débit d'insertion : chemin ligne à ligne vs chemin bulk des repositories.
+
+Peuple la base configurée (DATABASE_URL) avec N clients, N contrats et
+N évènements via bulk_create_*, puis mesure create_client ligne à ligne
+sur un échantillon. Les lignes créées sont supprimées à la fin (--keep
+pour les conserver).
+
+Usage (depuis le dossier epic_events_crm) :
+    python -m benchmarks.bulk_insert_benchmark [--rows 100000]
+        [--chunk-size 1000] [--compare-rows 1000] [--keep]
+"""
+import argparse
+import time
+import uuid
+from datetime import date
+
+from config.config import session_scope
+from models.client import Client
+from models.contract import Contract
+from models.event import Event
+from repositories.client_repository import ClientRepository
+from repositories.contract_repository import ContractRepository
+from repositories.event_repository import EventRepository
+
+
+def report(label: str, rows: int, elapsed: float):
+    print(f"{label:<32} {rows:>8} lignes  {elapsed:8.2f} s  "
+          f"{rows / elapsed if elapsed else 0:>10.0f} lignes/s")
+
+
+def client_rows(marker: str, count: int, offset: int = 0):
+    for i in range(offset, offset + count):
+        yield {
+            "full_name": f"Client {i}",
+            "email": f"client{i}@{marker}.bench",
+            "phone": "0612345678",
+            "company_name": f"Entreprise {i}",
+            "contact": None,
+        }
+
+
+def cleanup(session, marker: str):
+    """Supprime les lignes créées par le benchmark"""
+    client_ids = session.query(Client.id).filter(
+        Client.email.like(f"%@{marker}.bench")).scalar_subquery()
+    session.query(Event).filter(Event.client_id.in_(client_ids)).delete(
+        synchronize_session=False)
+    session.query(Contract).filter(Contract.client_id.in_(client_ids)).delete(
+        synchronize_session=False)
+    session.query(Client).filter(Client.email.like(f"%@{marker}.bench")
+                                 ).delete(synchronize_session=False)
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--compare-rows", type=int, default=1000,
+                        help="Lignes insérées avec create_client (0 : aucun)")
+    parser.add_argument("--keep", action="store_true",
+                        help="Conserve les lignes créées")
+    args = parser.parse_args()
+
+    marker = f"b{uuid.uuid4().hex[:8]}"
+
+    with session_scope() as session:
+        client_repo = ClientRepository(session)
+        contract_repo = ContractRepository(session)
+        event_repo = EventRepository(session)
+
+        try:
+            start = time.perf_counter()
+            client_ids = client_repo.bulk_create_clients(
+                client_rows(marker, args.rows), args.chunk_size)
+            report("bulk_create_clients", len(client_ids),
+                   time.perf_counter() - start)
+
+            start = time.perf_counter()
+            contract_ids = contract_repo.bulk_create_contracts(
+                ({"client_id": client_id, "total_amount": 1000,
+                  "status": "signé", "contact": None}
+                 for client_id in client_ids), args.chunk_size)
+            report("bulk_create_contracts", len(contract_ids),
+                   time.perf_counter() - start)
+
+            start = time.perf_counter()
+            event_ids = event_repo.bulk_create_events(
+                ({"name": f"Évènement {i}", "contract_id": contract_id,
+                  "client_id": client_id, "start_date": date.today(),
+                  "end_date": date.today(), "location": "Paris",
+                  "attendees": 50, "contact": None, "user_id": None,
+                  "notes": ""}
+                 for i, (client_id, contract_id)
+                 in enumerate(zip(client_ids, contract_ids))),
+                args.chunk_size)
+            report("bulk_create_events", len(event_ids),
+                   time.perf_counter() - start)
+
+            if args.compare_rows:
+                start = time.perf_counter()
+                for row in client_rows(marker, args.compare_rows,
+                                       offset=args.rows):
+                    client_repo.create_client(**row)
+                report("create_client (ligne à ligne)", args.compare_rows,
+                       time.perf_counter() - start)
+        finally:
+            if not args.keep:
+                session.rollback()
+                cleanup(session, marker)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Lecture des listes : objets ORM (profil listing) vs DTO de projection.
+
+Peuple la base configurée (DATABASE_URL) avec N clients, N contrats et
+N évènements, puis charge la liste complète des contrats et des
+évènements par les deux chemins des repositories (get_contracts /
+get_events avec le profil listing, get_contract_listing /
+get_event_listing) en mesurant le temps et le pic mémoire (tracemalloc).
+Les champs affichés par les commandes get sont lus sur chaque ligne.
+Les lignes créées sont supprimées à la fin (--keep pour les conserver).
+
+Usage (depuis le dossier epic_events_crm) :
+    python -m benchmarks.projection_benchmark [--rows 100000]
+        [--chunk-size 1000] [--keep]
+"""
+import argparse
+import time
+import tracemalloc
+import uuid
+from datetime import date
+
+from benchmarks.bulk_insert_benchmark import cleanup, client_rows
+from config.config import session_scope
+from repositories.client_repository import ClientRepository
+from repositories.contract_repository import ContractRepository
+from repositories.event_repository import EventRepository
+
+
+def report(label: str, rows: int, elapsed: float, peak: int):
+    print(f"{label:<32} {rows:>8} lignes  {elapsed:8.2f} s  "
+          f"{peak / 1024 / 1024:8.1f} Mo (pic)")
+
+
+def measure(session, label: str, load, read):
+    """
+    Charge les lignes avec load(), lit les champs affichés avec read(ligne)
+    et affiche le temps et le pic mémoire Python de l'opération
+    """
+    session.expunge_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = load()
+    for row in rows:
+        read(row)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    report(label, len(rows), elapsed, peak)
+    session.expunge_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--keep", action="store_true",
+                        help="Conserve les lignes créées")
+    args = parser.parse_args()
+
+    marker = f"p{uuid.uuid4().hex[:8]}"
+
+    with session_scope() as session:
+        client_repo = ClientRepository(session)
+        contract_repo = ContractRepository(session)
+        event_repo = EventRepository(session)
+
+        try:
+            client_ids = client_repo.bulk_create_clients(
+                client_rows(marker, args.rows), args.chunk_size)
+            contract_ids = contract_repo.bulk_create_contracts(
+                ({"client_id": client_id, "total_amount": 1000,
+                  "status": "signé", "contact": None}
+                 for client_id in client_ids), args.chunk_size)
+            event_repo.bulk_create_events(
+                ({"name": f"Évènement {i}", "contract_id": contract_id,
+                  "client_id": client_id, "start_date": date.today(),
+                  "end_date": date.today(), "location": "Paris",
+                  "attendees": 50, "contact": None, "user_id": None,
+                  "notes": ""}
+                 for i, (client_id, contract_id)
+                 in enumerate(zip(client_ids, contract_ids))),
+                args.chunk_size)
+
+            measure(session, "get_contracts (ORM)",
+                    lambda: contract_repo.get_contracts(profile="listing"),
+                    lambda c: (c.client.full_name, c.client.email,
+                               c.remaining_amount, c.status))
+            measure(session, "get_contract_listing (DTO)",
+                    contract_repo.get_contract_listing,
+                    lambda c: (c.client_name, c.client_email,
+                               c.remaining_amount, c.status))
+            measure(session, "get_events (ORM)",
+                    lambda: event_repo.get_events(profile="listing"),
+                    lambda e: (e.contract.id, e.contract.client.full_name,
+                               e.start_date, e.location))
+            measure(session, "get_event_listing (DTO)",
+                    event_repo.get_event_listing,
+                    lambda e: (e.contract_id, e.client_name,
+                               e.start_date, e.location))
+        finally:
+            if not args.keep:
+                session.rollback()
+                cleanup(session, marker)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Mesure du temps de démarrage de la CLI, commande par commande.
+
+Chaque mesure lance un interpréteur neuf avec `-X importtime` et affiche :
+  - le temps total (horloge murale) ;
+  - le temps cumulé des imports ;
+  - les modules de premier niveau les plus coûteux.
+
+Usage (depuis le dossier epic_events_crm) :
+    python -m benchmarks.startup_benchmark [--top 10] [--runs 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+CRM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Scripts mesurés : chargement de la CLI puis résolution de la sous-commande
+COMMANDS = {
+    "cli --help": None,
+    "logout": "logout",
+    "login": "login",
+    "user": "user",
+    "client": "client",
+    "contract": "contract",
+    "event": "event",
+    "db": "db",
+}
+
+
+def build_script(command_name):
+    """Code exécuté par l'interpréteur mesuré"""
+    if command_name is None:
+        return ("import cli\n"
+                "cli.main(['--help'], standalone_mode=False)")
+    return ("import cli\n"
+            f"cli.main.get_command(None, {command_name!r})")
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Extrait (cumulé en µs, module) des modules de premier niveau
+    depuis la sortie de -X importtime
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Les modules de premier niveau ne sont pas indentés
+        if name.startswith(" ") and not name.startswith("  "):
+            modules.append((int(cumulative), name.strip()))
+    return modules
+
+
+def measure(command_name, env):
+    """Lance une mesure et retourne (durée en s, modules importés)"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         build_script(command_name)],
+        cwd=CRM_DIR, env=env, capture_output=True, text=True
+        )
+    elapsed = time.perf_counter() - start
+    return elapsed, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=10,
+                        help="Nombre de modules affichés par commande")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="Nombre de mesures par commande (meilleure)")
+    args = parser.parse_args()
+
+    # HOME temporaire : aucun token réel n'est lu ni modifié
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home)
+
+        for label, command_name in COMMANDS.items():
+            runs = [measure(command_name, env) for _ in range(args.runs)]
+            elapsed, modules = min(runs, key=lambda run: run[0])
+            total_imports = sum(cumulative for cumulative, _ in modules)
+
+            print(f"\n=== {label} : {elapsed * 1000:.1f} ms "
+                  f"(imports : {total_imports / 1000:.1f} ms)")
+            for cumulative, name in sorted(modules, reverse=True)[:args.top]:
+                print(f"   {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
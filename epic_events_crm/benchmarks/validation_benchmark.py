@@ -0,0 +1,74 @@
+"""
+Validation d'un import : contrôles ligne à ligne vs validation par colonnes.
+
+Génère N lignes (email, téléphone, date) dont une partie invalide, puis
+mesure les validateurs de utils.cli_utils appelés ligne par ligne et
+validate_columns sur les colonnes entières (pyarrow utilisé s'il est
+installé). Aucune base de données n'est nécessaire.
+
+Usage (depuis le dossier epic_events_crm) :
+    python -m benchmarks.validation_benchmark [--rows 1000000]
+        [--invalid-ratio 0.01]
+"""
+import argparse
+import random
+import time
+
+from utils.cli_utils import is_date_valid, is_email_valid, is_phone_valid
+from utils.validation_utils import arrow_module, validate_columns
+
+
+RULES = {"email": "email", "phone": "phone", "start_date": "date"}
+
+
+def report(label: str, rows: int, elapsed: float, invalid: int):
+    print(f"{label:<32} {rows:>8} lignes  {elapsed:8.2f} s  "
+          f"{invalid:>8} invalides")
+
+
+def generate_columns(rows: int, invalid_ratio: float) -> dict:
+    """Colonnes d'un import avec environ invalid_ratio lignes invalides"""
+    rng = random.Random(42)
+    columns = {"email": [], "phone": [], "start_date": []}
+    for i in range(rows):
+        invalid = rng.random() < invalid_ratio
+        columns["email"].append(f"client{i}@example.fr" if not invalid
+                                else f"client{i}.example.fr")
+        columns["phone"].append(f"06 {i % 100:02d} 34 56 78")
+        columns["start_date"].append(
+            f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+    return columns
+
+
+def validate_row_by_row(columns: dict) -> int:
+    """Validateurs de cli_utils appelés pour chaque ligne"""
+    invalid = 0
+    for email, phone, start_date in zip(columns["email"], columns["phone"],
+                                        columns["start_date"]):
+        if not (is_email_valid(email) and is_phone_valid(phone)
+                and is_date_valid(start_date)):
+            invalid += 1
+    return invalid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    args = parser.parse_args()
+
+    columns = generate_columns(args.rows, args.invalid_ratio)
+    print(f"pyarrow : {'oui' if arrow_module() else 'non'}")
+
+    start = time.perf_counter()
+    invalid = validate_row_by_row(columns)
+    report("ligne à ligne", args.rows, time.perf_counter() - start, invalid)
+
+    start = time.perf_counter()
+    _, errors = validate_columns(columns, RULES)
+    report("validate_columns", args.rows, time.perf_counter() - start,
+           len(errors))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,32 +1,87 @@
 import click
+import sys
 
-from config.config import SessionLocal
-from repositories.user_repository import UserRepository
-from services.user_service import UserService
-from utils.auth_utils import set_token, get_token, clear_token, set_password
-from utils.jwt_utils import get_current_user
+from config import sentry as sentry_config  # noqa: F401
+from utils.auth_utils import (PROFILE_ENV, set_token, get_token, clear_token,
+                              set_password, use_profile)
+from utils.cli_utils import LazyGroup
+from utils.principal_utils import clear_current_principal
 
-from commands.user_command import user_group
-from commands.client_command import client_group
-from commands.contract_command import contract_group
-from commands.event_command import event_group
 
+# Sous-commandes importées uniquement lorsqu'elles sont invoquées
+LAZY_COMMANDS = {
+    "user": "commands.user_command:user_group",
+    "client": "commands.client_command:client_group",
+    "contract": "commands.contract_command:contract_group",
+    "event": "commands.event_command:event_group",
+    "report": "commands.report_command:report_group",
+    "search": "commands.search_command:search",
+    "data": "commands.data_command:data_group",
+    "db": "commands.db_command:db_group",
+}
 
-db_session = SessionLocal()
+# Commandes accessibles sans authentification
+PUBLIC_COMMANDS = ["login", "logout", "admin", "sentry", "db", "serve",
+                   "calibrate"]
 
-# Création des objets services
-user_repo = UserRepository(db_session)
-user_service = UserService(user_repo)
+
+def get_user_service():
+    """Service utilisateur : démon s'il est démarré, local sinon"""
+    from utils.service_utils import get_service
+
+    return get_service("user")
+
+
+def close_session():
+    """Ferme la session partagée si la base de données a été utilisée"""
+    config = sys.modules.get("config.config")
+    if config is not None:
+        config.db_session.remove()
+    daemon = sys.modules.get("utils.daemon_utils")
+    if daemon is not None:
+        daemon.close_daemon_client()
+
+
+def select_profile(ctx, param, value):
+    """
+    Sélectionne le profil de connexion dès l'analyse des options : avant
+    l'import de la sous-commande et la connexion au démon
+    """
+    try:
+        use_profile(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    return value
 
 
 # Regroupement de toutes les commandes
-@click.group()
+@click.group(cls=LazyGroup, lazy_commands=LAZY_COMMANDS)
+@click.option("--profile", envvar=PROFILE_ENV, default=None, is_eager=True,
+              expose_value=False, callback=select_profile,
+              help="Profil de connexion (un token par profil)")
 @click.pass_context
 def main(ctx):
     """Vérification du token avant chaque commande excepté login/logout"""
-    if ctx.invoked_subcommand not in ["login", "logout", "admin", "sentry"]:
-        token = get_token()
-        user = get_current_user(token, user_repo)
+    # Ferme la session partagée à la fin de l'invocation
+    ctx.call_on_close(close_session)
+    if ctx.invoked_subcommand not in PUBLIC_COMMANDS:
+        if not get_token():
+            click.echo("❌ Erreur : Authentification requise")
+            raise click.Abort()
+        from utils.daemon_utils import get_daemon_client
+
+        client = get_daemon_client()
+        if client:
+            # Principal résolu (et mis en cache) par le démon
+            user = client.request("whoami")
+        else:
+            from config.config import db_session
+            from repositories.user_repository import UserRepository
+            from utils.permission_utils import resolve_principal
+
+            # Résout l'utilisateur (claims du token ou base de données) et
+            # fige ses permissions pour tous les appels de service suivants
+            user = resolve_principal(UserRepository(db_session))
         if isinstance(user, dict) and "error" in user:
             click.echo(f"❌ Erreur : {user['error']}")
             raise click.Abort()
@@ -45,13 +100,14 @@ def login(email, password):
     """Authentifie l'utilisateur et génère un token JWT."""
 
     email = email.strip().lower()
-    token = user_service.authenticate(email=email, password=password)
+    token = get_user_service().authenticate(email=email, password=password)
 
     if isinstance(token, dict) and "error" in token:
         click.echo(f"❌ Erreur : {token['error']}")
         raise click.Abort()
 
     clear_token()
+    clear_current_principal()
     set_token(token)
 
     click.echo("✅ Authentification réussie.")
@@ -59,14 +115,17 @@ def login(email, password):
 
 @main.command()
 def logout():
-    result = user_service.logout()
-    click.echo("✅"+result["message"] if "message" in result
-               else result["error"])
+    # Aucun accès à la base : suppression du token uniquement
+    clear_token()
+    clear_current_principal()
+    click.echo("✅Utilisateur déconnecté")
 
 
 @main.command()
 def admin():
+    from config.config import db_session
     from models.user import User
+    from repositories.user_repository import UserRepository
 
     full_name = "admin"
     email = "admin"
@@ -80,7 +139,7 @@ def admin():
         return
 
     # Création de l'admin en base
-    admin_user = user_repo.create_user(
+    admin_user = UserRepository(db_session).create_user(
         full_name=full_name,
         email=email,
         hashed_password=set_password(password),
@@ -90,17 +149,67 @@ def admin():
     click.echo(f"✅ Création de {admin_user.full_name} réussie.")
 
 
+@main.command()
+@click.option('--socket', 'socket_path', default=None,
+              help="Chemin de la socket Unix du démon")
+def serve(socket_path):
+    """Démarre le démon CRM (socket Unix locale) utilisé par la CLI."""
+    from utils.daemon_server import serve as serve_daemon
+    from utils.daemon_utils import SOCKET_PATH
+
+    path = socket_path or SOCKET_PATH
+    click.echo(f"ℹ️ Démarrage du démon CRM sur {path} (Ctrl+C pour arrêter)")
+    try:
+        serve_daemon(path)
+    except RuntimeError as e:
+        click.echo(f"❌ Erreur : {e}")
+    except KeyboardInterrupt:
+        click.echo("\nℹ️ Démon arrêté.")
+
+
+@main.command()
+@click.option('--target-ms', type=float, default=250, show_default=True,
+              help="Durée cible d'un hachage (ms)")
+@click.option('--max-memory', type=int, default=65536, show_default=True,
+              help="Mémoire maximale par hachage (KiB)")
+@click.option('--parallelism', type=int, default=None,
+              help="Voies Argon2 (profil actuel par défaut)")
+@click.option('--dry-run', is_flag=True, default=False,
+              help="Affiche le profil sans l'écrire dans le fichier .env")
+def calibrate(target_ms, max_memory, parallelism, dry_run):
+    """Calibre le coût Argon2 sur cette machine et l'écrit dans .env."""
+    from dotenv import find_dotenv, set_key
+    from config.config import ARGON2_PARALLELISM
+    from utils.auth_utils import calibrate_password_hasher
+
+    click.echo(f"ℹ️ Calibration Argon2id (cible {target_ms:.0f} ms)...")
+    profile = calibrate_password_hasher(target_ms, max_memory,
+                                        parallelism or ARGON2_PARALLELISM)
+    click.echo(f"   time_cost={profile['time_cost']} "
+               f"memory_cost={profile['memory_cost']} KiB "
+               f"parallelism={profile['parallelism']} : "
+               f"{profile['elapsed_ms']:.0f} ms")
+    if profile["elapsed_ms"] > target_ms:
+        click.echo("⚠️ Cible inatteignable : profil minimal retenu.")
+    if dry_run:
+        return
+
+    env_file = find_dotenv(usecwd=True)
+    if not env_file:
+        env_file = ".env"
+        open(env_file, "a").close()
+    for name in ("time_cost", "memory_cost", "parallelism"):
+        set_key(env_file, f"ARGON2_{name.upper()}", str(profile[name]),
+                quote_mode="never")
+    click.echo(f"✅ Profil écrit dans {env_file}. Les mots de passe existants "
+               "seront rehachés à la prochaine connexion.")
+
+
 @main.command()
 def sentry():
     division_by_zero = 1 / 0
     print(division_by_zero)
 
 
-# Ajout de sous-commandes sous chaque groupe
-main.add_command(user_group)
-main.add_command(client_group)
-main.add_command(contract_group)
-main.add_command(event_group)
-
 if __name__ == '__main__':
     main()
@@ -1,17 +1,21 @@
 import click
 
-from config.config import SessionLocal
-from services.client_service import ClientService
-from repositories.client_repository import ClientRepository
-from commands.user_command import user_service, user_repo
+from commands.user_command import user_service
+from utils.batch_utils import batch_options, chunk_size_option, run_batch
 from utils.cli_utils import is_email_valid, is_phone_valid
+from utils.render_utils import (format_options, object_rows, parse_fields,
+                                render)
+from utils.service_utils import get_service
 
 
-db_session = SessionLocal()
+# Services (démon s'il est démarré, sinon locaux)
+client_service = get_service("client")
 
-# Création des objets services
-client_repo = ClientRepository(db_session)
-client_service = ClientService(client_repo, user_repo)
+# Formats vérifiés par colonnes à l'import (mode batch)
+CLIENT_COLUMN_RULES = {"email": "email", "phone": "phone"}
+# Colonnes du rendu --format
+CLIENT_FIELDS = ["id", "full_name", "email", "phone", "company_name",
+                 "contact", "creation_date", "last_update_date"]
 
 
 @click.group(name='client')
@@ -20,12 +24,77 @@ def client_group():
     pass
 
 
+def validate_client_row(row: dict, default_contact: str = None) -> dict:
+    """
+    Valide une ligne d'import de client (mode batch)
+    Email et téléphone : vérifiés par colonnes (CLIENT_COLUMN_RULES)
+    """
+    full_name = (row.get("full_name") or "").strip()
+    if not full_name:
+        raise ValueError("Nom complet manquant")
+    return {
+        "full_name": full_name,
+        "email": (row.get("email") or "").strip().lower(),
+        "phone": (row.get("phone") or "").strip(),
+        "company_name": (row.get("company_name") or "").strip(),
+        "contact": (row.get("contact") or "").strip() or default_contact,
+    }
+
+
+def validate_client_update_row(row: dict) -> dict:
+    """
+    Valide une ligne de mise à jour de client (mode batch)
+    email : email actuel du client, new_email : nouvel email éventuel
+    """
+    current_email = (row.get("email") or "").strip().lower()
+    if not current_email:
+        raise ValueError("Email du client manquant")
+    email = (row.get("new_email") or "").strip().lower() or None
+    if email and not is_email_valid(email):
+        raise ValueError(f"L'email '{email}' est invalide")
+    phone = (row.get("phone") or "").strip() or None
+    if phone and not is_phone_valid(phone):
+        raise ValueError(f"Le numéro '{phone}' est invalide")
+    return {
+        "current_email": current_email,
+        "full_name": (row.get("full_name") or "").strip() or None,
+        "email": email,
+        "phone": phone,
+        "company_name": (row.get("company_name") or "").strip() or None,
+        "contact": (row.get("contact") or "").strip() or None,
+    }
+
+
 # Commande pour créer un client
 @client_group.command()
+@batch_options
+@chunk_size_option
+@click.option("--copy", "use_copy", is_flag=True, default=False,
+              help="Chargement rapide en un flux COPY (avec --from-file)")
+@click.option("--update-existing", is_flag=True, default=False,
+              help="Met à jour les clients dont l'email existe déjà et "
+                   "dont vous êtes responsable (avec --copy)")
 @click.pass_context
-def create(ctx):
+def create(ctx, from_file, file_format, chunk_size, use_copy,
+           update_existing):
     """Crée un nouveau client dans le CRM."""
 
+    # Mode batch : import depuis un fichier CSV / JSON Lines
+    if from_file:
+        # --copy : un flux COPY et une requête d'upsert pour tout le fichier
+        if use_copy:
+            def process(rows):
+                return client_service.import_clients(rows, update_existing)
+        else:
+            def process(rows):
+                return client_service.create_clients(rows, chunk_size)
+        run_batch(
+            from_file, file_format,
+            lambda row: validate_client_row(row, ctx.obj.full_name),
+            process, "client(s)", CLIENT_COLUMN_RULES
+            )
+        return
+
     # Demande le nom complet
     full_name = click.prompt("Nom complet du client")
 
@@ -93,7 +162,12 @@ def create(ctx):
 # Commande pour récupérer un client
 @client_group.command()
 @click.argument('identifier', nargs=-1, required=False)
-def get(identifier):
+@click.option("--limit", type=int, default=None,
+              help="Nombre maximum de clients affichés")
+@click.option("--after", "after_id", type=int, default=None,
+              help="ID du dernier résultat de la page précédente")
+@format_options
+def get(identifier, limit, after_id, output_format, fields):
     """Récupère un client par ID, email ou nom complet."""
 
     if identifier:
@@ -111,13 +185,29 @@ def get(identifier):
     elif "@" in identifier:
         found_client = client_service.get_client_by_email(identifier.lower())
     else:
-        found_client = client_service.get_client_by_name(identifier)
+        found_client = client_service.get_client_by_name(
+            identifier, after_id=after_id, limit=limit
+            )
 
     # Gestion des erreurs
     if isinstance(found_client, dict) and "error" in found_client:
         click.echo(f"❌ Erreur : {found_client['error']}")
         return
 
+    # Rendu structuré des clients trouvés
+    if output_format:
+        fields = parse_fields(fields) or CLIENT_FIELDS
+        unknown = set(fields) - set(CLIENT_FIELDS)
+        if unknown:
+            click.echo(f"❌ Erreur : Champ(s) inconnu(s) : "
+                       f"{', '.join(sorted(unknown))}", err=True)
+            return
+        if found_client and not isinstance(found_client, list):
+            found_client = [found_client]
+        render(object_rows(found_client or [], fields), fields,
+               output_format)
+        return
+
     # Si le client n'est pas trouvé
     if not found_client:
         click.echo("❌ Aucun client trouvé.")
@@ -146,11 +236,20 @@ def get(identifier):
 
 # Commande pour mettre à jour un client via son email
 @client_group.command()
-@click.option('--email', prompt="Email du client à modifier",
-              help="Email du client.")
-def update(email):
+@click.option('--email', default=None, help="Email du client.")
+@batch_options
+def update(email, from_file, file_format):
     """Met à jour les informations d'un client via son email."""
 
+    # Mode batch : mises à jour depuis un fichier CSV / JSON Lines
+    if from_file:
+        run_batch(from_file, file_format, validate_client_update_row,
+                  client_service.update_clients, "client(s)")
+        return
+
+    if email is None:
+        email = click.prompt("Email du client à modifier")
+
     # Récupère le client existant
     client = client_service.get_client_by_email(email.lower())
 
@@ -1,15 +1,17 @@
 import click
-from config.config import SessionLocal
-from services.contract_service import ContractService
-from repositories.contract_repository import ContractRepository
+import uuid
 from commands.client_command import client_service
-from commands.user_command import user_service, user_repo
+from commands.user_command import user_service
+from utils.batch_utils import batch_options, chunk_size_option, run_batch
 from utils.cli_utils import is_email_valid
+from utils.render_utils import format_options, parse_fields, render
+from utils.service_utils import get_service
 
 
-db_session = SessionLocal()
-contract_repo = ContractRepository(db_session)
-contract_service = ContractService(contract_repo, user_repo)
+contract_service = get_service("contract")
+
+# Formats vérifiés par colonnes à l'import (mode batch)
+CONTRACT_COLUMN_RULES = {"client_email": "email"}
 
 
 @click.group(name='contract')
@@ -18,11 +20,73 @@ def contract_group():
     pass
 
 
+def parse_amount(value, label: str):
+    """Convertit un montant d'une ligne d'import, None si absent"""
+    if value in (None, ""):
+        return None
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} invalide : {value}")
+    if amount <= 0:
+        raise ValueError(f"{label} doit être un nombre positif")
+    return amount
+
+
+def validate_contract_row(row: dict) -> dict:
+    """
+    Valide une ligne d'import de contrat (mode batch)
+    Email du client : vérifié par colonnes (CONTRACT_COLUMN_RULES)
+    """
+    client_email = (row.get("client_email") or "").strip().lower()
+    total_amount = parse_amount(row.get("total_amount"),
+                                "Le montant du contrat")
+    if total_amount is None:
+        raise ValueError("Montant du contrat manquant")
+    return {
+        "client_email": client_email,
+        "total_amount": total_amount,
+        "status": (row.get("status") or "Non Signé").strip().lower(),
+    }
+
+
+def validate_contract_update_row(row: dict) -> dict:
+    """Valide une ligne de mise à jour de contrat (mode batch)"""
+    contract_id = (row.get("contract_id") or "").strip()
+    try:
+        contract_id = str(uuid.UUID(contract_id))
+    except ValueError:
+        raise ValueError(f"ID du contrat invalide : {contract_id}")
+    contact = (row.get("contact") or "").strip().lower() or None
+    if contact and not is_email_valid(contact):
+        raise ValueError(f"L'email '{contact}' est invalide")
+    return {
+        "contract_id": contract_id,
+        "contact": contact,
+        "total_amount": parse_amount(row.get("total_amount"),
+                                     "Le montant du contrat"),
+        "paid_amount": parse_amount(row.get("paid_amount"),
+                                    "Le montant du paiement"),
+        "status": (row.get("status") or "").strip().lower() or None,
+    }
+
+
 # Commande pour créer un contrat
 @contract_group.command()
-def create():
+@batch_options
+@chunk_size_option
+def create(from_file, file_format, chunk_size):
     """Crée un nouveau contrat dans le CRM."""
 
+    # Mode batch : import depuis un fichier CSV / JSON Lines
+    if from_file:
+        run_batch(
+            from_file, file_format, validate_contract_row,
+            lambda rows: contract_service.create_contracts(rows, chunk_size),
+            "contrat(s)", CONTRACT_COLUMN_RULES
+            )
+        return
+
     # Demande l'email du client
     while True:
         client_email = click.prompt("Email du client").lower()
@@ -99,22 +163,26 @@ def create():
                                              "remaining_amount",
                                              "status"
                                              ]))
-def get(option):
+@click.option("--limit", type=int, default=None,
+              help="Nombre maximum de contrats affichés")
+@click.option("--after", "after_id", default=None,
+              help="UUID du dernier contrat de la page précédente")
+@format_options
+def get(option, limit, after_id, output_format, fields):
     """Récupère les contrats liés à un utilisateur, un client, un statut..."""
 
-    contracts = None
+    filters = {}
 
-    if option == "all":
-        contracts = contract_service.get_contracts()
-
-    elif option == "id":
-        contract_id = click.prompt("ID du contrat")
-        contracts = contract_service.get_contracts(contract_id=contract_id)
+    if option == "id":
+        filters["contract_id"] = click.prompt("ID du contrat")
 
     elif option == "user":
         user_email = click.prompt("Email de l'utilisateur").lower()
         user = user_service.get_user_by_email(user_email)
-        contracts = contract_service.get_contracts(user_id=user.id)
+        if isinstance(user, dict) and "error" in user:
+            click.echo(f"❌ Erreur : {user['error']}")
+            return
+        filters["user_id"] = user.id
 
     elif option == "client":
         while True:
@@ -126,51 +194,85 @@ def get(option):
 
         client = client_service.get_client_by_email(client_email)
 
-        if not client:
+        if not client or (isinstance(client, dict) and "error" in client):
             click.echo("❌ Erreur : Aucun client trouvé avec l'email "
                        f"{client_email}")
             return
 
-        contracts = contract_service.get_contracts(client_id=client.id)
+        filters["client_id"] = client.id
 
     elif option == "status":
-        status = click.prompt("Statut des contrats à rechercher").lower()
-        contracts = contract_service.get_contracts(status=status)
+        filters["status"] = click.prompt(
+            "Statut des contrats à rechercher").lower()
 
     elif option == "remaining_amount":
-        contracts = contract_service.get_contracts(remaining_amount=True)
+        filters["remaining_amount"] = True
+
+    # Rendu structuré : colonnes demandées uniquement, sans objets ORM
+    if output_format:
+        result = contract_service.get_contract_rows(
+            parse_fields(fields), after_id, limit, **filters)
+        if isinstance(result, dict) and "error" in result:
+            click.echo(f"❌ Erreur : {result['error']}", err=True)
+            return
+        render(result["rows"], result["fields"], output_format)
+        return
+
+    # Lecture en streaming de DTO (projection, sans objets ORM)
+    contracts = contract_service.get_contract_listing(**filters,
+                                                      after_id=after_id,
+                                                      limit=limit,
+                                                      stream=True)
 
     # Vérification et affichage des contrats
-    if not contracts:
-        click.echo("❌ Aucun contrat trouvé.")
-    elif isinstance(contracts, dict) and "error" in contracts:
+    if isinstance(contracts, dict) and "error" in contracts:
         click.echo(f"❌ {contracts['error']}")
-    else:
-        for contract in contracts:
-            click.echo(f"📄 UUID : {contract.id}\n"
-                       f"\nInformations client :\n"
-                       f"   Nom : {contract.client.full_name}\n"
-                       f"   Email : {contract.client.email}\n"
-                       f"   Téléphone : {contract.client.phone}\n"
-                       f"   Entreprise : {contract.client.company_name}\n"
-                       f"\nContact : {contract.contact}\n"
-                       f"Montant total : {contract.total_amount}\n"
-                       f"Montant payé : {contract.paid_amount}\n"
-                       f"Montant restant dû : {contract.remaining_amount}\n"
-                       f"Date de création : {contract.creation_date}\n"
-                       f"Statut : {contract.status}\n"
-                       )
+        return
+
+    count = 0
+    last_id = None
+    for contract in contracts:
+        count += 1
+        last_id = contract.id
+        click.echo(f"📄 UUID : {contract.id}\n"
+                   f"\nInformations client :\n"
+                   f"   Nom : {contract.client_name}\n"
+                   f"   Email : {contract.client_email}\n"
+                   f"   Téléphone : {contract.client_phone}\n"
+                   f"   Entreprise : {contract.company_name}\n"
+                   f"\nContact : {contract.contact}\n"
+                   f"Montant total : {contract.total_amount}\n"
+                   f"Montant payé : {contract.paid_amount}\n"
+                   f"Montant restant dû : {contract.remaining_amount}\n"
+                   f"Date de création : {contract.creation_date}\n"
+                   f"Statut : {contract.status}\n"
+                   )
+
+    if not count:
+        click.echo("❌ Aucun contrat trouvé.")
+    elif limit and count == limit:
+        click.echo(f"ℹ️ Page suivante : --after {last_id}")
 
 
 # Commande pour mettre à jour un contrat
 @contract_group.command()
-@click.option('--contract_id', prompt="ID du contrat",
+@click.option('--contract_id', default=None,
               help="ID du contrat à actualiser")
-def update(contract_id):
+@batch_options
+def update(contract_id, from_file, file_format):
     """Met à jour les informations d'un contrat."""
 
+    # Mode batch : mises à jour depuis un fichier CSV / JSON Lines
+    if from_file:
+        run_batch(from_file, file_format, validate_contract_update_row,
+                  contract_service.update_contracts, "contrat(s)")
+        return
+
+    if contract_id is None:
+        contract_id = click.prompt("ID du contrat")
+
     # Récupère le contrat existant
-    contract = contract_service.get_contracts(contract_id)
+    contract = contract_service.get_contracts(contract_id, profile="listing")
     if contract is None:
         click.echo("❌ Erreur : Contrat introuvable.")
         return
@@ -231,73 +333,98 @@ def update(contract_id):
                )
 
 
-# Commande pour mettre à jour un contrat
+# Commande pour enregistrer un paiement
 @contract_group.command()
 @click.option('--contract_id', prompt="ID du contrat",
               help="ID cu contrat à actualiser")
-def payment(contract_id):
+@click.option('--amount', type=float, default=None,
+              help="Montant du paiement (sans confirmation)")
+def payment(contract_id, amount):
     """Met à jour le contrat en fonction du paiement"""
 
-    # Récupère le contrat existant
-    contract = contract_service.get_contracts(contract_id)
-    if contract is None:
-        click.echo("❌ Erreur : Contrat introuvable.")
-        return
-
-    contract = contract[0]
-
-    click.echo("\n📄 Contrat trouvé :"
-               f"UUID : {contract.id}\n"
-               f"\nInformations client :\n"
-               f"   Nom : {contract.client.full_name}\n"
-               f"   Email : {contract.client.email}\n"
-               f"   Téléphone : {contract.client.phone}\n"
-               f"   Entreprise : {contract.client.company_name}\n"
-               f"\nContact : {contract.contact}\n"
-               f"Montant total : {contract.total_amount}\n"
-               f"Montant payé : {contract.paid_amount}\n"
-               f"Montant restant dû : {contract.remaining_amount}\n"
-               f"Date de création : {contract.creation_date}\n"
-               f"Statut : {contract.status}\n"
-               )
+    if amount is None:
+        # Récupère le contrat existant
+        contract = contract_service.get_contracts(contract_id,
+                                                  profile="listing")
+        if isinstance(contract, dict) and "error" in contract:
+            click.echo(f"❌ Erreur : {contract['error']}")
+            return
 
-    # Demande le montant total du paiment
-    amount = click.prompt("Montant du paiement (< ou = 0 : annulation)",
-                          show_default=True, type=float)
+        contract = contract[0]
+
+        click.echo("\n📄 Contrat trouvé :"
+                   f"UUID : {contract.id}\n"
+                   f"\nInformations client :\n"
+                   f"   Nom : {contract.client.full_name}\n"
+                   f"   Email : {contract.client.email}\n"
+                   f"   Téléphone : {contract.client.phone}\n"
+                   f"   Entreprise : {contract.client.company_name}\n"
+                   f"\nContact : {contract.contact}\n"
+                   f"Montant total : {contract.total_amount}\n"
+                   f"Montant payé : {contract.paid_amount}\n"
+                   f"Montant restant dû : {contract.remaining_amount}\n"
+                   f"Date de création : {contract.creation_date}\n"
+                   f"Statut : {contract.status}\n"
+                   )
+
+        # Demande le montant total du paiment
+        amount = click.prompt("Montant du paiement (< ou = 0 : annulation)",
+                              show_default=True, type=float)
 
     if amount <= 0:
         click.echo("ℹ️ Opération annulée.")
         return
 
-    # Mettre à jour le contrat
-    updated_contract = contract_service.update_contract(
-        contract_id=contract_id,
-        paid_amount=amount
-        )
+    # Paiement atomique (UPDATE ... RETURNING) et ajout au registre
+    updated_contract = contract_service.record_payment(contract_id, amount)
+    if isinstance(updated_contract, dict) and "error" in updated_contract:
+        click.echo(f"❌ Erreur : {updated_contract['error']}")
+        return
 
-    click.echo("✅ Contrat mis à jour avec succès :\n"
+    click.echo("✅ Paiement enregistré :\n"
                f"UUID : {updated_contract.id}\n"
-               f"\nInformations client :\n"
-               f"   Nom : {updated_contract.client.full_name}\n"
-               f"   Email : {updated_contract.client.email}\n"
-               f"   Téléphone : {updated_contract.client.phone}\n"
-               f"   Entreprise : {updated_contract.client.company_name}\n"
-               f"\nContact : {updated_contract.contact}\n"
+               f"Montant du paiement : {amount}\n"
                f"Montant total : {updated_contract.total_amount}\n"
                f"Montant payé : {updated_contract.paid_amount}\n"
                f"Montant restant dû : {updated_contract.remaining_amount}\n"
-               f"Date de création : {updated_contract.creation_date}\n"
                f"Statut : {updated_contract.status}\n"
                )
 
 
+# Commande pour afficher l'historique des paiements
+@contract_group.command()
+@click.option('--contract_id', prompt="ID du contrat",
+              help="ID du contrat")
+@click.option("--limit", type=int, default=None,
+              help="Nombre maximum de paiements affichés")
+@click.option("--after", "after_id", type=int, default=None,
+              help="Affiche les paiements après cet ID (pagination)")
+def payments(contract_id, limit, after_id):
+    """Affiche le registre des paiements d'un contrat."""
+
+    ledger = contract_service.get_payments(contract_id, after_id, limit)
+    if isinstance(ledger, dict) and "error" in ledger:
+        click.echo(f"❌ Erreur : {ledger['error']}")
+        return
+    if not ledger:
+        click.echo("ℹ️ Aucun paiement enregistré.")
+        return
+
+    for entry in ledger:
+        click.echo(f"#{entry.id}  {entry.paid_at:%Y-%m-%d %H:%M}  "
+                   f"{entry.amount}")
+    if limit and len(ledger) == limit:
+        click.echo(f"ℹ️ Page suivante : --after {ledger[-1].id}")
+
+
 # Commande pour supprimer un contrat
 @contract_group.command()
 @click.option('--contract_id', prompt="ID du contrat")
 def delete(contract_id):
     """Supprime un contrat par son UUID."""
 
-    contract_to_delete = contract_service.get_contracts(contract_id)[0]
+    contract_to_delete = contract_service.get_contracts(contract_id,
+                                                        profile="listing")[0]
 
     # Demande confirmation avant suppression
     confirm = click.confirm("\n❗ Êtes-vous sûr de vouloir supprimer le contrat"
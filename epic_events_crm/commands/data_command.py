@@ -0,0 +1,71 @@
+import click
+import time
+
+from utils.copy_utils import DATASET_FORMATS, EXPORT_CHUNK_SIZE
+from utils.service_utils import get_service
+
+
+dataset_service = get_service("dataset")
+
+
+@click.group(name='data')
+def data_group():
+    """Export et import de toutes les données du CRM."""
+    pass
+
+
+def dataset_options(func):
+    """Options communes de l'export et de l'import du jeu de données"""
+    func = click.option("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE,
+                        show_default=True,
+                        help="Lignes par lot (format Parquet)")(func)
+    func = click.option("--format", "file_format",
+                        type=click.Choice(DATASET_FORMATS), default="csv",
+                        show_default=True,
+                        help="Format des fichiers (un par table)")(func)
+    return func
+
+
+def echo_counts(counts, elapsed: float, action: str):
+    """Affiche l'erreur ou le nombre de lignes de chaque table"""
+    if isinstance(counts, dict) and "error" in counts:
+        click.echo(f"❌ Erreur : {counts['error']}")
+        return
+    for table, count in counts.items():
+        click.echo(f"   {table} : {count} ligne(s)")
+    click.echo(f"✅ {sum(counts.values())} ligne(s) {action} en "
+               f"{elapsed:.1f} s.")
+
+
+# Commande pour exporter toutes les données du CRM
+# Chemins absolus : l'opération peut être exécutée par le démon
+@data_group.command()
+@click.argument("directory",
+                type=click.Path(file_okay=False, resolve_path=True))
+@dataset_options
+def export(directory, file_format, chunk_size):
+    """Exporte toutes les tables du CRM (CSV ou Parquet) dans DIRECTORY."""
+
+    start = time.perf_counter()
+    counts = dataset_service.export_dataset(directory, file_format,
+                                            chunk_size)
+    echo_counts(counts, time.perf_counter() - start, "exportée(s)")
+
+
+# Commande pour remplacer les données du CRM par un export
+@data_group.command(name="import")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False,
+                                             resolve_path=True))
+@dataset_options
+@click.option("--yes", is_flag=True, default=False,
+              help="Ne demande pas de confirmation")
+def import_command(directory, file_format, chunk_size, yes):
+    """Remplace toutes les données du CRM par l'export de DIRECTORY."""
+
+    if not yes:
+        click.confirm("⚠️ Les données actuelles seront supprimées. "
+                      "Continuer ?", abort=True)
+    start = time.perf_counter()
+    counts = dataset_service.import_dataset(directory, file_format,
+                                            chunk_size)
+    echo_counts(counts, time.perf_counter() - start, "importée(s)")
@@ -0,0 +1,108 @@
+import click
+import uuid
+from datetime import date, timedelta
+
+from config.config import db_session, get_engine
+from config.migrations import migrate, get_applied_versions, MIGRATIONS
+from models.contract import Contract
+from models.event import Event
+from repositories.contract_repository import ContractRepository
+from repositories.event_repository import EventRepository
+
+
+contract_repo = ContractRepository(db_session)
+event_repo = EventRepository(db_session)
+
+
+@click.group(name='db')
+def db_group():
+    """Groupe de commandes pour gérer le schéma de la base de données."""
+    pass
+
+
+# Commande pour appliquer les migrations en attente
+@db_group.command(name='migrate')
+@click.option('--target', type=int, default=None,
+              help="Version maximale à appliquer")
+def migrate_command(target):
+    """Applique les migrations du schéma en attente."""
+
+    applied = migrate(get_engine(), target)
+    if not applied:
+        click.echo("ℹ️ Schéma à jour, aucune migration appliquée.")
+        return
+    for version in applied:
+        click.echo(f"✅ Migration {version:04d} appliquée.")
+
+
+# Commande pour afficher l'état des migrations
+@db_group.command()
+def status():
+    """Affiche les migrations appliquées et en attente."""
+
+    applied = get_applied_versions(get_engine())
+    for version, name, _ in MIGRATIONS:
+        state = "✅" if version in applied else "⏳"
+        click.echo(f"{state} {version:04d}_{name}")
+
+
+def repository_queries():
+    """Requêtes des repositories avec des valeurs d'exemple"""
+    sample_uuid = str(uuid.uuid4())
+    today = date.today()
+    return [
+        ("event contract_id",
+         event_repo.build_query(contract_id=sample_uuid), Event.id),
+        ("event client_id",
+         event_repo.build_query(client_id=1), Event.id),
+        ("event user_id",
+         event_repo.build_query(user_id=1), Event.id),
+        ("event start_date",
+         event_repo.build_query(start_date=today), Event.id),
+        ("event end_date",
+         event_repo.build_query(end_date=today), Event.id),
+        ("event start_from / start_to",
+         event_repo.build_query(start_from=today,
+                                start_to=today + timedelta(days=30)),
+         Event.id),
+        ("event overlaps",
+         event_repo.build_query(overlaps=(today,
+                                          today + timedelta(days=30))),
+         Event.id),
+        ("event calendar",
+         event_repo.build_query(start_from=today), Event.start_date),
+        ("contract user_id",
+         contract_repo.build_query(user_id=1), Contract.id),
+        ("contract client_id",
+         contract_repo.build_query(client_id=1), Contract.id),
+        ("contract status",
+         contract_repo.build_query(status="signé"), Contract.id),
+        ("contract remaining_amount",
+         contract_repo.build_query(remaining_amount=True), Contract.id),
+    ]
+
+
+# Commande pour vérifier l'utilisation des index
+@db_group.command()
+@click.option('--analyze', is_flag=True, default=False,
+              help="Exécute réellement les requêtes (EXPLAIN ANALYZE)")
+def explain(analyze):
+    """Affiche le plan d'exécution de chaque requête des repositories."""
+
+    prefix = "EXPLAIN ANALYZE " if analyze else "EXPLAIN "
+    connection = db_session.connection()
+
+    for label, query, key_column in repository_queries():
+        # Même tri que la pagination des listes
+        statement = query.order_by(key_column).statement
+        compiled = statement.compile(dialect=get_engine().dialect)
+        plan = [row[0] for row in connection.exec_driver_sql(
+            prefix + str(compiled), compiled.params
+            )]
+        uses_index = any("Index" in line for line in plan)
+
+        click.echo(f"\n{'✅' if uses_index else '❌'} {label}")
+        for line in plan:
+            click.echo(f"   {line}")
+
+    db_session.rollback()
@@ -1,18 +1,22 @@
 import click
-from datetime import datetime
+import functools
+import itertools
+import uuid
+from datetime import date, datetime, timedelta
 
-from config.config import SessionLocal
-from services.event_service import EventService
-from repositories.event_repository import EventRepository
 from commands.client_command import client_service
-from commands.user_command import user_service, user_repo
+from commands.user_command import user_service
 from commands.contract_command import contract_service
+from utils.batch_utils import batch_options, chunk_size_option, run_batch
 from utils.cli_utils import is_date_valid, is_email_valid
+from utils.render_utils import format_options, parse_fields, render
+from utils.service_utils import get_service
 
 
-db_session = SessionLocal()
-event_repo = EventRepository(db_session)
-event_service = EventService(event_repo, user_repo)
+event_service = get_service("event")
+
+# Formats vérifiés par colonnes à l'import (mode batch)
+EVENT_COLUMN_RULES = {"start_date": "date", "end_date": "date"}
 
 
 @click.group(name='event')
@@ -21,14 +25,149 @@ def event_group():
     pass
 
 
+def parse_date(value, label: str):
+    """Convertit une date YYYY-MM-DD d'une ligne d'import, None si absente"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if not is_date_valid(value):
+        raise ValueError(f"{label} invalide : {value} "
+                         "Format attendu : YYYY-MM-DD")
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+@functools.cache
+def to_date(value: str) -> date:
+    """Date YYYY-MM-DD déjà validée (peu de valeurs distinctes par import)"""
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def with_dates(rows):
+    """Convertit les dates des lignes validées par colonnes"""
+    for line_number, data in rows:
+        data["start_date"] = to_date(data["start_date"])
+        data["end_date"] = to_date(data["end_date"])
+        yield line_number, data
+
+
+def period_options(func):
+    """Options de période communes : --from, --to, --days"""
+    func = click.option("--days", type=int, default=None,
+                        help="Fenêtre de N jours à partir de --from "
+                             "(aujourd'hui par défaut)")(func)
+    func = click.option("--to", "start_to",
+                        type=click.DateTime(formats=["%Y-%m-%d"]),
+                        default=None,
+                        help="Fin de la période (YYYY-MM-DD, incluse)")(func)
+    func = click.option("--from", "start_from",
+                        type=click.DateTime(formats=["%Y-%m-%d"]),
+                        default=None,
+                        help="Début de la période (YYYY-MM-DD, inclus)")(func)
+    return func
+
+
+def resolve_period(start_from, start_to, days):
+    """Bornes (date, date) de la période, None si non bornée"""
+    start_from = start_from.date() if start_from else None
+    start_to = start_to.date() if start_to else None
+    if days is not None:
+        start_from = start_from or date.today()
+        start_to = start_from + timedelta(days=days)
+    return start_from, start_to
+
+
+def parse_attendees(value):
+    """Convertit un nombre de participants, None si absent"""
+    if value in (None, ""):
+        return None
+    try:
+        attendees = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Nombre de participants invalide : {value}")
+    if attendees < 0:
+        raise ValueError("Le nombre de participants doit être positif")
+    return attendees
+
+
+def parse_contact_email(value):
+    """Valide l'email du contact d'une ligne d'import, None si absent"""
+    contact_email = (value or "").strip().lower() or None
+    if contact_email and not is_email_valid(contact_email):
+        raise ValueError(f"L'email '{contact_email}' est invalide")
+    return contact_email
+
+
+def validate_event_row(row: dict) -> dict:
+    """
+    Valide une ligne d'import d'évènement (mode batch)
+    Dates : vérifiées par colonnes (EVENT_COLUMN_RULES) puis converties
+    par with_dates
+    """
+    contract_id = (row.get("contract_id") or "").strip()
+    try:
+        contract_id = str(uuid.UUID(contract_id))
+    except ValueError:
+        raise ValueError(f"ID du contrat invalide : {contract_id}")
+    name = (row.get("name") or "").strip()
+    if not name:
+        raise ValueError("Nom de l'évènement manquant")
+    start_date = (row.get("start_date") or "").strip()
+    end_date = (row.get("end_date") or "").strip()
+    if not start_date or not end_date:
+        raise ValueError("Dates de début et de fin obligatoires")
+    contact_email = parse_contact_email(row.get("contact_email"))
+    if not contact_email:
+        raise ValueError("Email du contact évènement manquant")
+    return {
+        "contract_id": contract_id,
+        "name": name,
+        "start_date": start_date,
+        "end_date": end_date,
+        "location": (row.get("location") or "").strip(),
+        "attendees": parse_attendees(row.get("attendees")),
+        "contact_email": contact_email,
+        "notes": (row.get("notes") or "").strip(),
+    }
+
+
+def validate_event_update_row(row: dict) -> dict:
+    """Valide une ligne de mise à jour d'évènement (mode batch)"""
+    event_id = str(row.get("event_id") or "").strip()
+    if not event_id.isdigit():
+        raise ValueError(f"ID de l'évènement invalide : {event_id}")
+    return {
+        "event_id": int(event_id),
+        "name": (row.get("name") or "").strip() or None,
+        "start_date": parse_date(row.get("start_date"), "Date de début"),
+        "end_date": parse_date(row.get("end_date"), "Date de fin"),
+        "location": (row.get("location") or "").strip() or None,
+        "attendees": parse_attendees(row.get("attendees")),
+        "contact_email": parse_contact_email(row.get("contact_email")),
+        "notes": (row.get("notes") or "").strip() or None,
+    }
+
+
 # Commande pour créer un contrat
 @event_group.command()
-def create():
+@batch_options
+@chunk_size_option
+def create(from_file, file_format, chunk_size):
     """Crée un nouvel event dans le CRM"""
 
+    # Mode batch : import depuis un fichier CSV / JSON Lines
+    if from_file:
+        run_batch(
+            from_file, file_format, validate_event_row,
+            lambda rows: event_service.create_events(with_dates(rows),
+                                                     chunk_size),
+            "évènement(s)", EVENT_COLUMN_RULES
+            )
+        return
+
     while True:
         contract_id = click.prompt("ID du contrat")
-        contract = contract_service.get_contracts(contract_id)
+        contract = contract_service.get_contracts(contract_id,
+                                                  profile="listing")
         if contract is None or (isinstance(contract, dict) and "error" in
                                 contract):
             click.echo(f"❌ Erreur : {contract['error']}")
@@ -134,26 +273,41 @@ def create():
                                              "end_date",
                                              "no_user"
                                              ]))
-def get(option):
+@click.option("--limit", type=int, default=None,
+              help="Nombre maximum d'évènements affichés")
+@click.option("--after", "after_id", type=int, default=None,
+              help="ID du dernier évènement de la page précédente")
+@period_options
+@click.option("--overlap", is_flag=True, default=False,
+              help="Évènements en cours sur la période (et non seulement "
+                   "commençant dans la période)")
+@format_options
+def get(option, limit, after_id, start_from, start_to, days, overlap,
+        output_format, fields):
     """Récupère un event dans le CRM"""
 
-    events = None
+    filters = {}
 
-    if option == "all":
-        events = event_service.get_events()
+    # Filtre de période, combinable avec l'option choisie
+    period = resolve_period(start_from, start_to, days)
+    if overlap and any(period):
+        filters["overlaps"] = period
+    else:
+        filters["start_from"], filters["start_to"] = period
 
-    elif option == "id":
-        event_id = click.prompt("ID de l'évènement")
-        events = event_service.get_events(event_id=event_id)
+    if option == "id":
+        filters["event_id"] = click.prompt("ID de l'évènement")
 
     elif option == "contract":
-        contract_id = click.prompt("ID du contrat")
-        events = event_service.get_events(contract_id=contract_id)
+        filters["contract_id"] = click.prompt("ID du contrat")
 
     elif option == "user":
         user_email = click.prompt("Adresse email du contact").lower()
         user = user_service.get_user_by_email(user_email)
-        events = event_service.get_events(user_id=user.id)
+        if isinstance(user, dict) and "error" in user:
+            click.echo(f"❌ Erreur : {user['error']}")
+            return
+        filters["user_id"] = user.id
 
     elif option == "client":
         while True:
@@ -163,54 +317,119 @@ def get(option):
             else:
                 break
         client = client_service.get_client_by_email(client_email)
-        if not client:
+        if not client or (isinstance(client, dict) and "error" in client):
             click.echo("❌ Erreur : Aucun client trouvé avec l'email "
                        f"{client_email}")
             return
-        events = event_service.get_events(client_id=client.id)
+        filters["client_id"] = client.id
 
     elif option == "start_date":
-        start_date = click.prompt("Date de début de l'évènement")
-        events = event_service.get_events(start_date=start_date)
+        filters["start_date"] = click.prompt("Date de début de l'évènement")
 
     elif option == "end_date":
-        end_date = click.prompt("Date de fin de l'évènement")
-        events = event_service.get_events(end_date=end_date)
+        filters["end_date"] = click.prompt("Date de fin de l'évènement")
 
     elif option == "no_user":
-        events = event_service.get_events(no_user=True)
+        filters["no_user"] = True
+
+    # Rendu structuré : colonnes demandées uniquement, sans objets ORM
+    if output_format:
+        result = event_service.get_event_rows(parse_fields(fields), after_id,
+                                              limit, **filters)
+        if isinstance(result, dict) and "error" in result:
+            click.echo(f"❌ Erreur : {result['error']}", err=True)
+            return
+        render(result["rows"], result["fields"], output_format)
+        return
 
-    # Vérification et affichage des contrats
-    if not events:
-        click.echo("❌ Aucun évènement trouvé.")
-    elif isinstance(events, dict) and "error" in events:
+    # Lecture en streaming de DTO (projection, sans objets ORM)
+    events = event_service.get_event_listing(after_id=after_id, limit=limit,
+                                             stream=True, **filters)
+
+    # Vérification et affichage des évènements
+    if isinstance(events, dict) and "error" in events:
         click.echo(f"❌ {events['error']}")
-    else:
-        for event in events:
-            click.echo(f"\nID : {event.id}\n"
-                       f"Nom de l'évènement : {event.name}\n"
-                       f"ID du contrat : {event.contract.id}\n"
-                       f"\nInformations client :\n"
-                       f"   Nom : {event.contract.client.full_name}\n"
-                       f"   Email : {event.contract.client.email}\n"
-                       f"   Téléphone : {event.contract.client.phone}\n"
-                       f"\nDate de début : {event.start_date}\n"
-                       f"Date de fin : {event.end_date}\n"
-                       f"Contact : {event.contact if event.contact else None}\n"  # noqa: E501
-                       f"Lieu : {event.location}\n"
-                       f"Nombre de participants : {event.attendees}\n"
-                       f"Notes : {event.notes}\n"
-                       )
+        return
+
+    count = 0
+    last_id = None
+    for event in events:
+        count += 1
+        last_id = event.id
+        click.echo(f"\nID : {event.id}\n"
+                   f"Nom de l'évènement : {event.name}\n"
+                   f"ID du contrat : {event.contract_id}\n"
+                   f"\nInformations client :\n"
+                   f"   Nom : {event.client_name}\n"
+                   f"   Email : {event.client_email}\n"
+                   f"   Téléphone : {event.client_phone}\n"
+                   f"\nDate de début : {event.start_date}\n"
+                   f"Date de fin : {event.end_date}\n"
+                   f"Contact : {event.contact if event.contact else None}\n"
+                   f"Lieu : {event.location}\n"
+                   f"Nombre de participants : {event.attendees}\n"
+                   f"Notes : {event.notes}\n"
+                   )
+
+    if not count:
+        click.echo("❌ Aucun évènement trouvé.")
+    elif limit and count == limit:
+        click.echo(f"ℹ️ Page suivante : --after {last_id}")
+
+
+# Commande pour afficher le calendrier des évènements
+@event_group.command()
+@period_options
+@click.option("--no-user", is_flag=True, default=False,
+              help="Uniquement les évènements sans support")
+def calendar(start_from, start_to, days, no_user):
+    """Affiche les évènements jour par jour (30 prochains jours par défaut)"""
+
+    if start_to is None and days is None:
+        days = 30
+    start_from, start_to = resolve_period(start_from, start_to, days)
+
+    # Lecture en streaming : triée par date de début, regroupée par jour
+    events = event_service.get_calendar(start_from, start_to,
+                                        no_user=no_user)
+    if isinstance(events, dict) and "error" in events:
+        click.echo(f"❌ Erreur : {events['error']}")
+        return
+
+    count = 0
+    for day, day_events in itertools.groupby(events,
+                                             key=lambda e: e.start_date):
+        click.echo(f"\n📅 {day:%d/%m/%Y}")
+        for event in day_events:
+            count += 1
+            client = event.contract.client if event.contract else None
+            click.echo(f"   #{event.id}  {event.name} → {event.end_date}  "
+                       f"{event.location} "
+                       f"({client.full_name if client else '-'}, "
+                       f"{event.attendees} participants)")
+
+    if not count:
+        click.echo("ℹ️ Aucun évènement sur la période.")
 
 
 # Commande pour mettre à jour un évènement
 @event_group.command()
-@click.option('--event_id', prompt="ID de l'évènement",
+@click.option('--event_id', default=None,
               help="ID de l'évènement à actualiser")
-def update(event_id):
+@batch_options
+def update(event_id, from_file, file_format):
     """Met à jour les informations d'un évènement"""
 
-    event = event_service.get_events(event_id)
+    # Mode batch : mises à jour depuis un fichier CSV / JSON Lines
+    if from_file:
+        run_batch(from_file, file_format, validate_event_update_row,
+                  event_service.update_events, "évènement(s)")
+        return
+
+    if event_id is None:
+        event_id = click.prompt("ID de l'évènement")
+
+    event = event_service.get_events(event_id, profile="detail")
     if isinstance(event, list) and event:
         event = event[0]
     if event is None:
@@ -359,7 +578,7 @@ def update(event_id):
 def delete(event_id):
     """Supprime un évènement par son ID."""
 
-    event_to_delete = event_service.get_events(event_id)[0]
+    event_to_delete = event_service.get_events(event_id, profile="detail")[0]
 
     # Demande confirmation avant suppression
     confirm = click.confirm("\n❗ Êtes-vous sûr de vouloir supprimer "
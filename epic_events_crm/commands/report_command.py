@@ -0,0 +1,110 @@
+import click
+from utils.service_utils import get_service
+
+
+report_service = get_service("report")
+
+
+@click.group(name='report')
+def report_group():
+    """Groupe de commandes du tableau de bord (vues matérialisées)."""
+    pass
+
+
+def check_result(result) -> bool:
+    """Affiche l'erreur ou l'absence de résultat, False si rien à afficher"""
+    if isinstance(result, dict) and "error" in result:
+        click.echo(f"❌ Erreur : {result['error']}")
+        return False
+    if not result:
+        click.echo("ℹ️ Aucun résultat.")
+        return False
+    return True
+
+
+# Commande pour afficher les totaux par commercial
+@report_group.command()
+def commercials():
+    """Affiche le nombre et les montants des contrats par commercial."""
+
+    rows = report_service.get_commercial_totals()
+    if not check_result(rows):
+        return
+
+    for row in rows:
+        click.echo(f"{row['full_name']} : {row['contracts']} contrat(s)  "
+                   f"total {row['total_amount']}  "
+                   f"payé {row['paid_amount']}  "
+                   f"restant dû {row['remaining_amount']}")
+
+
+# Commande pour afficher les clients ayant un montant restant dû
+@report_group.command()
+@click.option("--limit", type=int, default=None,
+              help="Nombre maximum de clients affichés")
+@click.option("--after", "after_id", type=int, default=None,
+              help="Affiche les clients après cet ID (pagination)")
+def unpaid(limit, after_id):
+    """Affiche les montants restant dus par client."""
+
+    rows = report_service.get_client_unpaid(after_id, limit)
+    if not check_result(rows):
+        return
+
+    for row in rows:
+        click.echo(f"#{row['client_id']}  {row['full_name']} "
+                   f"({row['company_name']}, {row['email']}) : "
+                   f"{row['unpaid_contracts']} contrat(s), "
+                   f"restant dû {row['remaining_amount']}")
+    if limit and len(rows) == limit:
+        click.echo(f"ℹ️ Page suivante : --after {rows[-1]['client_id']}")
+
+
+# Commande pour afficher la charge des supports
+@report_group.command()
+def support():
+    """Affiche le nombre d'évènements par support."""
+
+    rows = report_service.get_support_events()
+    if not check_result(rows):
+        return
+
+    for row in rows:
+        click.echo(f"{row['full_name']} : {row['events']} évènement(s) "
+                   f"du {row['first_start']} au {row['last_end']}")
+
+
+# Commande pour afficher les évènements à venir sans support
+@report_group.command()
+@click.option("--days", type=int, default=30, show_default=True,
+              help="Fenêtre en jours à partir d'aujourd'hui")
+def unassigned(days):
+    """Affiche les évènements à venir sans support assigné."""
+
+    rows = report_service.get_unassigned_events(days)
+    if not check_result(rows):
+        return
+
+    for row in rows:
+        click.echo(f"#{row['event_id']}  {row['start_date']} → "
+                   f"{row['end_date']}  {row['name']} "
+                   f"({row['client_name']}, {row['location']}, "
+                   f"{row['attendees']} participants)")
+
+
+# Commande pour rafraîchir les vues du tableau de bord
+@report_group.command()
+@click.option("--all", "refresh_all", is_flag=True,
+              help="Rafraîchit toutes les vues, pas seulement les obsolètes")
+def refresh(refresh_all):
+    """Rafraîchit les vues matérialisées du tableau de bord."""
+
+    states = report_service.refresh(stale_only=not refresh_all)
+    if not check_result(states):
+        return
+
+    for state in states:
+        click.echo(f"{'⚠️' if state['stale'] else '✅'} "
+                   f"{state['view_name']} : rafraîchie le "
+                   f"{state['refreshed_at']:%Y-%m-%d %H:%M:%S}"
+                   f"{' (obsolète)' if state['stale'] else ''}")
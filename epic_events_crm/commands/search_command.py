@@ -0,0 +1,66 @@
+import click
+from utils.service_utils import get_service
+
+
+search_service = get_service("search")
+
+
+def format_client(client) -> str:
+    return (f"#{client.id}  {client.full_name} ({client.company_name}) "
+            f"{client.email}")
+
+
+def format_user(user) -> str:
+    return f"#{user.id}  {user.full_name} {user.email}"
+
+
+def format_event(event) -> str:
+    return (f"#{event.id}  {event.name}  {event.start_date} → "
+            f"{event.end_date}  {event.location}")
+
+
+# Type recherché : (méthode du service, titre, affichage d'un résultat)
+SEARCH_KINDS = {
+    "client": ("search_clients", "Clients", format_client),
+    "user": ("search_users", "Utilisateurs", format_user),
+    "event": ("search_events", "Évènements", format_event),
+}
+
+
+# Commande de recherche plein texte et approchée
+@click.command()
+@click.argument("term")
+@click.option("--type", "kind", default="all", show_default=True,
+              type=click.Choice(["all", *SEARCH_KINDS]),
+              help="Type d'objet recherché")
+@click.option("--limit", type=int, default=10, show_default=True,
+              help="Nombre maximum de résultats par type")
+@click.option("--offset", type=int, default=0,
+              help="Nombre de résultats ignorés (page suivante)")
+def search(term, kind, limit, offset):
+    """Recherche des clients, utilisateurs et évènements (classés)."""
+
+    kinds = list(SEARCH_KINDS) if kind == "all" else [kind]
+    found = False
+    for name in kinds:
+        method, title, display = SEARCH_KINDS[name]
+        results = getattr(search_service, method)(term, limit, offset)
+        if isinstance(results, dict) and "error" in results:
+            # Type non autorisé : ignoré en recherche globale
+            if kind == "all" and "Permission" in results["error"]:
+                continue
+            click.echo(f"❌ Erreur : {results['error']}")
+            return
+        if not results:
+            continue
+
+        found = True
+        click.echo(f"\n{title} :")
+        for result in results:
+            click.echo(f"   {display(result)}")
+        if limit and len(results) == limit:
+            click.echo(f"   ℹ️ Résultats suivants : --type {name} "
+                       f"--offset {offset + limit}")
+
+    if not found:
+        click.echo("ℹ️ Aucun résultat.")
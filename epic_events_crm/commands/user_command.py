@@ -1,16 +1,17 @@
 import click
 
-from config.config import SessionLocal
-from services.user_service import UserService
-from repositories.user_repository import UserRepository
+from utils.batch_utils import batch_options, chunk_size_option, run_batch
 from utils.cli_utils import is_email_valid, is_password_valid, is_role_valid
+from utils.render_utils import (format_options, object_rows, parse_fields,
+                                render)
+from utils.service_utils import get_service
 
 
-db_session = SessionLocal()
+# Services (démon s'il est démarré, sinon locaux)
+user_service = get_service("user")
 
-# Création des objets services
-user_repo = UserRepository(db_session)
-user_service = UserService(user_repo)
+# Colonnes du rendu --format (cf. UserListing)
+USER_FIELDS = ["id", "full_name", "email", "role"]
 
 
 @click.group(name='user')
@@ -18,11 +19,50 @@ def user_group():
     pass
 
 
+def validate_user_row(row: dict) -> dict:
+    """Valide une ligne d'import d'utilisateur (mode batch)"""
+    full_name = (row.get("full_name") or "").strip()
+    if not full_name:
+        raise ValueError("Nom complet manquant")
+    email = (row.get("email") or "").strip().lower()
+    if not is_email_valid(email):
+        raise ValueError(f"L'email '{email}' est invalide")
+    password = row.get("password") or ""
+    if not is_password_valid(password):
+        raise ValueError("Le mot de passe doit comporter au moins 8 "
+                         "caractères et un chiffre")
+    role_name = (row.get("role") or "").strip().lower()
+    role_id = is_role_valid(role_name)
+    if not role_id:
+        raise ValueError(f"Le rôle '{role_name}' est invalide")
+    return {
+        "full_name": full_name,
+        "email": email,
+        "password": password,
+        "role_id": role_id,
+    }
+
+
 # Commande pour créer un utilisateur
 @user_group.command()
-def create():
+@batch_options
+@chunk_size_option
+@click.option("--workers", type=int, default=None,
+              help="Processus de hachage des mots de passe (mode batch, "
+                   "nombre de CPU par défaut)")
+def create(from_file, file_format, chunk_size, workers):
     """Crée un nouvel utilisateur dans le CRM."""
 
+    # Mode batch : import depuis un fichier CSV / JSON Lines
+    if from_file:
+        run_batch(
+            from_file, file_format, validate_user_row,
+            lambda rows: user_service.create_users(rows, chunk_size,
+                                                   workers),
+            "utilisateur(s)"
+            )
+        return
+
     # Demande le nom complet
     full_name = click.prompt('Nom complet de l\'utilisateur')
 
@@ -82,7 +122,12 @@ def create():
 # Commande pour récupérer un utilisateur par ID, email ou nom complet
 @user_group.command()
 @click.argument('identifier', nargs=-1, required=False)
-def get(identifier):
+@click.option("--limit", type=int, default=None,
+              help="Nombre maximum d'utilisateurs affichés")
+@click.option("--after", "after_id", type=int, default=None,
+              help="ID du dernier résultat de la page précédente")
+@format_options
+def get(identifier, limit, after_id, output_format, fields):
     """Récupère un utilisateur par ID, email ou nom complet."""
 
     if identifier:
@@ -94,40 +139,54 @@ def get(identifier):
             type=str
         )
 
-    # Récupération de l'utilisateur en fonction de l'identifiant
+    # Récupération des utilisateurs (DTO avec le nom du rôle) en fonction
+    # de l'identifiant
     if identifier.isdigit():
-        found_user = user_service.get_user_by_id(int(identifier))
+        found_user = user_service.get_user_listing(user_id=int(identifier))
     elif "@" in identifier:
-        found_user = user_service.get_user_by_email(identifier.lower())
+        found_user = user_service.get_user_listing(email=identifier.lower())
     else:
-        found_user = user_service.get_user_by_name(identifier)
+        found_user = user_service.get_user_listing(
+            full_name=identifier, after_id=after_id, limit=limit
+            )
 
     # Gestion des erreurs
     if isinstance(found_user, dict) and "error" in found_user:
         click.echo(f"❌ Erreur : {found_user['error']}")
         return
 
+    # Rendu structuré des utilisateurs trouvés
+    if output_format:
+        fields = parse_fields(fields) or USER_FIELDS
+        unknown = set(fields) - set(USER_FIELDS)
+        if unknown:
+            click.echo(f"❌ Erreur : Champ(s) inconnu(s) : "
+                       f"{', '.join(sorted(unknown))}", err=True)
+            return
+        render(object_rows(found_user, fields), fields, output_format)
+        return
+
     if not found_user:
         click.echo("❌ Aucun utilisateur trouvé.")
     # Si plusieurs utilisateurs (avec le meme nom), les affichent
-    elif isinstance(found_user, list) and len(found_user) > 1:
+    elif len(found_user) > 1:
         click.echo("✅ Plusieurs utilisateurs ont été trouvés :")
         for u in found_user:
             click.echo(
                 f"\n👤 {u.full_name}\n"
                 f"ID : {u.id}\n"
                 f"Email : {u.email}\n"
-                f"Rôle : {u.role.name}\n"
+                f"Rôle : {u.role}\n"
             )
     # Si utilisateur trouvé, l'affiche
     else:
-        u = found_user[0] if isinstance(found_user, list) else found_user
+        u = found_user[0]
         click.echo(
             "\n✅ Utilisateur trouvé :\n"
             f"\n👤 {u.full_name}\n"
             f"ID : {u.id}\n"
             f"Email : {u.email}\n"
-            f"Rôle : {u.role.name}\n"
+            f"Rôle : {u.role}\n"
         )
 
 
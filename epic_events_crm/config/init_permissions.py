@@ -1,119 +1,88 @@
 from models.role import Role, Permission
 
 
-def initialize_roles_and_permissions(db_session):
+# Permissions, dans l'ordre d'insertion (l'index sert de bit dans les tokens)
+PERMISSIONS = [
+    'create_user', 'read_user', 'update_user', 'delete_user',
+    'create_client', 'read_client', 'update_client', 'delete_client',
+    'create_contract', 'read_contract', 'update_contract', 'delete_contract',
+    'create_event', 'read_event', 'update_event', 'delete_event',
+    'manage_data',
+]
+
+# Rôles, dans l'ordre d'insertion (cf. is_role_valid)
+ROLE_PERMISSIONS = {
+    'admin': list(PERMISSIONS),
+    'gestion': [
+        'create_user',
+        'create_contract',
+
+        'read_user',
+        'read_client',
+        'read_contract',
+        'read_event',
+
+        'update_user',
+        'update_contract',
+        'update_event',
+
+        'delete_user',
+
+        'manage_data',  # Export / import, rafraîchissement des rapports
+    ],
+    'commercial': [
+        'create_client',
+        'create_event',  # Si responsable du client
+
+        'read_user',
+        'read_client',
+        'read_contract',
+        'read_event',
+
+        'update_client',  # Si responsable du client
+    ],
+    'support': [
+        'read_user',
+        'read_client',
+        'read_contract',
+        'read_event',
+
+        'update_event',  # Si responsable de l'évènement
+    ],
+}
+
+# Version de la matrice rôles/permissions
+# A incrémenter à chaque modification : invalide les droits des tokens émis
+PERMISSIONS_VERSION = 2
+
+
+def permissions_to_mask(permission_names) -> int:
+    """Encode un ensemble de permissions en masque de bits"""
+    mask = 0
+    for name in permission_names:
+        if name in PERMISSIONS:
+            mask |= 1 << PERMISSIONS.index(name)
+    return mask
+
+
+def mask_to_permissions(mask: int) -> frozenset:
+    """Décode un masque de bits en ensemble de permissions"""
+    return frozenset(
+        name for index, name in enumerate(PERMISSIONS) if mask >> index & 1
+        )
 
-    # Rôles
-    admin_role = Role(name='admin')
-    gestion_role = Role(name='gestion')
-    commercial_role = Role(name='commercial')
-    support_role = Role(name='support')
 
-    db_session.add(admin_role)
-    db_session.add(gestion_role)
-    db_session.add(commercial_role)
-    db_session.add(support_role)
+def initialize_roles_and_permissions(db_session):
 
     # Permissions
-    create_user_permission = Permission(name='create_user')
-    read_user_permission = Permission(name='read_user')
-    update_user_permission = Permission(name='update_user')
-    delete_user_permission = Permission(name='delete_user')
-
-    create_client_permission = Permission(name='create_client')
-    read_client_permission = Permission(name='read_client')
-    update_client_permission = Permission(name='update_client')
-    delete_client_permission = Permission(name='delete_client')
-
-    create_contract_permission = Permission(name='create_contract')
-    read_contract_permission = Permission(name='read_contract')
-    update_contract_permission = Permission(name='update_contract')
-    delete_contract_permission = Permission(name='delete_contract')
-
-    create_event_permission = Permission(name='create_event')
-    read_event_permission = Permission(name='read_event')
-    update_event_permission = Permission(name='update_event')
-    delete_event_permission = Permission(name='delete_event')
-
-    db_session.add(create_user_permission)
-    db_session.add(read_user_permission)
-    db_session.add(update_user_permission)
-    db_session.add(delete_user_permission)
-
-    db_session.add(create_client_permission)
-    db_session.add(read_client_permission)
-    db_session.add(update_client_permission)
-    db_session.add(delete_client_permission)
-
-    db_session.add(create_contract_permission)
-    db_session.add(read_contract_permission)
-    db_session.add(update_contract_permission)
-    db_session.add(delete_contract_permission)
-
-    db_session.add(create_event_permission)
-    db_session.add(read_event_permission)
-    db_session.add(update_event_permission)
-    db_session.add(delete_event_permission)
-
-    # Lier les rôles aux permissions
-    admin_role.permissions = [
-        create_user_permission,
-        create_client_permission,
-        create_contract_permission,
-        create_event_permission,
-
-        read_user_permission,
-        read_client_permission,
-        read_contract_permission,
-        read_event_permission,
-
-        update_user_permission,
-        update_client_permission,
-        update_contract_permission,
-        update_event_permission,
-
-        delete_user_permission,
-        delete_client_permission,
-        delete_contract_permission,
-        delete_event_permission,
-    ]
-
-    gestion_role.permissions = [
-        create_user_permission,
-        create_contract_permission,
-
-        read_user_permission,
-        read_client_permission,
-        read_contract_permission,
-        read_event_permission,
-
-        update_user_permission,
-        update_contract_permission,
-        update_event_permission,
-
-        delete_user_permission,
-    ]
-
-    commercial_role.permissions = [
-        create_client_permission,
-        create_event_permission,  # Si responsable du client
-
-        read_user_permission,
-        read_client_permission,
-        read_contract_permission,
-        read_event_permission,
-
-        update_client_permission,  # Si responsable du client
-    ]
-
-    support_role.permissions = [
-
-        read_user_permission,
-        read_client_permission,
-        read_contract_permission,
-        read_event_permission,
-
-        update_event_permission,  # Si responsable de l'évènement
-    ]
+    permissions = {name: Permission(name=name) for name in PERMISSIONS}
+    for permission in permissions.values():
+        db_session.add(permission)
+
+    # Rôles et liaison aux permissions
+    for role_name, permission_names in ROLE_PERMISSIONS.items():
+        role = Role(name=role_name)
+        role.permissions = [permissions[name] for name in permission_names]
+        db_session.add(role)
 
     db_session.commit()
@@ -0,0 +1,275 @@
+import datetime
+import logging
+
+from sqlalchemy import (Table, Column, Integer, String, DateTime, MetaData,
+                        func, literal, select, text)
+from sqlalchemy.exc import DBAPIError
+
+from config.config import Base
+
+
+""" Migrations versionnées du schéma de la base de données """
+
+# Table de suivi des migrations appliquées (hors Base.metadata)
+migration_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', migration_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String, nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+def _create_indexes(connection, table, names):
+    """Crée les index nommés d'une table s'ils n'existent pas"""
+    for index in table.indexes:
+        if index.name in names:
+            index.create(bind=connection, checkfirst=True)
+
+
+def migration_0001_initial_schema(connection):
+    """Tables initiales du CRM"""
+    from models import user, client, contract, event  # noqa: F401
+    Base.metadata.create_all(bind=connection)
+
+
+def migration_0002_filter_indexes(connection):
+    """Index des colonnes filtrées par les repositories"""
+    from models.contract import Contract
+    from models.event import Event
+
+    _create_indexes(connection, Event.__table__, {
+        'ix_events_contract_id',
+        'ix_events_client_id',
+        'ix_events_user_id',
+        'ix_events_start_date',
+        'ix_events_end_date',
+    })
+    _create_indexes(connection, Contract.__table__, {
+        'ix_contracts_user_id',
+        'ix_contracts_client_id',
+        'ix_contracts_lower_status',
+        'ix_contracts_unpaid',
+    })
+
+
+def migration_0003_payments_ledger(connection):
+    """
+    Registre des paiements (append-only)
+    Les montants déjà payés sont repris comme paiement d'ouverture
+    """
+    from models.contract import Contract
+    from models.payment import Payment
+
+    Payment.__table__.create(bind=connection, checkfirst=True)
+    already_recorded = select(Payment.contract_id).scalar_subquery()
+    connection.execute(Payment.__table__.insert().from_select(
+        ['contract_id', 'amount', 'paid_at'],
+        select(Contract.id, Contract.paid_amount, func.now()).where(
+            Contract.paid_amount > 0,
+            Contract.id.not_in(already_recorded))
+    ))
+
+
+# Requêtes des vues matérialisées du tableau de bord (cf. models.report)
+REPORT_VIEW_DEFINITIONS = {
+    'report_commercial_totals': """
+        SELECT u.id AS user_id, u.full_name,
+               count(c.id) AS contracts,
+               coalesce(sum(c.total_amount), 0) AS total_amount,
+               coalesce(sum(c.paid_amount), 0) AS paid_amount,
+               coalesce(sum(c.remaining_amount), 0) AS remaining_amount
+        FROM users u JOIN contracts c ON c.user_id = u.id
+        GROUP BY u.id, u.full_name
+    """,
+    'report_client_unpaid': """
+        SELECT cl.id AS client_id, cl.full_name, cl.email, cl.company_name,
+               count(c.id) AS unpaid_contracts,
+               sum(c.remaining_amount) AS remaining_amount
+        FROM clients cl JOIN contracts c ON c.client_id = cl.id
+        WHERE c.remaining_amount != 0
+        GROUP BY cl.id, cl.full_name, cl.email, cl.company_name
+    """,
+    'report_support_events': """
+        SELECT u.id AS user_id, u.full_name,
+               count(e.id) AS events,
+               min(e.start_date) AS first_start,
+               max(e.end_date) AS last_end
+        FROM users u JOIN events e ON e.user_id = u.id
+        GROUP BY u.id, u.full_name
+    """,
+    'report_unassigned_events': """
+        SELECT e.id AS event_id, e.name, e.start_date, e.end_date,
+               e.location, e.attendees, e.contract_id,
+               cl.full_name AS client_name
+        FROM events e LEFT JOIN clients cl ON cl.id = e.client_id
+        WHERE e.user_id IS NULL
+    """,
+}
+
+
+def migration_0004_report_views(connection):
+    """
+    Vues matérialisées du tableau de bord et état de rafraîchissement
+    Index unique par vue : requis par REFRESH ... CONCURRENTLY
+    """
+    from models.report import REPORT_VIEWS, report_refresh_state
+
+    for view in REPORT_VIEWS:
+        key = next(iter(view.primary_key.columns)).name
+        connection.execute(text(
+            f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view.name} AS "
+            f"{REPORT_VIEW_DEFINITIONS[view.name]}"))
+        connection.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{view.name} "
+            f"ON {view.name} ({key})"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_report_unassigned_events_start_date "
+        "ON report_unassigned_events (start_date)"))
+
+    report_refresh_state.create(bind=connection, checkfirst=True)
+    connection.execute(report_refresh_state.insert(), [
+        {"view_name": view.name,
+         "refreshed_at": datetime.datetime.now(datetime.timezone.utc)}
+        for view in REPORT_VIEWS
+    ])
+
+
+def migration_0005_calendar_index(connection):
+    """Index (start_date, id) : calendrier et filtres de période"""
+    from models.event import Event
+
+    _create_indexes(connection, Event.__table__, {'ix_events_start_date_id'})
+
+
+def migration_0006_search(connection):
+    """
+    Recherche : colonnes search_vector (tsvector calculé) et index GIN,
+    index trigrammes si l'extension pg_trgm peut être installée
+    """
+    from repositories.search_repository import SEARCH_TARGETS
+
+    for model, columns in SEARCH_TARGETS.values():
+        table = model.__table__
+        vector = table.c.search_vector
+        connection.execute(text(
+            f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS "
+            f"search_vector tsvector GENERATED ALWAYS AS "
+            f"({vector.computed.sqltext}) STORED"))
+        _create_indexes(connection, table,
+                        {f"ix_{table.name}_search_vector"})
+
+    try:
+        # Point de sauvegarde : l'échec (droits insuffisants) n'annule pas
+        # le reste de la migration
+        with connection.begin_nested():
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except DBAPIError as e:
+        logging.warning("pg_trgm indisponible, recherche sans trigrammes : "
+                        f"{e.orig}")
+        return
+
+    for model, columns in SEARCH_TARGETS.values():
+        table = model.__table__.name
+        for column in columns:
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"))
+
+
+def migration_0007_dataset_permission(connection):
+    """
+    Permission manage_data (export / import des données) pour les rôles
+    qui la reçoivent dans ROLE_PERMISSIONS. Sans rôles en base (première
+    installation), initialize_roles_and_permissions la crée ensuite
+    """
+    from config.init_permissions import ROLE_PERMISSIONS
+    from models.role import Permission, Role, role_permissions
+
+    if connection.execute(select(Role.id).limit(1)).first() is None:
+        return
+    permission_id = connection.execute(
+        select(Permission.id).where(Permission.name == 'manage_data')
+        ).scalar()
+    if permission_id is None:
+        permission_id = connection.execute(
+            Permission.__table__.insert().values(name='manage_data')
+            .returning(Permission.id)).scalar_one()
+    roles = [name for name, permissions in ROLE_PERMISSIONS.items()
+             if 'manage_data' in permissions]
+    connection.execute(role_permissions.insert().from_select(
+        ['role_id', 'permission_id'],
+        select(Role.id, literal(permission_id)).where(
+            Role.name.in_(roles),
+            Role.id.not_in(select(role_permissions.c.role_id).where(
+                role_permissions.c.permission_id == permission_id)))
+    ))
+
+
+def migration_0008_report_writes(connection):
+    """
+    Obsolescence des vues par instantané (PostgreSQL 13+) : journal des
+    transactions d'écriture et instantané du dernier rafraîchissement, à
+    la place du drapeau stale mis à jour par chaque écriture
+    """
+    from models.report import report_refresh_state, report_writes
+
+    report_writes.create(bind=connection, checkfirst=True)
+    connection.execute(text(
+        "ALTER TABLE report_refresh_state "
+        "ADD COLUMN IF NOT EXISTS snapshot pg_snapshot"))
+    connection.execute(text(
+        "ALTER TABLE report_refresh_state DROP COLUMN IF EXISTS stale"))
+    # Instantané inconnu : vues à rafraîchir à la prochaine demande
+    connection.execute(report_refresh_state.update().values(snapshot=None))
+
+
+# Migrations dans l'ordre d'application : (version, nom, fonction)
+MIGRATIONS = [
+    (1, "initial_schema", migration_0001_initial_schema),
+    (2, "filter_indexes", migration_0002_filter_indexes),
+    (3, "payments_ledger", migration_0003_payments_ledger),
+    (4, "report_views", migration_0004_report_views),
+    (5, "calendar_index", migration_0005_calendar_index),
+    (6, "search", migration_0006_search),
+    (7, "dataset_permission", migration_0007_dataset_permission),
+    (8, "report_writes", migration_0008_report_writes),
+]
+
+
+def get_applied_versions(engine) -> set:
+    """Retourne les versions de migration déjà appliquées"""
+    migration_metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        rows = connection.execute(select(schema_migrations.c.version))
+        return {row.version for row in rows}
+
+
+def migrate(engine, target: int = None) -> list:
+    """
+    Applique les migrations en attente, chacune dans sa transaction.
+
+    Args:
+        engine: Moteur SQLAlchemy
+        target (int): Version maximale à appliquer (toutes par défaut)
+
+    Returns:
+        list: Versions appliquées
+    """
+    applied = get_applied_versions(engine)
+    done = []
+
+    for version, name, upgrade in MIGRATIONS:
+        if version in applied or (target is not None and version > target):
+            continue
+        logging.info(f"Migration {version:04d}_{name}")
+        with engine.begin() as connection:
+            upgrade(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=version,
+                name=name,
+                applied_at=datetime.datetime.now(datetime.timezone.utc)
+            ))
+        done.append(version)
+
+    return done
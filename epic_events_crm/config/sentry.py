@@ -0,0 +1,44 @@
+import os
+import sys
+
+
+""" Suivi des erreurs avec Sentry, initialisé à la première erreur """
+SENTRY_DSN = "https://d25274d49594994e87a357fda009f962@o4509044061437952.ingest.de.sentry.io/4509044064649296"  # noqa: E501
+
+_sentry_initialized = False
+
+
+def init_sentry():
+    """Importe et initialise sentry_sdk une seule fois, à la demande"""
+    global _sentry_initialized
+    import sentry_sdk
+
+    if not _sentry_initialized:
+        sentry_sdk.init(
+            dsn=os.getenv("SENTRY_DSN", SENTRY_DSN),
+            send_default_pii=True,
+            )
+        _sentry_initialized = True
+    return sentry_sdk
+
+
+def handle_exception(exc_type, exc_value, exc_traceback):
+    """ Définition du gestionnaire global pour les exceptions non interceptées """  # noqa: E501
+    if issubclass(exc_type, KeyboardInterrupt):  # Exclu la capture des exceptions KeyboardInterrupt # noqa: E501
+        sys.__excepthook__(exc_type, exc_value, exc_traceback)
+        return
+    # Afficher un message d'erreur propre
+    print(f"Une erreur est survenue : {exc_value}")
+
+    # Envoyer l'exception à Sentry
+    sentry_sdk = init_sentry()
+    event_id = sentry_sdk.capture_exception(exc_value)
+    if event_id:
+        print("[Sentry] L'événement a été envoyé avec succès.")
+        print(f"Event ID : {event_id}")
+    else:
+        print("[Sentry] Échec de l'envoi de l'événement.")
+
+
+# Remplace le gestionnaire d'exceptions par défaut
+sys.excepthook = handle_exception
@@ -1,21 +1,18 @@
-from sqlalchemy.orm import sessionmaker
-
-from config.config import Base, engine
-from models import user, client, contract, event  # noqa: F401
+from config import sentry  # noqa: F401
+from config.config import engine, session_scope
+from config.migrations import migrate
+from models import user, client, contract, event, payment  # noqa: F401
+from models.role import Role
 from epic_events_crm.config.init_permissions import initialize_roles_and_permissions  # noqa: E501
 
 
-# Crée la session
-Session = sessionmaker(bind=engine)
-session = Session()
-
 if __name__ == '__main__':
-    print("Création des tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Tables créées")
-
-    # Initialiser les rôles et les permissions
-    initialize_roles_and_permissions(session)
+    print("Application des migrations...")
+    applied = migrate(engine)
+    print(f"Migrations appliquées : {applied if applied else 'aucune'}")
 
-    # Fermer la session après l'initialisation
-    session.close()
+    # Initialiser les rôles et les permissions (première installation)
+    # La session est fermée à la sortie du bloc
+    with session_scope() as session:
+        if not session.query(Role).first():
+            initialize_roles_and_permissions(session)
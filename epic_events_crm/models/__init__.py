@@ -3,3 +3,4 @@ from models.role import Role
 from models.client import Client
 from models.contract import Contract
 from models.event import Event
+from models.payment import Payment
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import (Column, Integer, String, Date, ForeignKey, Index,
+                        Computed)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from datetime import date
 
 from config.config import Base
@@ -17,7 +19,17 @@ class Client(Base):
     last_update_date = Column(Date, default=date.today())
     contact = Column(String)
     user_id = Column(Integer, ForeignKey('users.id'))
+    # Recherche plein texte (calculée par la base, chargée à la demande)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "to_tsvector('simple', coalesce(full_name, '') || ' ' || "
+        "coalesce(company_name, '') || ' ' || coalesce(email, ''))",
+        persisted=True)))
 
     contracts = relationship('Contract', back_populates='client')
     events = relationship('Event', back_populates='client')
     user = relationship('User', back_populates='clients')
+
+    __table_args__ = (
+        Index('ix_clients_search_vector', 'search_vector',
+              postgresql_using='gin'),
+    )
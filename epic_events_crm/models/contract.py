@@ -1,6 +1,7 @@
 import uuid
 
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Numeric
+from sqlalchemy import (Column, Integer, String, Date, ForeignKey, Numeric,
+                        Index, func)
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import date
@@ -13,15 +14,25 @@ class Contract(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, index=True,
                 default=uuid.uuid4)
-    client_id = Column(Integer, ForeignKey('clients.id'))
+    client_id = Column(Integer, ForeignKey('clients.id'), index=True)
     total_amount = Column(Numeric(10, 2))
     paid_amount = Column(Numeric(10, 2))
     remaining_amount = Column(Numeric(10, 2))
     creation_date = Column(Date, default=date.today())
     status = Column(String)
     contact = Column(String)
-    user_id = Column(Integer, ForeignKey('users.id'))
+    user_id = Column(Integer, ForeignKey('users.id'), index=True)
 
     client = relationship('Client', back_populates='contracts')
     user = relationship('User', back_populates='contracts')
     events = relationship('Event', back_populates='contract')
+    payments = relationship('Payment', back_populates='contract',
+                            passive_deletes=True)
+
+    __table_args__ = (
+        # Filtre insensible à la casse : lower(status) = :status
+        Index('ix_contracts_lower_status', func.lower(status)),
+        # Contrats non soldés : remaining_amount != 0
+        Index('ix_contracts_unpaid', id,
+              postgresql_where=(remaining_amount != 0)),
+    )
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import (Column, Integer, String, Date, ForeignKey, Index,
+                        Computed)
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import relationship, deferred
 
 from config.config import Base
 
@@ -10,16 +11,28 @@ class Event(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
-    contract_id = Column(UUID, ForeignKey('contracts.id'))
-    client_id = Column(Integer, ForeignKey('clients.id'))
-    start_date = Column(Date)
-    end_date = Column(Date)
+    contract_id = Column(UUID, ForeignKey('contracts.id'), index=True)
+    client_id = Column(Integer, ForeignKey('clients.id'), index=True)
+    start_date = Column(Date, index=True)
+    end_date = Column(Date, index=True)
     location = Column(String)
     attendees = Column(Integer)
     contact = Column(String)
-    user_id = Column(Integer, ForeignKey('users.id'))
+    user_id = Column(Integer, ForeignKey('users.id'), index=True)
     notes = Column(String)
+    # Recherche plein texte (calculée par la base, chargée à la demande)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "to_tsvector('simple', coalesce(name, '') || ' ' || "
+        "coalesce(location, '') || ' ' || coalesce(notes, ''))",
+        persisted=True)))
 
     client = relationship('Client', back_populates='events')
     contract = relationship('Contract', back_populates='events')
     user = relationship('User', back_populates='events')
+
+    __table_args__ = (
+        # Calendrier : parcours ordonné par date de début (sans tri)
+        Index('ix_events_start_date_id', start_date, id),
+        Index('ix_events_search_vector', 'search_vector',
+              postgresql_using='gin'),
+    )
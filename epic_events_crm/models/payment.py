@@ -0,0 +1,24 @@
+import datetime
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from config.config import Base
+
+
+class Payment(Base):
+    """Registre des paiements : une ligne par paiement, jamais modifiée"""
+    __tablename__ = 'payments'
+
+    id = Column(Integer, primary_key=True, index=True)
+    contract_id = Column(UUID(as_uuid=True),
+                         ForeignKey('contracts.id', ondelete='CASCADE'),
+                         nullable=False, index=True)
+    amount = Column(Numeric(10, 2), nullable=False)
+    paid_at = Column(DateTime(timezone=True), nullable=False,
+                     default=lambda: datetime.datetime.now(
+                         datetime.timezone.utc))
+    user_id = Column(Integer, ForeignKey('users.id'))
+
+    contract = relationship('Contract', back_populates='payments')
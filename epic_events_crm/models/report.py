@@ -0,0 +1,97 @@
+from sqlalchemy import (Table, Column, Integer, String, Date, DateTime,
+                        Numeric, MetaData)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.types import UserDefinedType
+
+
+""" Vues matérialisées du tableau de bord (hors Base.metadata) """
+
+class XID8(UserDefinedType):
+    """Identifiant de transaction PostgreSQL (xid8, PostgreSQL 13+)"""
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "XID8"
+
+
+class PgSnapshot(UserDefinedType):
+    """Instantané de transactions PostgreSQL (pg_snapshot)"""
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "PG_SNAPSHOT"
+
+
+# Métadonnées séparées : create_all ne doit pas créer les vues en tables
+report_metadata = MetaData()
+
+# Contrats par commercial (contracts.user_id)
+report_commercial_totals = Table(
+    'report_commercial_totals', report_metadata,
+    Column('user_id', Integer, primary_key=True),
+    Column('full_name', String),
+    Column('contracts', Integer),
+    Column('total_amount', Numeric(12, 2)),
+    Column('paid_amount', Numeric(12, 2)),
+    Column('remaining_amount', Numeric(12, 2)),
+)
+
+# Montants restant dus par client
+report_client_unpaid = Table(
+    'report_client_unpaid', report_metadata,
+    Column('client_id', Integer, primary_key=True),
+    Column('full_name', String),
+    Column('email', String),
+    Column('company_name', String),
+    Column('unpaid_contracts', Integer),
+    Column('remaining_amount', Numeric(12, 2)),
+)
+
+# Évènements par support (events.user_id)
+report_support_events = Table(
+    'report_support_events', report_metadata,
+    Column('user_id', Integer, primary_key=True),
+    Column('full_name', String),
+    Column('events', Integer),
+    Column('first_start', Date),
+    Column('last_end', Date),
+)
+
+# Évènements sans support (filtre « à venir » appliqué à la lecture)
+report_unassigned_events = Table(
+    'report_unassigned_events', report_metadata,
+    Column('event_id', Integer, primary_key=True),
+    Column('name', String),
+    Column('start_date', Date),
+    Column('end_date', Date),
+    Column('location', String),
+    Column('attendees', Integer),
+    Column('contract_id', UUID(as_uuid=True)),
+    Column('client_name', String),
+)
+
+# Instantané du dernier rafraîchissement de chaque vue (None : jamais)
+report_refresh_state = Table(
+    'report_refresh_state', report_metadata,
+    Column('view_name', String, primary_key=True),
+    Column('snapshot', PgSnapshot),
+    Column('refreshed_at', DateTime(timezone=True)),
+)
+
+# Transactions ayant écrit dans chaque table (une ligne par transaction et
+# par table, sans ligne partagée entre écritures concurrentes). Une vue est
+# obsolète si une écriture est invisible de l'instantané de son
+# rafraîchissement
+report_writes = Table(
+    'report_writes', report_metadata,
+    Column('xid', XID8, primary_key=True),
+    Column('table_name', String, primary_key=True),
+)
+
+# Vues du tableau de bord, dans l'ordre de rafraîchissement
+REPORT_VIEWS = [
+    report_commercial_totals,
+    report_client_unpaid,
+    report_support_events,
+    report_unassigned_events,
+]
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 
 from config.config import Base
 
@@ -12,8 +13,16 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column('password', String)
     role_id = Column(Integer, ForeignKey('roles.id'))
+    # Recherche plein texte (calculée par la base, chargée à la demande)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "to_tsvector('simple', coalesce(full_name, ''))", persisted=True)))
 
     clients = relationship('Client', back_populates='user')
     contracts = relationship('Contract', back_populates='user')
     events = relationship('Event', back_populates='user')
     role = relationship('Role', back_populates='users')
+
+    __table_args__ = (
+        Index('ix_users_search_vector', 'search_vector',
+              postgresql_using='gin'),
+    )
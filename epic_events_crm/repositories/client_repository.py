@@ -1,8 +1,77 @@
 from datetime import date
+from sqlalchemy import insert, select, text
 from sqlalchemy.orm import Session
 
 from models.client import Client
-from models.user import User
+from repositories.report_repository import mark_stale
+from utils.batch_utils import DEFAULT_CHUNK_SIZE, chunked
+from utils.copy_utils import CsvStream, copy_expert
+from utils.query_utils import apaginate, paginate
+from utils.user_directory import user_directory
+
+
+# Table temporaire du chargement rapide (supprimée au commit)
+CLIENT_IMPORT_TABLE = """
+    CREATE TEMP TABLE client_import (
+        line_number integer, full_name text, email text, phone text,
+        company_name text, contact text
+    ) ON COMMIT DROP
+"""
+CLIENT_IMPORT_COLUMNS = ("line_number", "full_name", "email", "phone",
+                         "company_name", "contact")
+# Emails existants : ignorés (comme ClientService.create_client) ou mis à jour
+# s'ils sont suivis par l'importateur (comme ClientService.update_client).
+# Le contact n'est remplacé que s'il est résolu. Statut des lignes écartées
+CLIENT_CONFLICT_ACTIONS = {
+    False: ("DO NOTHING", "rejected"),
+    True: ("""DO UPDATE SET full_name = excluded.full_name,
+        phone = excluded.phone, company_name = excluded.company_name,
+        contact = COALESCE(excluded.contact, clients.contact),
+        user_id = COALESCE(excluded.user_id, clients.user_id),
+        last_update_date = excluded.last_update_date
+        WHERE clients.user_id = :owner_id""", "denied"),
+}
+# Upsert depuis la table temporaire. Première ligne retenue par email, les
+# suivantes sont rejetées ; contact résolu par nom (le plus petit ID).
+# Résultat : (statut, nombre de lignes, lignes rejetées ou refusées)
+CLIENT_UPSERT = """
+    WITH candidates AS (
+        SELECT DISTINCT ON (email) *
+        FROM client_import ORDER BY email, line_number
+    ), upserted AS (
+        INSERT INTO clients (full_name, email, phone, company_name,
+                             contact, user_id, creation_date,
+                             last_update_date)
+        SELECT c.full_name, c.email, c.phone, c.company_name, u.full_name,
+               u.id, current_date, current_date
+        FROM candidates c
+        LEFT JOIN LATERAL (
+            SELECT id, full_name FROM users
+            WHERE full_name = c.contact ORDER BY id LIMIT 1
+        ) u ON true
+        ON CONFLICT (email) {action}
+        RETURNING email, (xmax = 0) AS inserted
+    ), statuses AS (
+        SELECT i.line_number,
+               CASE WHEN i.line_number <> c.line_number THEN 'rejected'
+                    WHEN u.email IS NULL THEN '{skipped}'
+                    WHEN u.inserted THEN 'inserted'
+                    ELSE 'updated' END AS status
+        FROM client_import i
+        JOIN candidates c ON c.email = i.email
+        LEFT JOIN upserted u ON u.email = i.email
+    )
+    SELECT status, count(*),
+           array_agg(line_number) FILTER (WHERE status IN ('rejected',
+                                                           'denied'))
+    FROM statuses GROUP BY status
+"""
+
+
+def client_owned_by(user_id: int, client_id: int):
+    """EXISTS : le client client_id est suivi par user_id"""
+    return select(Client.id).where(Client.id == client_id,
+                                   Client.user_id == user_id).exists()
 
 
 class ClientRepository:
@@ -13,7 +82,7 @@ class ClientRepository:
                       company_name: str, contact: str) -> Client:
         """ Ajoute un nouveau client dans la base de données """
 
-        user = self.db.query(User).filter(User.full_name == contact).first()
+        user = user_directory.get_by_name(self.db, contact)
 
         new_client = Client(
             full_name=full_name,
@@ -25,10 +94,90 @@ class ClientRepository:
         )
 
         self.db.add(new_client)
+        mark_stale(self.db, "clients")
         self.db.commit()
         self.db.refresh(new_client)
         return new_client
 
+    def bulk_create_clients(self, rows,
+                            chunk_size: int = DEFAULT_CHUNK_SIZE) -> list:
+        """
+        Insère des clients par lots (INSERT ... RETURNING), un commit par lot
+        Les contacts sont résolus une seule fois par lot
+        Retourne les IDs des clients créés
+        """
+        created_ids = []
+        for chunk in chunked(rows, chunk_size):
+            contacts = user_directory.resolve_names(
+                self.db, (row.get("contact") for row in chunk)
+                )
+            values = [{
+                "full_name": row["full_name"],
+                "email": row["email"],
+                "phone": row["phone"],
+                "company_name": row["company_name"],
+                "contact": (row.get("contact")
+                            if row.get("contact") in contacts else None),
+                "user_id": contacts.get(row.get("contact")),
+            } for row in chunk]
+
+            result = self.db.execute(
+                insert(Client).returning(Client.id), values
+                )
+            created_ids.extend(result.scalars())
+            mark_stale(self.db, "clients")
+            self.db.commit()
+        return created_ids
+
+    def copy_upsert_clients(self, rows,
+                            owner_id: int = None) -> dict:
+        """
+        Chargement rapide : les lignes validées sont envoyées en flux dans
+        une table temporaire (COPY FROM STDIN) puis insérées en une requête
+        (ON CONFLICT (email)). owner_id : met à jour les clients existants
+        suivis par cet utilisateur au lieu de rejeter la ligne ; les autres
+        sont refusés
+        rows : itérable de (numéro de ligne, données validées)
+        Retourne {"inserted": n, "updated": n, "rejected": [lignes],
+        "denied": [lignes]}
+        """
+        self.db.execute(text(CLIENT_IMPORT_TABLE))
+        copy_expert(
+            self.db,
+            f"COPY client_import ({', '.join(CLIENT_IMPORT_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (company_name))",
+            CsvStream((line_number, *(data.get(name) for name
+                                      in CLIENT_IMPORT_COLUMNS[1:]))
+                      for line_number, data in rows))
+
+        summary = {"inserted": 0, "updated": 0, "rejected": [], "denied": []}
+        action, skipped = CLIENT_CONFLICT_ACTIONS[owner_id is not None]
+        statement = text(CLIENT_UPSERT.format(action=action, skipped=skipped))
+        if owner_id is not None:
+            statement = statement.bindparams(owner_id=owner_id)
+        for status, count, lines in self.db.execute(statement):
+            if status in ("rejected", "denied"):
+                summary[status] = sorted(lines)
+            else:
+                summary[status] = count
+        mark_stale(self.db, "clients")
+        self.db.commit()
+        return summary
+
+    def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """ Retourne les emails déjà utilisés parmi ceux fournis """
+        if not emails:
+            return set()
+        return {email for (email,) in self.db.query(Client.email).filter(
+            Client.email.in_(emails))}
+
+    def is_owned_by(self, user_id: int, client_id: int = None) -> bool:
+        """ Vérifie la responsabilité sur un client (une requête EXISTS) """
+        if not client_id:
+            return False
+        return bool(self.db.scalar(select(client_owned_by(user_id,
+                                                          client_id))))
+
     def get_client_by_id(self, client_id: int) -> Client:
         """ Récupère un client par son ID """
         return self.db.query(Client).filter(Client.id == client_id).first()
@@ -37,9 +186,12 @@ class ClientRepository:
         """ Récupère un client par son adresse email """
         return self.db.query(Client).filter(Client.email == email).first()
 
-    def get_client_by_name(self, full_name: str) -> User:
-        """ Récupère un utilisateur par son nom complet. """
-        return self.db.query(Client).filter(Client.full_name == full_name).all()  # noqa: E501
+    def get_client_by_name(self, full_name: str, after_id: int = None,
+                           limit: int = None,
+                           stream: bool = False) -> list[Client]:
+        """ Récupère les clients par leur nom complet (paginé). """
+        query = self.db.query(Client).filter(Client.full_name == full_name)
+        return paginate(query, Client.id, after_id, limit, stream)
 
     def update_client(self, client_id: int, full_name: str = None,
                       email: str = None, phone: str = None,
@@ -60,11 +212,11 @@ class ClientRepository:
                 client.company_name = company_name
             if contact:
                 client.contact = contact
-                user = self.db.query(User).filter(
-                    User.full_name == contact).first()
+                user = user_directory.get_by_name(self.db, contact)
                 client.user_id = user.id if user else None
 
             client.last_update_date = date.today()
+            mark_stale(self.db, "clients")
             self.db.commit()
             self.db.refresh(client)
         return client
@@ -74,6 +226,32 @@ class ClientRepository:
         client = self.get_client_by_id(client_id)
         if client:
             self.db.delete(client)
+            mark_stale(self.db, "clients")
             self.db.commit()
             return True
         return False
+
+
+class AsyncClientRepository:
+    """
+    Équivalent asynchrone des lectures de ClientRepository (AsyncSession)
+    Une session par opération (appels concurrents possibles)
+    """
+    def __init__(self, session_factory):
+        self.sessions = session_factory
+
+    async def get_client_by_id(self, client_id: int) -> Client:
+        async with self.sessions() as session:
+            return await session.get(Client, client_id)
+
+    async def get_client_by_email(self, email: str) -> Client:
+        async with self.sessions() as session:
+            return await session.scalar(
+                select(Client).where(Client.email == email))
+
+    async def get_client_by_name(self, full_name: str, after_id: int = None,
+                                 limit: int = None) -> list[Client]:
+        async with self.sessions() as session:
+            return await apaginate(
+                session, select(Client).where(Client.full_name == full_name),
+                Client.id, after_id, limit)
@@ -1,9 +1,102 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
+from models.client import Client
 from models.contract import Contract
-from models.user import User
-from sqlalchemy import func
+from models.payment import Payment
+from utils.user_directory import user_directory
+from sqlalchemy import func, insert, or_, select, update
 from decimal import Decimal
 
+from repositories.client_repository import client_owned_by
+from repositories.report_repository import mark_stale, stale_statement
+from utils.batch_utils import DEFAULT_CHUNK_SIZE, chunked
+from utils.query_utils import (RowDTO, apaginate, execute_stream,
+                               fetch_dtos, paginate, project)
+
+
+# Profils de chargement : relations chargées avec les contrats
+LOAD_PROFILES = {
+    # Affichage en liste : client du contrat
+    "listing": lambda: [
+        joinedload(Contract.client),
+    ],
+    # Affichage détaillé : ajoute le commercial et les évènements
+    "detail": lambda: [
+        joinedload(Contract.client),
+        joinedload(Contract.user),
+        selectinload(Contract.events),
+    ],
+}
+
+# Colonnes restituées par get_contract_rows (rendu --format, export)
+CONTRACT_FIELDS = {
+    "id": Contract.id,
+    "client": Client.full_name,
+    "client_email": Client.email,
+    "company_name": Client.company_name,
+    "contact": Contract.contact,
+    "total_amount": Contract.total_amount,
+    "paid_amount": Contract.paid_amount,
+    "remaining_amount": Contract.remaining_amount,
+    "creation_date": Contract.creation_date,
+    "status": Contract.status,
+}
+CONTRACT_JOINS = {Client: ((Client, Client.id == Contract.client_id),)}
+
+
+class ContractListing(RowDTO):
+    """Contrat et coordonnées du client (affichage en liste)"""
+    __slots__ = ("id", "client_name", "client_email", "client_phone",
+                 "company_name", "contact", "total_amount", "paid_amount",
+                 "remaining_amount", "creation_date", "status")
+    COLUMNS = (Contract.id, Client.full_name, Client.email, Client.phone,
+               Client.company_name, Contract.contact, Contract.total_amount,
+               Contract.paid_amount, Contract.remaining_amount,
+               Contract.creation_date, Contract.status)
+
+
+# Options d'exécution de l'UPDATE ... RETURNING d'un paiement
+PAYMENT_EXECUTION_OPTIONS = {"synchronize_session": "fetch",
+                             "populate_existing": True}
+
+
+def contract_filters(contract_id: str = None,
+                     user_id: int = None,
+                     client_id: int = None,
+                     status: str = None,
+                     remaining_amount: bool = False) -> list:
+    """Critères de filtre des contrats (requêtes sync et async)"""
+    criteria = []
+    if contract_id:
+        criteria.append(Contract.id == contract_id)
+    if user_id:
+        criteria.append(Contract.user_id == user_id)
+    if client_id:
+        criteria.append(Contract.client_id == client_id)
+    if status:
+        criteria.append(func.lower(Contract.status) == status.lower())
+    if remaining_amount:
+        criteria.append(Contract.remaining_amount != 0)
+    return criteria
+
+
+def payment_statement(contract_id, amount: Decimal):
+    """
+    UPDATE ... SET paid_amount = paid_amount + :x,
+    remaining_amount = total_amount - (paid_amount + :x) RETURNING contrat
+    """
+    new_paid_amount = func.coalesce(Contract.paid_amount, 0) + amount
+    return (update(Contract)
+            .where(Contract.id == contract_id)
+            .values(paid_amount=new_paid_amount,
+                    remaining_amount=Contract.total_amount - new_paid_amount)
+            .returning(Contract))
+
+
+def contract_owned_by(user_id: int, contract_id):
+    """EXISTS : le contrat contract_id est suivi par user_id"""
+    return select(Contract.id).where(Contract.id == contract_id,
+                                     Contract.user_id == user_id).exists()
+
 
 class ContractRepository:
     def __init__(self, db_session: Session):
@@ -13,7 +106,7 @@ class ContractRepository:
                         status: str, contact: str) -> Contract:
         """Ajoute un nouveau contrat dans la base de données."""
 
-        user = self.db.query(User).filter(User.full_name == contact).first()
+        user = user_directory.get_by_name(self.db, contact)
 
         new_contract = Contract(
             client_id=client_id,
@@ -26,68 +119,269 @@ class ContractRepository:
         )
 
         self.db.add(new_contract)
+        mark_stale(self.db, "contracts")
         self.db.commit()
         self.db.refresh(new_contract)
         return new_contract
 
+    def bulk_create_contracts(self, rows,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE) -> list:
+        """
+        Insère des contrats par lots (INSERT ... RETURNING), un commit par lot
+        Les contacts sont résolus une seule fois par lot
+        Retourne les UUID des contrats créés
+        """
+        created_ids = []
+        for chunk in chunked(rows, chunk_size):
+            contacts = user_directory.resolve_names(
+                self.db, (row.get("contact") for row in chunk)
+                )
+            values = [{
+                "client_id": row["client_id"],
+                "total_amount": row["total_amount"],
+                "paid_amount": 0.0,
+                "remaining_amount": row["total_amount"],
+                "status": row["status"],
+                "contact": row.get("contact"),
+                "user_id": contacts.get(row.get("contact")),
+            } for row in chunk]
+
+            result = self.db.execute(
+                insert(Contract).returning(Contract.id), values
+                )
+            created_ids.extend(result.scalars())
+            mark_stale(self.db, "contracts")
+            self.db.commit()
+        return created_ids
+
+    def build_query(self, contract_id: str = None,
+                    user_id: int = None,
+                    client_id: int = None,
+                    status: str = None,
+                    remaining_amount: bool = False):
+        """Construit la requête filtrée des contrats, sans l'exécuter"""
+
+        return self.db.query(Contract).filter(*contract_filters(
+            contract_id, user_id, client_id, status, remaining_amount))
+
+    def is_owned_by(self, user_id: int, contract_id: str = None,
+                    client_id: int = None) -> bool:
+        """
+        Vérifie la responsabilité sur le contrat ou son client
+        (une seule requête EXISTS)
+        """
+        clauses = []
+        if contract_id:
+            clauses.append(contract_owned_by(user_id, contract_id))
+        if client_id:
+            clauses.append(client_owned_by(user_id, client_id))
+        if not clauses:
+            return False
+        return bool(self.db.scalar(select(or_(*clauses))))
+
     def get_contracts(self, contract_id: str = None,
                       user_id: int = None,
                       client_id: int = None,
                       status: str = None,
-                      remaining_amount: bool = False
+                      remaining_amount: bool = False,
+                      profile: str = None,
+                      after_id: str = None,
+                      limit: int = None,
+                      stream: bool = False
                       ) -> list[Contract]:
-        """Récupère les contrats en fonction des filtres fournis"""
+        """
+        Récupère les contrats en fonction des filtres fournis
+        profile : profil de chargement des relations (cf. LOAD_PROFILES)
+        after_id, limit : pagination par curseur sur l'UUID
+        stream : retourne un générateur au lieu d'une liste
+        """
 
-        query = self.db.query(Contract)
+        query = self.build_query(contract_id, user_id, client_id, status,
+                                 remaining_amount)
+        if profile:
+            query = query.options(*LOAD_PROFILES[profile]())
 
-        if contract_id:
-            query = query.filter(Contract.id == contract_id)
-        if user_id:
-            query = query.filter(Contract.user_id == user_id)
-        if client_id:
-            query = query.filter(Contract.client_id == client_id)
-        if status:
-            query = query.filter(func.lower(Contract.status) == status.lower())
-        if remaining_amount:
-            query = query.filter(Contract.remaining_amount != 0)
+        return paginate(query, Contract.id, after_id, limit, stream)
 
-        return query.all()
+    def get_contract_listing(self, contract_id: str = None,
+                             user_id: int = None,
+                             client_id: int = None,
+                             status: str = None,
+                             remaining_amount: bool = False,
+                             after_id: str = None,
+                             limit: int = None,
+                             stream: bool = False) -> list[ContractListing]:
+        """
+        Contrats filtrés en DTO : une requête avec jointure sur le client,
+        sans objets ORM ni identity map (lecture seule)
+        """
+        statement = (ContractListing.select().select_from(Contract)
+                     .outerjoin(Client, Client.id == Contract.client_id)
+                     .where(*contract_filters(contract_id, user_id,
+                                              client_id, status,
+                                              remaining_amount)))
+        return fetch_dtos(self.db, statement, ContractListing, Contract.id,
+                          after_id, limit, stream)
+
+    def get_contract_rows(self, fields: list[str] = None,
+                          after_id: str = None, limit: int = None,
+                          **filters):
+        """
+        Lignes (colonnes fields de CONTRACT_FIELDS, toutes par défaut) des
+        contrats filtrés, sans objets ORM. Requête exécutée à l'appel,
+        Result lu par lots
+        filters : filtres de build_query
+        """
+        query = project(self.build_query(**filters), CONTRACT_FIELDS,
+                        fields or list(CONTRACT_FIELDS), CONTRACT_JOINS)
+        return execute_stream(self.db, query, Contract.id, after_id, limit)
 
     def update_contract(self, contract: Contract,
                         total_amount: float = None,
                         paid_amount: float = None,
                         status: str = None,
-                        contact: str = None) -> Contract:
-        """Met à jour les informations d'un contrat."""
+                        contact: str = None,
+                        user_id: int = None) -> Contract:
+        """
+        Met à jour les informations d'un contrat et enregistre le paiement
+        paid_amount (attribué à user_id), dans une seule transaction.
+        Retourne le contrat mis à jour, None s'il n'existe plus
+        """
 
         if total_amount is not None:
             contract.total_amount = Decimal(str(total_amount))
+            # Calculé par la base : n'écrase pas un paiement concurrent
             contract.remaining_amount = (
-                contract.total_amount - contract.paid_amount
-                )
-        if paid_amount is not None:
-            contract.paid_amount += Decimal(str(paid_amount))
-            contract.remaining_amount = (
-                contract.total_amount - contract.paid_amount
+                contract.total_amount - Contract.paid_amount
                 )
         if status is not None:
             contract.status = status
         if contact is not None:
-            user = self.db.query(User).filter(
-                User.email == contact
-                ).first()
+            user = user_directory.get_by_email(self.db, contact)
             contract.contact = contact
             contract.user_id = user.id if user else None
 
+        if paid_amount is not None:
+            # Montant total écrit avant le paiement (remaining_amount)
+            self.db.flush()
+            contract = self._add_payment(contract.id, paid_amount, user_id)
+            if contract is None:
+                self.db.rollback()
+                return None
+        mark_stale(self.db, "contracts")
         self.db.commit()
         self.db.refresh(contract)
         return contract
 
+    def _add_payment(self, contract_id, amount: float,
+                     user_id: int = None) -> Contract:
+        """
+        UPDATE ... RETURNING et ligne du registre, dans la transaction
+        courante (sans commit). Retourne le contrat, None s'il n'existe pas
+        """
+        amount = Decimal(str(amount))
+        contract = self.db.scalars(
+            payment_statement(contract_id, amount),
+            execution_options=PAYMENT_EXECUTION_OPTIONS
+        ).first()
+        if contract is not None:
+            self.db.execute(insert(Payment).values(
+                contract_id=contract.id, amount=amount, user_id=user_id
+                ))
+        return contract
+
+    def record_payment(self, contract_id, amount: float,
+                       user_id: int = None) -> Contract:
+        """
+        Enregistre un paiement en une seule requête UPDATE ... RETURNING
+        (sans lecture préalable ni perte de mise à jour concurrente)
+        et l'ajoute au registre des paiements, dans la même transaction.
+        Retourne le contrat mis à jour, None s'il n'existe pas
+        """
+        contract = self._add_payment(contract_id, amount, user_id)
+        if contract is None:
+            self.db.rollback()
+            return None
+
+        mark_stale(self.db, "contracts")
+        self.db.commit()
+        return contract
+
+    def get_payments(self, contract_id, after_id: int = None,
+                     limit: int = None) -> list[Payment]:
+        """Récupère les paiements d'un contrat (registre, paginé)"""
+        query = self.db.query(Payment).filter(
+            Payment.contract_id == contract_id)
+        return paginate(query, Payment.id, after_id, limit)
+
+    def get_ledger_balances(self, unpaid_only: bool = True) -> list:
+        """
+        Soldes calculés depuis le registre, sans verrou sur les contrats :
+        (contract_id, total_amount, total payé, reste dû)
+        """
+        paid = func.coalesce(func.sum(Payment.amount), 0)
+        query = self.db.query(
+            Contract.id, Contract.total_amount, paid.label("paid"),
+            (Contract.total_amount - paid).label("remaining")
+            ).outerjoin(Payment, Payment.contract_id == Contract.id
+                        ).group_by(Contract.id, Contract.total_amount)
+        if unpaid_only:
+            query = query.having(Contract.total_amount - paid != 0)
+        return query.order_by(Contract.id).all()
+
     def delete_contract(self, contract_id: str) -> bool:
         """Supprime un contrat par son ID."""
         contract = self.get_contracts(contract_id)[0]
         if contract:
             self.db.delete(contract)
+            mark_stale(self.db, "contracts")
             self.db.commit()
             return True
         return False
+
+
+class AsyncContractRepository:
+    """
+    Équivalent asynchrone de ContractRepository (AsyncSession / asyncpg)
+    Une session par opération (appels concurrents possibles)
+    """
+    def __init__(self, session_factory):
+        self.sessions = session_factory
+
+    async def get_contracts(self, contract_id: str = None,
+                            user_id: int = None,
+                            client_id: int = None,
+                            status: str = None,
+                            remaining_amount: bool = False,
+                            profile: str = None,
+                            after_id: str = None,
+                            limit: int = None) -> list[Contract]:
+        """Récupère les contrats filtrés (cf. ContractRepository)"""
+        statement = select(Contract).where(*contract_filters(
+            contract_id, user_id, client_id, status, remaining_amount))
+        if profile:
+            statement = statement.options(*LOAD_PROFILES[profile]())
+
+        async with self.sessions() as session:
+            return await apaginate(session, statement, Contract.id,
+                                   after_id, limit)
+
+    async def record_payment(self, contract_id, amount: float,
+                             user_id: int = None) -> Contract:
+        """Paiement atomique et registre (cf. ContractRepository)"""
+        amount = Decimal(str(amount))
+        async with self.sessions() as session:
+            result = await session.scalars(
+                payment_statement(contract_id, amount),
+                execution_options=PAYMENT_EXECUTION_OPTIONS)
+            contract = result.first()
+            if contract is None:
+                await session.rollback()
+                return None
+
+            await session.execute(insert(Payment).values(
+                contract_id=contract.id, amount=amount, user_id=user_id
+                ))
+            await session.execute(stale_statement("contracts"))
+            await session.commit()
+            return contract
@@ -0,0 +1,240 @@
+import csv
+import io
+import os
+from sqlalchemy import Date, DateTime, Integer, Numeric, select, text
+from sqlalchemy.orm import Session
+
+from config.config import Base
+from models import user, client, contract, event, payment  # noqa: F401
+from models.role import role_permissions
+from repositories.report_repository import STALE_ON_WRITE, mark_stale
+from utils.copy_utils import EXPORT_CHUNK_SIZE, copy_expert
+from utils.user_directory import user_directory
+
+
+# Tables du jeu de données, dans l'ordre des clés étrangères (import)
+DATASET_TABLES = ["roles", "permissions", "role_permissions", "users",
+                  "clients", "contracts", "payments", "events"]
+
+
+def get_table(name: str):
+    """Table du jeu de données (role_permissions n'a pas de modèle)"""
+    if name == "role_permissions":
+        return role_permissions
+    return Base.metadata.tables[name]
+
+
+def stored_columns(table) -> list:
+    """
+    Colonnes exportées : les colonnes calculées (search_vector) sont
+    recalculées par la base à l'import
+    """
+    return [column for column in table.columns if column.computed is None]
+
+
+def dataset_path(directory: str, table_name: str, file_format: str) -> str:
+    return os.path.join(directory, f"{table_name}.{file_format}")
+
+
+def open_private(path: str, mode: str = "w", **kwargs):
+    """
+    Ouvre path en écriture, lisible par le seul propriétaire (0600) :
+    l'export contient les empreintes des mots de passe
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    # Fichier existant : os.open ne modifie pas ses droits
+    os.fchmod(fd, 0o600)
+    return os.fdopen(fd, mode, **kwargs)
+
+
+def import_pyarrow():
+    """pyarrow est optionnel : requis uniquement pour le format Parquet"""
+    try:
+        import pyarrow
+        import pyarrow.csv  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Le format Parquet nécessite pyarrow "
+                           "(pip install pyarrow)")
+    return pyarrow
+
+
+def arrow_type(pa, column):
+    """Type Arrow d'une colonne (UUID et textes en chaînes)"""
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Numeric):
+        return pa.decimal128(column.type.precision or 38,
+                             column.type.scale or 0)
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+    if isinstance(column.type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+class DatasetRepository:
+    """
+    Export et import de l'ensemble des données du CRM, une table par
+    fichier. CSV : COPY ... TO/FROM STDIN (psycopg2). Parquet : lecture
+    par curseur serveur et chargement par COPY de chaque lot
+    """
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def export_dataset(self, directory: str, file_format: str = "csv",
+                       chunk_size: int = EXPORT_CHUNK_SIZE) -> dict:
+        """
+        Exporte chaque table dans directory/<table>.<format>, dans un
+        instantané cohérent (transaction REPEATABLE READ en lecture seule)
+        Retourne {table: nombre de lignes}
+        """
+        if file_format == "parquet":
+            import_pyarrow()
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self.db.connection(execution_options={
+            "isolation_level": "REPEATABLE READ"})
+        self.db.execute(text("SET TRANSACTION READ ONLY"))
+
+        counts = {}
+        try:
+            for name in DATASET_TABLES:
+                path = dataset_path(directory, name, file_format)
+                if file_format == "parquet":
+                    counts[name] = self._export_parquet(name, path,
+                                                        chunk_size)
+                else:
+                    counts[name] = self._export_csv(name, path)
+        finally:
+            self.db.rollback()
+        return counts
+
+    def _export_csv(self, table_name: str, path: str) -> int:
+        """COPY (SELECT ...) TO STDOUT : le serveur produit le CSV"""
+        table = get_table(table_name)
+        names = ", ".join(column.name for column in stored_columns(table))
+        keys = ", ".join(column.name for column in table.primary_key)
+        with open_private(path, "w", encoding="utf-8",
+                          newline="") as file:
+            return copy_expert(
+                self.db,
+                f"COPY (SELECT {names} FROM {table_name} ORDER BY {keys}) "
+                "TO STDOUT WITH (FORMAT csv, HEADER)", file)
+
+    def _export_parquet(self, table_name: str, path: str,
+                        chunk_size: int) -> int:
+        """Lecture par lots (curseur serveur), un groupe de lignes par lot"""
+        pa = import_pyarrow()
+        table = get_table(table_name)
+        columns = stored_columns(table)
+        schema = pa.schema([(column.name, arrow_type(pa, column))
+                            for column in columns])
+        # Valeurs converties en chaînes pour les colonnes texte (UUID)
+        as_text = [pa.types.is_string(field.type) for field in schema]
+
+        result = self.db.execute(
+            select(*columns).order_by(*table.primary_key.columns),
+            execution_options={"yield_per": chunk_size})
+        count = 0
+        with open_private(path, "wb") as file, \
+                pa.parquet.ParquetWriter(file, schema) as writer:
+            for rows in result.partitions():
+                arrays = [
+                    pa.array([None if value is None else str(value)
+                              for value in values] if text_column
+                             else list(values), type=field.type)
+                    for values, field, text_column
+                    in zip(zip(*rows), schema, as_text)
+                    ]
+                writer.write_batch(pa.record_batch(arrays, schema=schema))
+                count += len(rows)
+        return count
+
+    def missing_files(self, directory: str, file_format: str) -> list[str]:
+        """Fichiers du jeu de données absents de directory"""
+        return [path for path in (dataset_path(directory, name, file_format)
+                                  for name in DATASET_TABLES)
+                if not os.path.exists(path)]
+
+    def import_dataset(self, directory: str, file_format: str = "csv",
+                       chunk_size: int = EXPORT_CHUNK_SIZE) -> dict:
+        """
+        Remplace les données par celles de directory (cf. export_dataset),
+        en une transaction : TRUNCATE puis COPY ... FROM STDIN de chaque
+        table dans l'ordre des clés étrangères. Les identifiants (dont les
+        UUID des contrats) sont conservés et les séquences recalées
+        Retourne {table: nombre de lignes}
+        """
+        missing = self.missing_files(directory, file_format)
+        if missing:
+            raise ValueError(f"Fichier(s) absent(s) : {', '.join(missing)}")
+        if file_format == "parquet":
+            import_pyarrow()
+
+        counts = {}
+        try:
+            self.db.execute(text(
+                f"TRUNCATE {', '.join(DATASET_TABLES)} "
+                "RESTART IDENTITY CASCADE"))
+            for name in DATASET_TABLES:
+                path = dataset_path(directory, name, file_format)
+                if file_format == "parquet":
+                    counts[name] = self._import_parquet(name, path,
+                                                        chunk_size)
+                else:
+                    counts[name] = self._import_csv(name, path)
+                self._reset_sequence(name)
+            for name in STALE_ON_WRITE:
+                mark_stale(self.db, name)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        # Utilisateurs remplacés : identifiants en cache obsolètes
+        user_directory.clear()
+        return counts
+
+    def _copy_from(self, table_name: str, names: list[str], file) -> int:
+        """COPY table (colonnes) FROM STDIN d'un flux CSV sans en-tête"""
+        allowed = {column.name
+                   for column in stored_columns(get_table(table_name))}
+        unknown = set(names) - allowed
+        if unknown:
+            raise ValueError(f"{table_name} : colonne(s) inconnue(s) : "
+                             f"{', '.join(sorted(unknown))}")
+        return copy_expert(self.db,
+                           f"COPY {table_name} ({', '.join(names)}) "
+                           "FROM STDIN WITH (FORMAT csv)", file)
+
+    def _import_csv(self, table_name: str, path: str) -> int:
+        """Colonnes lues dans l'en-tête, le reste du fichier est copié"""
+        with open(path, encoding="utf-8", newline="") as file:
+            header = next(csv.reader([file.readline()]), [])
+            if not header:
+                return 0
+            return self._copy_from(table_name, header, file)
+
+    def _import_parquet(self, table_name: str, path: str,
+                        chunk_size: int) -> int:
+        """Chaque lot Parquet est converti en CSV puis chargé par COPY"""
+        pa = import_pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        names = parquet_file.schema_arrow.names
+        options = pa.csv.WriteOptions(include_header=False)
+        count = 0
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            buffer = io.BytesIO()
+            pa.csv.write_csv(batch, buffer, options)
+            buffer.seek(0)
+            self._copy_from(table_name, names, buffer)
+            count += batch.num_rows
+        return count
+
+    def _reset_sequence(self, table_name: str):
+        """Recale la séquence d'un identifiant entier sur le maximum importé"""
+        id_column = get_table(table_name).c.get("id")
+        if id_column is None or not isinstance(id_column.type, Integer):
+            return
+        self.db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+            f"coalesce(max(id), 1), max(id) IS NOT NULL) FROM {table_name}"))
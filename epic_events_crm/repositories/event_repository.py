@@ -1,8 +1,131 @@
-from sqlalchemy.orm import Session
-from datetime import datetime
+from sqlalchemy import insert, literal, or_, select
+from sqlalchemy.orm import Session, joinedload
+from datetime import date, datetime
 
+from models.client import Client
+from models.contract import Contract
 from models.event import Event
 from models.user import User
+from repositories.client_repository import client_owned_by
+from repositories.contract_repository import contract_owned_by
+from repositories.report_repository import mark_stale, stale_statement
+from utils.batch_utils import DEFAULT_CHUNK_SIZE, chunked
+from utils.query_utils import (RowDTO, apaginate, execute_stream,
+                               fetch_dtos, paginate, project,
+                               stream_query)
+
+
+# Profils de chargement : relations chargées avec les évènements
+LOAD_PROFILES = {
+    # Affichage en liste : contrat et client du contrat
+    "listing": lambda: [
+        joinedload(Event.contract).joinedload(Contract.client),
+    ],
+    # Affichage détaillé : ajoute le contact support
+    "detail": lambda: [
+        joinedload(Event.contract).joinedload(Contract.client),
+        joinedload(Event.user),
+    ],
+}
+
+# Colonnes restituées par get_event_rows (rendu --format, export)
+EVENT_FIELDS = {
+    "id": Event.id,
+    "name": Event.name,
+    "contract_id": Event.contract_id,
+    "client": Client.full_name,
+    "client_email": Client.email,
+    "start_date": Event.start_date,
+    "end_date": Event.end_date,
+    "location": Event.location,
+    "attendees": Event.attendees,
+    "contact": Event.contact,
+    "notes": Event.notes,
+}
+# Client du contrat, comme EventListing et le profil listing
+EVENT_JOINS = {Client: ((Contract, Contract.id == Event.contract_id),
+                        (Client, Client.id == Contract.client_id))}
+
+
+class EventListing(RowDTO):
+    """Évènement et client de son contrat (affichage en liste)"""
+    __slots__ = ("id", "name", "contract_id", "client_name", "client_email",
+                 "client_phone", "start_date", "end_date", "contact",
+                 "location", "attendees", "notes")
+    COLUMNS = (Event.id, Event.name, Event.contract_id, Client.full_name,
+               Client.email, Client.phone, Event.start_date, Event.end_date,
+               Event.contact, Event.location, Event.attendees, Event.notes)
+
+
+def event_filters(event_id: int = None,
+                  contract_id: str = None,
+                  client_id: int = None,
+                  user_id: int = None,
+                  start_date: datetime = None,
+                  end_date: datetime = None,
+                  no_user: bool = False,
+                  start_from: date = None,
+                  start_to: date = None,
+                  overlaps: tuple = None) -> list:
+    """
+    Critères de filtre des évènements (requêtes sync et async)
+    start_from, start_to : évènements commençant dans l'intervalle (bornes
+    incluses, index ix_events_start_date)
+    overlaps : (début, fin) évènements en cours sur la période, bornes
+    incluses, l'une ou l'autre pouvant être None
+    """
+    criteria = []
+    if event_id:
+        criteria.append(Event.id == event_id)
+    if contract_id:
+        criteria.append(Event.contract_id == contract_id)
+    if client_id:
+        criteria.append(Event.client_id == client_id)
+    if user_id:
+        criteria.append(Event.user_id == user_id)
+    if start_date:
+        criteria.append(Event.start_date == start_date)
+    if end_date:
+        criteria.append(Event.end_date == end_date)
+    if no_user:
+        criteria.append(Event.user_id.is_(None))
+    if start_from:
+        criteria.append(Event.start_date >= start_from)
+    if start_to:
+        criteria.append(Event.start_date <= start_to)
+    if overlaps:
+        window_start, window_end = overlaps
+        if window_end:
+            criteria.append(Event.start_date <= window_end)
+        if window_start:
+            criteria.append(Event.end_date >= window_start)
+    return criteria
+
+
+def event_owned_by(user_id: int, event_id: int):
+    """
+    EXISTS : l'évènement event_id est suivi par user_id, directement ou
+    via son contrat
+    """
+    return (select(Event.id)
+            .outerjoin(Contract, Contract.id == Event.contract_id)
+            .where(Event.id == event_id,
+                   or_(Event.user_id == user_id,
+                       Contract.user_id == user_id))
+            .exists())
+
+
+def ownership_clauses(user_id: int, event_id: int = None,
+                      contract_id=None, client_id: int = None) -> list:
+    """Clauses EXISTS des objets fournis (responsable de l'un d'eux)"""
+    clauses = []
+    if event_id:
+        clauses.append(event_owned_by(user_id, event_id))
+    if contract_id:
+        clauses.append(contract_owned_by(user_id, contract_id))
+    if client_id:
+        clauses.append(client_owned_by(user_id, client_id))
+    return clauses
 
 
 class EventRepository:
@@ -29,10 +152,72 @@ class EventRepository:
         )
 
         self.db.add(new_event)
+        mark_stale(self.db, "events")
         self.db.commit()
         self.db.refresh(new_event)
         return new_event
 
+    def is_owned_by(self, user_id: int, event_id: int = None,
+                    contract_id=None, client_id: int = None) -> bool:
+        """
+        Vérifie la responsabilité sur l'évènement, le contrat ou le client
+        (une seule requête EXISTS sur les colonnes user_id indexées)
+        """
+        clauses = ownership_clauses(user_id, event_id, contract_id,
+                                    client_id)
+        if not clauses:
+            return False
+        return bool(self.db.scalar(select(or_(*clauses))))
+
+    def resolve_references(self, contract_id, client_id: int,
+                           user_id: int) -> tuple:
+        """
+        Charge en une seule requête le contrat, le client et l'utilisateur
+        référencés par un évènement (LEFT OUTER JOIN depuis une ligne
+        unique). Retourne (contract, client, user), None pour un absent
+        """
+        anchor = select(literal(1).label("anchor")).subquery()
+        return tuple(
+            self.db.query(Contract, Client, User)
+            .select_from(anchor)
+            .outerjoin(Contract, Contract.id == contract_id)
+            .outerjoin(Client, Client.id == client_id)
+            .outerjoin(User, User.id == user_id)
+            .one()
+            )
+
+    def bulk_create_events(self, rows,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE) -> list:
+        """
+        Insère des évènements par lots (INSERT ... RETURNING), un commit
+        par lot. Retourne les IDs des évènements créés
+        """
+        created_ids = []
+        for chunk in chunked(rows, chunk_size):
+            result = self.db.execute(
+                insert(Event).returning(Event.id), list(chunk)
+                )
+            created_ids.extend(result.scalars())
+            mark_stale(self.db, "events")
+            self.db.commit()
+        return created_ids
+
+    def build_query(self, event_id: int = None,
+                    contract_id: str = None,
+                    client_id: int = None,
+                    user_id: int = None,
+                    start_date: datetime = None,
+                    end_date: datetime = None,
+                    no_user: bool = False,
+                    start_from: date = None,
+                    start_to: date = None,
+                    overlaps: tuple = None):
+        """Construit la requête filtrée des évènements, sans l'exécuter"""
+
+        return self.db.query(Event).filter(*event_filters(
+            event_id, contract_id, client_id, user_id, start_date, end_date,
+            no_user, start_from, start_to, overlaps))
+
     def get_events(self, event_id: int = None,
                    contract_id: str = None,
                    client_id: int = None,
@@ -40,27 +225,71 @@ class EventRepository:
                    start_date: datetime = None,
                    end_date: datetime = None,
                    no_user: bool = False,
+                   profile: str = None,
+                   after_id: int = None,
+                   limit: int = None,
+                   stream: bool = False,
+                   start_from: date = None,
+                   start_to: date = None,
+                   overlaps: tuple = None,
                    ) -> list[Event]:
-        """Récupère les évènements en fonction des filtres fournis"""
-
-        query = self.db.query(Event)
-
-        if event_id:
-            query = query.filter(Event.id == event_id)
-        if contract_id:
-            query = query.filter(Event.contract_id == contract_id)
-        if client_id:
-            query = query.filter(Event.client_id == client_id)
-        if user_id:
-            query = query.filter(Event.user_id == user_id)
-        if start_date:
-            query = query.filter(Event.start_date == start_date)
-        if end_date:
-            query = query.filter(Event.end_date == end_date)
-        if no_user:
-            query = query.filter(Event.user_id.is_(None))
-
-        return query.all()
+        """
+        Récupère les évènements en fonction des filtres fournis
+        profile : profil de chargement des relations (cf. LOAD_PROFILES)
+        after_id, limit : pagination par curseur sur l'ID
+        stream : retourne un générateur au lieu d'une liste
+        start_from, start_to, overlaps : filtres de période (event_filters)
+        """
+
+        query = self.build_query(event_id, contract_id, client_id, user_id,
+                                 start_date, end_date, no_user, start_from,
+                                 start_to, overlaps)
+        if profile:
+            query = query.options(*LOAD_PROFILES[profile]())
+
+        return paginate(query, Event.id, after_id, limit, stream)
+
+    def get_event_listing(self, after_id: int = None, limit: int = None,
+                          stream: bool = False,
+                          **filters) -> list[EventListing]:
+        """
+        Évènements filtrés en DTO : une requête avec jointures sur le
+        contrat et son client, sans objets ORM ni identity map
+        filters : filtres de event_filters
+        """
+        statement = (EventListing.select().select_from(Event)
+                     .outerjoin(Contract, Contract.id == Event.contract_id)
+                     .outerjoin(Client, Client.id == Contract.client_id)
+                     .where(*event_filters(**filters)))
+        return fetch_dtos(self.db, statement, EventListing, Event.id,
+                          after_id, limit, stream)
+
+    def get_event_rows(self, fields: list[str] = None,
+                       after_id: int = None, limit: int = None, **filters):
+        """
+        Lignes (colonnes fields de EVENT_FIELDS, toutes par défaut) des
+        évènements filtrés, sans objets ORM. Requête exécutée à l'appel,
+        Result lu par lots
+        filters : filtres de build_query
+        """
+        query = project(self.build_query(**filters), EVENT_FIELDS,
+                        fields or list(EVENT_FIELDS), EVENT_JOINS)
+        return execute_stream(self.db, query, Event.id, after_id, limit)
+
+    def get_calendar(self, start_from: date = None, start_to: date = None,
+                     user_id: int = None, no_user: bool = False,
+                     profile: str = None):
+        """
+        Évènements de la période, triés par date de début puis ID (index
+        ix_events_start_date_id, sans tri en mémoire). Requête exécutée à
+        l'appel, résultat lu au fil de l'eau (cf. stream_query)
+        """
+        query = self.build_query(user_id=user_id, no_user=no_user,
+                                 start_from=start_from, start_to=start_to)
+        if profile:
+            query = query.options(*LOAD_PROFILES[profile]())
+
+        return stream_query(query.order_by(Event.start_date, Event.id))
 
     def update_event(self, event_id: int, name: str = None,
                      start_date: str = None, end_date: str = None,
@@ -84,13 +313,12 @@ class EventRepository:
             if contact:
                 event.contact = contact
             if user_id:
+                # La relation event.user est rechargée après le commit
                 event.user_id = user_id
-                event.user = self.db.query(User).filter(
-                    User.id == user_id
-                    ).first()
             if notes:
                 event.notes = notes
 
+            mark_stale(self.db, "events")
             self.db.commit()
             self.db.refresh(event)
         return event
@@ -100,6 +328,91 @@ class EventRepository:
         event = self.get_events(event_id)[0]
         if event:
             self.db.delete(event)
+            mark_stale(self.db, "events")
             self.db.commit()
             return True
         return False
+
+
+class AsyncEventRepository:
+    """
+    Équivalent asynchrone d'EventRepository (AsyncSession / asyncpg)
+    Chaque opération ouvre sa propre session : les appels peuvent être
+    lancés en parallèle (asyncio.gather)
+    """
+    def __init__(self, session_factory):
+        self.sessions = session_factory
+
+    async def is_owned_by(self, user_id: int, event_id: int = None,
+                          contract_id=None, client_id: int = None) -> bool:
+        """Cf. EventRepository.is_owned_by"""
+        clauses = ownership_clauses(user_id, event_id, contract_id,
+                                    client_id)
+        if not clauses:
+            return False
+        async with self.sessions() as session:
+            return bool(await session.scalar(select(or_(*clauses))))
+
+    async def get_contract(self, contract_id) -> Contract:
+        """Contrat et client du contrat (vérification de responsabilité)"""
+        async with self.sessions() as session:
+            return await session.scalar(
+                select(Contract).options(joinedload(Contract.client))
+                .where(Contract.id == contract_id))
+
+    async def get_client(self, client_id: int) -> Client:
+        async with self.sessions() as session:
+            return await session.get(Client, client_id)
+
+    async def get_user(self, user_id: int) -> User:
+        async with self.sessions() as session:
+            return await session.get(User, user_id)
+
+    async def create_event(self, name: str, contract_id: int,
+                           client_id: int, start_date: str, end_date: str,
+                           location: str, attendees: int, contact: str,
+                           user_id: int, notes: str) -> Event:
+        """Ajoute un nouvel événement, contrat et client chargés"""
+        async with self.sessions() as session:
+            new_event = Event(
+                name=name,
+                contract_id=contract_id,
+                client_id=client_id,
+                start_date=start_date,
+                end_date=end_date,
+                location=location,
+                attendees=attendees,
+                contact=contact,
+                user_id=user_id,
+                notes=notes
+            )
+            session.add(new_event)
+            await session.execute(stale_statement("events"))
+            await session.commit()
+            return await session.scalar(
+                select(Event).options(*LOAD_PROFILES["listing"]())
+                .where(Event.id == new_event.id))
+
+    async def get_events(self, event_id: int = None,
+                         contract_id: str = None,
+                         client_id: int = None,
+                         user_id: int = None,
+                         start_date: datetime = None,
+                         end_date: datetime = None,
+                         no_user: bool = False,
+                         profile: str = None,
+                         after_id: int = None,
+                         limit: int = None,
+                         start_from: date = None,
+                         start_to: date = None,
+                         overlaps: tuple = None) -> list[Event]:
+        """Récupère les évènements filtrés (cf. EventRepository)"""
+        statement = select(Event).where(*event_filters(
+            event_id, contract_id, client_id, user_id, start_date, end_date,
+            no_user, start_from, start_to, overlaps))
+        if profile:
+            statement = statement.options(*LOAD_PROFILES[profile]())
+
+        async with self.sessions() as session:
+            return await apaginate(session, statement, Event.id, after_id,
+                                   limit)
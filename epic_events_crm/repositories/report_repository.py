@@ -0,0 +1,153 @@
+import datetime
+
+from sqlalchemy import and_, func, not_, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models.report import (REPORT_VIEWS, report_client_unpaid,
+                           report_commercial_totals, report_refresh_state,
+                           report_support_events, report_unassigned_events,
+                           report_writes)
+from utils.query_utils import keyset
+
+
+# Vues rendues obsolètes par les écritures sur chaque table
+STALE_ON_WRITE = {
+    "users": (report_commercial_totals, report_support_events),
+    "clients": (report_client_unpaid, report_unassigned_events),
+    "contracts": (report_commercial_totals, report_client_unpaid),
+    "events": (report_support_events, report_unassigned_events),
+}
+# Tables lues par chaque vue (inverse de STALE_ON_WRITE)
+VIEW_TABLES = {
+    view.name: [table for table, views in STALE_ON_WRITE.items()
+                if view in views]
+    for view in REPORT_VIEWS
+}
+
+
+def stale_statement(table_name: str):
+    """
+    INSERT enregistrant la transaction courante comme écriture de
+    table_name. Une ligne par transaction : les écritures concurrentes ne
+    se bloquent pas entre elles ni avec un rafraîchissement
+    """
+    return (insert(report_writes)
+            .values(xid=func.pg_current_xact_id(), table_name=table_name)
+            .on_conflict_do_nothing())
+
+
+def mark_stale(db: Session, table_name: str):
+    """Marque les vues dépendantes, dans la transaction de l'écriture"""
+    db.execute(stale_statement(table_name))
+
+
+def stale_condition(view_name: str):
+    """
+    Vue jamais rafraîchie, ou écriture d'une de ses tables invisible de
+    l'instantané de son dernier rafraîchissement
+    """
+    snapshot = report_refresh_state.c.snapshot
+    return or_(snapshot.is_(None), select(report_writes.c.xid).where(
+        report_writes.c.table_name.in_(VIEW_TABLES[view_name]),
+        report_writes.c.xid >= func.pg_snapshot_xmin(snapshot),
+        not_(func.pg_visible_in_snapshot(report_writes.c.xid, snapshot)),
+        ).exists())
+
+
+class ReportRepository:
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def get_stale_views(self, names: list[str] = None) -> list[str]:
+        """Vues obsolètes parmi names (toutes par défaut)"""
+        names = names or [view.name for view in REPORT_VIEWS]
+        state = report_refresh_state.c
+        return list(self.db.scalars(select(state.view_name).where(or_(
+            *(and_(state.view_name == name, stale_condition(name))
+              for name in names)))))
+
+    def refresh(self, names: list[str] = None,
+                stale_only: bool = True) -> list[str]:
+        """
+        Rafraîchit les vues names (toutes par défaut), chacune dans sa
+        transaction (REFRESH MATERIALIZED VIEW CONCURRENTLY : lectures et
+        écritures ne sont pas bloquées). stale_only : uniquement les vues
+        modifiées depuis leur dernier rafraîchissement.
+        Retourne les noms des vues rafraîchies
+        """
+        requested = set(self.get_stale_views(names) if stale_only
+                        else names or [view.name for view in REPORT_VIEWS])
+        self.db.commit()
+        # Noms issus de models.report uniquement (interpolés dans le SQL)
+        refreshed = [view.name for view in REPORT_VIEWS
+                     if view.name in requested]
+
+        for name in refreshed:
+            # Instantané pris avant le REFRESH (qui voit au moins ces
+            # écritures) : une écriture concurrente reste invisible de
+            # l'instantané et rend de nouveau la vue obsolète
+            snapshot = self.db.scalar(select(func.pg_current_snapshot()))
+            self.db.execute(text(
+                f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
+            self.db.execute(
+                update(report_refresh_state)
+                .where(report_refresh_state.c.view_name == name)
+                .values(snapshot=snapshot,
+                        refreshed_at=datetime.datetime.now(
+                            datetime.timezone.utc)))
+            self.db.commit()
+
+        if refreshed:
+            # Écritures visibles de tous les instantanés : plus utiles
+            self.db.execute(report_writes.delete().where(
+                report_writes.c.xid < select(func.min(
+                    func.pg_snapshot_xmin(report_refresh_state.c.snapshot)
+                    )).scalar_subquery()))
+            self.db.commit()
+        return refreshed
+
+    def get_refresh_state(self) -> list[dict]:
+        """Date du dernier rafraîchissement de chaque vue et obsolescence"""
+        state = report_refresh_state.c
+        return [dict(row._mapping) for row in self.db.execute(
+            select(state.view_name, state.refreshed_at,
+                   state.view_name.in_(self.get_stale_views()).label(
+                       "stale"))
+            .order_by(state.view_name))]
+
+    def _rows(self, query) -> list[dict]:
+        return [dict(row._mapping) for row in self.db.execute(query)]
+
+    def get_commercial_totals(self) -> list[dict]:
+        """Nombre et montants des contrats par commercial"""
+        view = report_commercial_totals
+        return self._rows(select(view).order_by(
+            view.c.remaining_amount.desc(), view.c.user_id))
+
+    def get_client_unpaid(self, after_id: int = None,
+                          limit: int = None) -> list[dict]:
+        """Montants restant dus par client (paginé sur l'ID client)"""
+        view = report_client_unpaid
+        return self._rows(keyset(select(view), view.c.client_id, after_id,
+                                 limit))
+
+    def get_support_events(self) -> list[dict]:
+        """Nombre d'évènements par support"""
+        view = report_support_events
+        return self._rows(select(view).order_by(view.c.events.desc(),
+                                                view.c.user_id))
+
+    def get_unassigned_events(self, days: int = None) -> list[dict]:
+        """
+        Évènements à venir sans support, dans les days prochains jours
+        (tous les évènements à venir si days est None)
+        """
+        view = report_unassigned_events
+        today = datetime.date.today()
+        query = select(view).where(view.c.start_date >= today)
+        if days is not None:
+            query = query.where(
+                view.c.start_date <= today + datetime.timedelta(days=days))
+        return self._rows(query.order_by(view.c.start_date,
+                                         view.c.event_id))
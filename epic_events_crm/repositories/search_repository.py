@@ -0,0 +1,83 @@
+import re
+
+from sqlalchemy import func, literal, or_, select, text
+from sqlalchemy.orm import Session
+
+from models.client import Client
+from models.event import Event
+from models.user import User
+
+
+# Modèles recherchés et colonnes indexées en trigrammes (pg_trgm)
+SEARCH_TARGETS = {
+    "client": (Client, ("full_name", "company_name", "email")),
+    "user": (User, ("full_name",)),
+    "event": (Event, ("name", "location", "notes")),
+}
+# Configuration plein texte des colonnes search_vector (cf. modèles)
+SEARCH_CONFIG = "simple"
+
+# Disponibilité de pg_trgm, vérifiée une fois par processus
+_trigram_available = None
+
+
+def has_trigram(db: Session) -> bool:
+    """Vérifie si l'extension pg_trgm est installée"""
+    global _trigram_available
+    if _trigram_available is None:
+        _trigram_available = bool(db.scalar(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_extension "
+            "WHERE extname = 'pg_trgm')")))
+    return _trigram_available
+
+
+def prefix_tsquery(term: str):
+    """
+    tsquery des mots du terme, chacun en préfixe (« jean dup » ->
+    jean:* & dup:*), None si le terme ne contient aucun mot
+    """
+    words = re.findall(r"\w+", term.lower())
+    if not words:
+        return None
+    return func.to_tsquery(literal(SEARCH_CONFIG),
+                           " & ".join(f"{word}:*" for word in words))
+
+
+class SearchRepository:
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def search(self, kind: str, term: str, limit: int = 10,
+               offset: int = 0) -> list:
+        """
+        Recherche classée dans les objets kind (cf. SEARCH_TARGETS).
+        Correspondance : plein texte par préfixe (index GIN sur
+        search_vector), similarité et début de colonne (index trigrammes).
+        Sans pg_trgm : plein texte et début de colonne uniquement.
+        Classement : ts_rank + meilleure similarité, puis ID
+        """
+        model, names = SEARCH_TARGETS[kind]
+        columns = [getattr(model, name) for name in names]
+        term = term.strip()
+        tsquery = prefix_tsquery(term)
+
+        matches = [column.istartswith(term, autoescape=True)
+                   for column in columns]
+        rank = literal(0.0)
+        if tsquery is not None:
+            matches.append(model.search_vector.op("@@")(tsquery))
+            rank = func.ts_rank(model.search_vector, tsquery)
+        if has_trigram(self.db):
+            # Opérateur % : similarité au-delà de pg_trgm.similarity_threshold
+            matches.extend(column.op("%")(term) for column in columns)
+            rank = rank + func.greatest(*(
+                func.coalesce(func.similarity(column, term), 0)
+                for column in columns))
+
+        query = (select(model)
+                 .where(or_(*matches))
+                 .order_by(rank.desc(), model.id)
+                 .offset(offset))
+        if limit:
+            query = query.limit(limit)
+        return list(self.db.scalars(query))
@@ -1,6 +1,18 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, selectinload
 
+from models.role import Role
 from models.user import User
+from repositories.report_repository import mark_stale
+from utils.batch_utils import DEFAULT_CHUNK_SIZE, chunked
+from utils.query_utils import RowDTO, apaginate, fetch_dtos, paginate
+from utils.user_directory import user_directory
+
+
+class UserListing(RowDTO):
+    """Utilisateur et nom de son rôle (affichage en liste)"""
+    __slots__ = ("id", "full_name", "email", "role")
+    COLUMNS = (User.id, User.full_name, User.email, Role.name)
 
 
 class UserRepository:
@@ -16,10 +28,44 @@ class UserRepository:
             hashed_password=hashed_password,
             role_id=role_id)
         self.db.add(new_user)
+        mark_stale(self.db, "users")
         self.db.commit()
         self.db.refresh(new_user)
+        # Un homonyme de plus petit ID peut déjà être en cache
+        user_directory.invalidate(names=[full_name])
         return new_user
 
+    def bulk_create_users(self, rows,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE) -> list:
+        """
+        Insère des utilisateurs par lots (INSERT ... RETURNING), un commit
+        par lot. rows : dicts full_name, email, hashed_password, role_id
+        Retourne les IDs des utilisateurs créés
+        """
+        created_ids = []
+        for chunk in chunked(rows, chunk_size):
+            values = [{
+                "full_name": row["full_name"],
+                "email": row["email"],
+                "hashed_password": row["hashed_password"],
+                "role_id": row["role_id"],
+            } for row in chunk]
+
+            result = self.db.execute(insert(User).returning(User.id), values)
+            created_ids.extend(result.scalars())
+            mark_stale(self.db, "users")
+            self.db.commit()
+            user_directory.invalidate(names=[row["full_name"]
+                                             for row in values])
+        return created_ids
+
+    def get_existing_emails(self, emails: list[str]) -> set[str]:
+        """ Retourne les emails déjà utilisés parmi ceux fournis """
+        if not emails:
+            return set()
+        return {email for (email,) in self.db.query(User.email).filter(
+            User.email.in_(emails))}
+
     def get_user_by_id(self, user_id: int) -> User:
         """ Récupère un utilisateur par son ID. """
         return self.db.query(User).filter(User.id == user_id).first()
@@ -28,9 +74,30 @@ class UserRepository:
         """ Récupère un utilisateur par son adresse email. """
         return self.db.query(User).filter(User.email == email).first()
 
-    def get_user_by_name(self, full_name: str) -> User:
-        """ Récupère un utilisateur par son nom complet. """
-        return self.db.query(User).filter(User.full_name == full_name).all()
+    def get_user_by_name(self, full_name: str, after_id: int = None,
+                         limit: int = None,
+                         stream: bool = False) -> list[User]:
+        """ Récupère les utilisateurs par leur nom complet (paginé). """
+        query = self.db.query(User).filter(User.full_name == full_name)
+        return paginate(query, User.id, after_id, limit, stream)
+
+    def get_user_listing(self, user_id: int = None, email: str = None,
+                         full_name: str = None, after_id: int = None,
+                         limit: int = None) -> list[UserListing]:
+        """
+        Utilisateurs filtrés par ID, email ou nom complet, en DTO
+        (projection avec jointure sur le rôle, sans objets ORM)
+        """
+        statement = (UserListing.select().select_from(User)
+                     .outerjoin(Role, Role.id == User.role_id))
+        if user_id is not None:
+            statement = statement.where(User.id == user_id)
+        if email is not None:
+            statement = statement.where(User.email == email)
+        if full_name is not None:
+            statement = statement.where(User.full_name == full_name)
+        return fetch_dtos(self.db, statement, UserListing, User.id,
+                          after_id, limit)
 
     def update_user(self, user_id: int, full_name: str = None,
                     email: str = None, password: str = None,
@@ -41,6 +108,7 @@ class UserRepository:
         """
         user = self.get_user_by_id(user_id)
         if user:
+            old_name = user.full_name
             if full_name:
                 user.full_name = full_name
             if email:
@@ -49,8 +117,11 @@ class UserRepository:
                 user.hashed_password = password
             if role_id:
                 user.role_id = role_id
+            mark_stale(self.db, "users")
             self.db.commit()
             self.db.refresh(user)
+            user_directory.invalidate(user.id,
+                                      names=[old_name, user.full_name])
         return user
 
     def delete_user(self, user_id: int) -> bool:
@@ -58,6 +129,40 @@ class UserRepository:
         user = self.get_user_by_id(user_id)
         if user:
             self.db.delete(user)
+            mark_stale(self.db, "users")
             self.db.commit()
+            user_directory.invalidate(user_id)
             return True
         return False
+
+
+class AsyncUserRepository:
+    """
+    Équivalent asynchrone des lectures d'UserRepository (AsyncSession)
+    Une session par opération (appels concurrents possibles)
+    """
+    def __init__(self, session_factory):
+        self.sessions = session_factory
+
+    async def get_user_by_id(self, user_id: int) -> User:
+        """Utilisateur avec son rôle et ses permissions (principal)"""
+        async with self.sessions() as session:
+            return await session.scalar(
+                select(User).options(
+                    selectinload(User.role).selectinload(Role.permissions))
+                .where(User.id == int(user_id)))
+
+    async def get_user_by_email(self, email: str) -> User:
+        async with self.sessions() as session:
+            return await session.scalar(
+                select(User).options(selectinload(User.role))
+                .where(User.email == email))
+
+    async def get_user_by_name(self, full_name: str, after_id: int = None,
+                               limit: int = None) -> list[User]:
+        async with self.sessions() as session:
+            return await apaginate(
+                session,
+                select(User).options(selectinload(User.role))
+                .where(User.full_name == full_name),
+                User.id, after_id, limit)
@@ -2,7 +2,10 @@ import logging
 from sqlalchemy.exc import SQLAlchemyError
 
 from repositories.client_repository import ClientRepository
-from utils.permission_utils import require_permission
+from utils.batch_utils import DEFAULT_CHUNK_SIZE, chunked, new_report
+from utils.permission_utils import (check_permission,
+                                    get_current_principal,
+                                    require_permission)
 
 
 class ClientService:
@@ -10,6 +13,10 @@ class ClientService:
         self.client_repo = client_repo
         self.user_repo = user_repo
 
+    def owns(self, user_id: int, client_id: int = None) -> bool:
+        """Résolveur de responsabilité (require_permission)"""
+        return self.client_repo.is_owned_by(user_id, client_id)
+
     @require_permission("create_client", check_ownership=False)
     def create_client(self, full_name: str, email: str, phone: str,
                       company_name: str, contact: str):
@@ -32,6 +39,104 @@ class ClientService:
                           f"{str(e)}")
             return {"error": "Erreur interne du serveur"}
 
+    @require_permission("create_client", check_ownership=False)
+    def create_clients(self, rows, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Crée des clients par lots, une transaction par lot.
+        rows : itérable de (numéro de ligne, données validées)
+        Les lignes en erreur sont rapportées sans interrompre le batch.
+        """
+        report = new_report()
+        for chunk in chunked(rows, chunk_size):
+            # Emails déjà utilisés : une requête par lot
+            used_emails = self.client_repo.get_existing_emails(
+                [data["email"] for _, data in chunk]
+                )
+            valid = []
+            for line_number, data in chunk:
+                if data["email"] in used_emails:
+                    report["errors"].append(
+                        (line_number, "Cette adresse email est déjà utilisée")
+                        )
+                    continue
+                used_emails.add(data["email"])
+                valid.append((line_number, data))
+
+            if not valid:
+                continue
+            try:
+                self.client_repo.bulk_create_clients(
+                    [data for _, data in valid], chunk_size
+                    )
+                report["processed"] += len(valid)
+            except SQLAlchemyError as e:
+                self.client_repo.db.rollback()
+                logging.error("Erreur SQL lors de la création d'un lot de "
+                              f"clients : {str(e)}")
+                report["errors"].extend(
+                    (line_number, "Erreur interne du serveur")
+                    for line_number, _ in valid
+                    )
+        return report
+
+    @require_permission("create_client", check_ownership=False)
+    def import_clients(self, rows, update_existing: bool = False):
+        """
+        Chargement rapide de clients (COPY puis upsert sur l'email).
+        rows : itérable de (numéro de ligne, données validées)
+        update_existing : met à jour les clients existants dont
+        l'importateur est responsable (permission update_client), les
+        autres lignes sont refusées ; sinon elles sont rejetées comme dans
+        create_client.
+        Retourne le rapport : créés, mis à jour et lignes rejetées.
+        """
+        principal = get_current_principal()
+        if update_existing and not check_permission(principal,
+                                                    "update_client"):
+            return {"error": "Permission refusée"}
+        try:
+            summary = self.client_repo.copy_upsert_clients(
+                rows, principal.id if update_existing else None
+                )
+        except (SQLAlchemyError, RuntimeError) as e:
+            self.client_repo.db.rollback()
+            logging.error("Erreur lors du chargement rapide des clients : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
+        report = new_report()
+        report["processed"] = summary["inserted"] + summary["updated"]
+        report["inserted"] = summary["inserted"]
+        report["updated"] = summary["updated"]
+        report["errors"] = sorted(
+            [(line_number, "Cette adresse email est déjà utilisée")
+             for line_number in summary["rejected"]]
+            + [(line_number, "Accès refusé : vous n'êtes pas responsable")
+               for line_number in summary["denied"]]
+            )
+        return report
+
+    @require_permission("update_client", check_ownership=False)
+    def update_clients(self, rows):
+        """
+        Met à jour des clients identifiés par leur email actuel.
+        La responsabilité est vérifiée ligne par ligne (update_client).
+        """
+        report = new_report()
+        for line_number, data in rows:
+            client = self.client_repo.get_client_by_email(
+                data.pop("current_email")
+                )
+            if not client:
+                report["errors"].append((line_number, "Client introuvable"))
+                continue
+            result = self.update_client(client_id=client.id, **data)
+            if isinstance(result, dict) and "error" in result:
+                report["errors"].append((line_number, result["error"]))
+            else:
+                report["processed"] += 1
+        return report
+
     @require_permission("read_client", check_ownership=False)
     def get_client_by_id(self, client_id: int):
         """Récupère un client par ID, renvoie une erreur si non trouvé."""
@@ -63,10 +168,13 @@ class ClientService:
             return {"error": "Erreur interne du serveur"}
 
     @require_permission("read_client", check_ownership=False)
-    def get_client_by_name(self, full_name: str):
+    def get_client_by_name(self, full_name: str, after_id: int = None,
+                           limit: int = None):
         """Récupère un client par ,om, renvoie une erreur si non trouvé."""
         try:
-            client = self.client_repo.get_client_by_name(full_name)
+            client = self.client_repo.get_client_by_name(
+                full_name, after_id=after_id, limit=limit
+                )
             if not client:
                 logging.debug(f"Client : {full_name} introuvable")
                 return {"error": "Client introuvable"}
@@ -128,3 +236,60 @@ class ClientService:
             logging.error("Erreur SQL lors de la suppression du client "
                           f"{client_id}: {str(e)}")
             return {"error": "Erreur interne du serveur"}
+
+
+class AsyncClientService:
+    """
+    Lectures de ClientService en asynchrone (AsyncClientRepository)
+    """
+    def __init__(self, client_repo, user_repo=None):
+        self.client_repo = client_repo
+        self.user_repo = user_repo
+
+    @require_permission("read_client", check_ownership=False)
+    async def get_client_by_id(self, client_id: int):
+        """Récupère un client par ID, renvoie une erreur si non trouvé."""
+        try:
+            client = await self.client_repo.get_client_by_id(client_id)
+            if not client:
+                logging.debug(f"Client ID {client_id} introuvable")
+                return {"error": "Client introuvable"}
+            return client
+
+        except SQLAlchemyError as e:
+            logging.error("Erreur SQL lors de la récupération du client "
+                          f"{client_id}: {str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
+    @require_permission("read_client", check_ownership=False)
+    async def get_client_by_email(self, email: str):
+        """Récupère un client par email, renvoie une erreur si non trouvé."""
+        try:
+            client = await self.client_repo.get_client_by_email(email)
+            if not client:
+                logging.debug(f"Client avec email {email} introuvable")
+                return {"error": "Client introuvable"}
+            return client
+
+        except SQLAlchemyError as e:
+            logging.error("Erreur SQL lors de la récupération du client "
+                          f"{email}: {str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
+    @require_permission("read_client", check_ownership=False)
+    async def get_client_by_name(self, full_name: str, after_id: int = None,
+                                 limit: int = None):
+        """Récupère les clients d'un nom donné (paginé)."""
+        try:
+            client = await self.client_repo.get_client_by_name(
+                full_name, after_id=after_id, limit=limit
+                )
+            if not client:
+                logging.debug(f"Client : {full_name} introuvable")
+                return {"error": "Client introuvable"}
+            return client
+
+        except SQLAlchemyError as e:
+            logging.error("Erreur SQL lors de la récupération du client "
+                          f"{full_name}: {str(e)}")
+            return {"error": "Erreur interne du serveur"}
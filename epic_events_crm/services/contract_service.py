@@ -2,9 +2,34 @@ import logging
 import uuid
 from sqlalchemy.exc import SQLAlchemyError
 
-from repositories.contract_repository import ContractRepository
+from repositories.contract_repository import (CONTRACT_FIELDS,
+                                              ContractRepository)
 from models.client import Client
-from utils.permission_utils import require_permission
+from utils.batch_utils import DEFAULT_CHUNK_SIZE, chunked, new_report
+from utils.permission_utils import (require_permission,
+                                    get_current_principal)
+
+
+def check_contract_ids(*contract_ids) -> dict:
+    """
+    Dict d'erreur si un identifiant de contrat fourni (filtre ou curseur
+    after_id) n'est pas un UUID, None sinon
+    """
+    for contract_id in contract_ids:
+        if contract_id is None:
+            continue
+        try:
+            uuid.UUID(str(contract_id))
+        except ValueError:
+            return {"error": "ID du contrat invalide"}
+    return None
+
+
+def check_payment_amount(amount) -> dict:
+    """Dict d'erreur si le montant d'un paiement n'est pas positif"""
+    if amount is None or amount <= 0:
+        return {"error": "Le montant du paiement doit être positif"}
+    return None
 
 
 class ContractService:
@@ -12,6 +37,12 @@ class ContractService:
         self.contract_repo = contract_repo
         self.user_repo = user_repo
 
+    def owns(self, user_id: int, contract_id: str = None,
+             client_id: int = None) -> bool:
+        """Résolveur de responsabilité (require_permission)"""
+        return self.contract_repo.is_owned_by(user_id, contract_id,
+                                              client_id)
+
     @require_permission("create_contract", check_ownership=False)
     def create_contract(self, client_id: int, total_amount: float,
                         status: str, contact: str):
@@ -36,28 +67,94 @@ class ContractService:
             logging.error(f"Erreur lors de la création du contrat : {str(e)}")
             return {"error": "Erreur interne"}
 
+    @require_permission("create_contract", check_ownership=False)
+    def create_contracts(self, rows, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Crée des contrats par lots, une transaction par lot.
+        rows : itérable de (numéro de ligne, données validées)
+        Les lignes en erreur sont rapportées sans interrompre le batch.
+        """
+        report = new_report()
+        for chunk in chunked(rows, chunk_size):
+            # Clients du lot : une requête par lot
+            emails = {data["client_email"] for _, data in chunk}
+            clients = {
+                client.email: client
+                for client in self.contract_repo.db.query(Client).filter(
+                    Client.email.in_(emails))
+                }
+            valid = []
+            for line_number, data in chunk:
+                client = clients.get(data["client_email"])
+                if not client:
+                    report["errors"].append(
+                        (line_number, "Client introuvable")
+                        )
+                    continue
+                valid.append((line_number, {
+                    "client_id": client.id,
+                    "total_amount": data["total_amount"],
+                    "status": data["status"],
+                    "contact": client.contact,
+                }))
+
+            if not valid:
+                continue
+            try:
+                self.contract_repo.bulk_create_contracts(
+                    [data for _, data in valid], chunk_size
+                    )
+                report["processed"] += len(valid)
+            except SQLAlchemyError as e:
+                self.contract_repo.db.rollback()
+                logging.error("Erreur lors de la création d'un lot de "
+                              f"contrats : {str(e)}")
+                report["errors"].extend(
+                    (line_number, "Erreur interne")
+                    for line_number, _ in valid
+                    )
+        return report
+
+    @require_permission("update_contract", check_ownership=False)
+    def update_contracts(self, rows):
+        """Met à jour des contrats identifiés par leur UUID."""
+        report = new_report()
+        for line_number, data in rows:
+            result = self.update_contract(**data)
+            if isinstance(result, dict) and "error" in result:
+                report["errors"].append((line_number, result["error"]))
+            else:
+                report["processed"] += 1
+        return report
+
     @require_permission("read_contract", check_ownership=False)
     def get_contracts(self, contract_id: str = None,
                       user_id: int = None,
                       client_id: int = None,
                       status: str = None,
                       remaining_amount: bool = False,
+                      profile: str = None,
+                      after_id: str = None,
+                      limit: int = None,
+                      stream: bool = False
                       ):
         """
         Récupère les contrats selon les critères fournis
         Retourne une erreur si aucun contrat n'est trouvé
         """
+        error = check_contract_ids(contract_id, after_id)
+        if error:
+            return error
         try:
-            if contract_id is not None:
-                try:
-                    uuid_obj = uuid.UUID(contract_id)  # noqa: F841
-                except ValueError:
-                    return {"error": "ID du contrat invalide"}
             contracts = self.contract_repo.get_contracts(contract_id=contract_id,  # noqa: E501
                                                          user_id=user_id,
                                                          client_id=client_id,
                                                          status=status,
                                                          remaining_amount=remaining_amount,  # noqa: E501
+                                                         profile=profile,
+                                                         after_id=after_id,
+                                                         limit=limit,
+                                                         stream=stream
                                                          )
 
             if not contracts:
@@ -77,6 +174,64 @@ class ContractService:
                           f"{str(e)}")
             return {"error": "Erreur interne du serveur"}
 
+    @require_permission("read_contract", check_ownership=False)
+    def get_contract_listing(self, contract_id: str = None,
+                             user_id: int = None,
+                             client_id: int = None,
+                             status: str = None,
+                             remaining_amount: bool = False,
+                             after_id: str = None,
+                             limit: int = None,
+                             stream: bool = False):
+        """
+        Contrats filtrés en DTO de lecture seule (cf. ContractListing),
+        pour l'affichage en liste
+        """
+        error = check_contract_ids(contract_id, after_id)
+        if error:
+            return error
+        try:
+            contracts = self.contract_repo.get_contract_listing(
+                contract_id, user_id, client_id, status, remaining_amount,
+                after_id=after_id, limit=limit, stream=stream
+                )
+            if not stream and not contracts:
+                return {"error": "Aucun contrat trouvé"}
+            return contracts
+
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur lors de la récupération des contrats : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
+    @require_permission("read_contract", check_ownership=False)
+    def get_contract_rows(self, fields: list[str] = None,
+                          after_id: str = None, limit: int = None,
+                          **filters):
+        """
+        Lignes des contrats filtrés, limitées aux colonnes fields (cf.
+        CONTRACT_FIELDS, toutes par défaut), restituées au fil de l'eau
+        Retourne {"fields": noms des colonnes, "rows": lignes}
+        """
+        unknown = set(fields or ()) - CONTRACT_FIELDS.keys()
+        if unknown:
+            return {"error": "Champ(s) inconnu(s) : "
+                             f"{', '.join(sorted(unknown))} (disponibles : "
+                             f"{', '.join(CONTRACT_FIELDS)})"}
+        error = check_contract_ids(filters.get("contract_id"), after_id)
+        if error:
+            return error
+        try:
+            fields = fields or list(CONTRACT_FIELDS)
+            return {"fields": fields,
+                    "rows": self.contract_repo.get_contract_rows(
+                        fields, after_id, limit, **filters)}
+
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur lors de la récupération des contrats : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
     @require_permission("update_contract", check_ownership=False)
     def update_contract(self, contract_id: int,
                         contact: str = None,
@@ -86,24 +241,87 @@ class ContractService:
                         ):
         """
         Met à jour les informations d'un contrat
-        Modifie son montant, son statut, son contact
+        Modifie son montant, son statut, son contact et enregistre le
+        paiement paid_amount
         """
+        if paid_amount is not None:
+            error = check_payment_amount(paid_amount)
+            if error:
+                return error
         try:
-            contract = self.contract_repo.get_contracts(contract_id=contract_id)[0]  # noqa: E501
-            if not contract:
+            contracts = self.contract_repo.get_contracts(contract_id=contract_id)  # noqa: E501
+            if not contracts:
                 logging.debug(f"Contrat introuvable : {contract_id}")
                 return {"error": "Contrat introuvable"}
+            contract = contracts[0]
 
+            principal = get_current_principal()
+            # Champs et paiement dans une seule transaction
             updated_contract = self.contract_repo.update_contract(
-                contract, total_amount, paid_amount, status, contact
+                contract, total_amount, paid_amount, status, contact,
+                principal.id if principal else None
             )
+            if updated_contract is None:
+                logging.debug(f"Contrat introuvable : {contract_id}")
+                return {"error": "Contrat introuvable"}
             return updated_contract
 
         except SQLAlchemyError as e:
+            self.contract_repo.db.rollback()
             logging.error(f"Erreur lors de la mise à jour du contrat "
-                          f"{id} : {str(e)}")
+                          f"{contract_id} : {str(e)}")
             return {"error": "Erreur interne"}
 
+    def _record_payment(self, contract_id, amount: float):
+        """Paiement atomique, attribué à l'utilisateur courant"""
+        principal = get_current_principal()
+        return self.contract_repo.record_payment(
+            contract_id, amount, principal.id if principal else None
+            )
+
+    @require_permission("update_contract", check_ownership=False)
+    def record_payment(self, contract_id: str, amount: float):
+        """
+        Enregistre un paiement sur un contrat (une requête, sans lecture
+        préalable) et l'ajoute au registre des paiements
+        """
+        try:
+            uuid.UUID(str(contract_id))
+        except ValueError:
+            return {"error": "ID du contrat invalide"}
+        error = check_payment_amount(amount)
+        if error:
+            return error
+
+        try:
+            contract = self._record_payment(contract_id, amount)
+            if contract is None:
+                logging.debug(f"Contrat introuvable : {contract_id}")
+                return {"error": "Contrat introuvable"}
+            return contract
+
+        except SQLAlchemyError as e:
+            self.contract_repo.db.rollback()
+            logging.error(f"Erreur lors du paiement du contrat "
+                          f"{contract_id} : {str(e)}")
+            return {"error": "Erreur interne"}
+
+    @require_permission("read_contract", check_ownership=False)
+    def get_payments(self, contract_id: str, after_id: int = None,
+                     limit: int = None):
+        """Récupère l'historique des paiements d'un contrat"""
+        try:
+            uuid.UUID(str(contract_id))
+        except ValueError:
+            return {"error": "ID du contrat invalide"}
+        try:
+            return self.contract_repo.get_payments(contract_id, after_id,
+                                                   limit)
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur lors de la récupération des paiements : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
     @require_permission("delete_contract", check_ownership=False)
     def delete_contract(self, contract_id: str):
         """
@@ -126,3 +344,72 @@ class ContractService:
             logging.error(f"Erreur lors de la suppression du contrat "
                           f"{contract_id} : {str(e)}")
             return {"error": "Erreur interne"}
+
+
+class AsyncContractService:
+    """
+    Lectures et paiements de ContractService en asynchrone
+    (AsyncContractRepository)
+    """
+    def __init__(self, contract_repo, user_repo=None):
+        self.contract_repo = contract_repo
+        self.user_repo = user_repo
+
+    @require_permission("read_contract", check_ownership=False)
+    async def get_contracts(self, contract_id: str = None,
+                            user_id: int = None,
+                            client_id: int = None,
+                            status: str = None,
+                            remaining_amount: bool = False,
+                            profile: str = None,
+                            after_id: str = None,
+                            limit: int = None):
+        """
+        Récupère les contrats selon les critères fournis
+        Retourne une erreur si aucun contrat n'est trouvé
+        """
+        error = check_contract_ids(contract_id, after_id)
+        if error:
+            return error
+        try:
+            contracts = await self.contract_repo.get_contracts(
+                contract_id=contract_id, user_id=user_id,
+                client_id=client_id, status=status,
+                remaining_amount=remaining_amount, profile=profile,
+                after_id=after_id, limit=limit
+                )
+            if not contracts:
+                logging.debug("Aucun contrat trouvé")
+                return {"error": "Aucun contrat trouvé"}
+            return contracts
+
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur lors de la récupération des contrats : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
+    @require_permission("update_contract", check_ownership=False)
+    async def record_payment(self, contract_id: str, amount: float):
+        """Enregistre un paiement (cf. ContractService.record_payment)"""
+        try:
+            uuid.UUID(str(contract_id))
+        except ValueError:
+            return {"error": "ID du contrat invalide"}
+        error = check_payment_amount(amount)
+        if error:
+            return error
+
+        principal = get_current_principal()
+        try:
+            contract = await self.contract_repo.record_payment(
+                contract_id, amount, principal.id if principal else None
+                )
+            if contract is None:
+                logging.debug(f"Contrat introuvable : {contract_id}")
+                return {"error": "Contrat introuvable"}
+            return contract
+
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur lors du paiement du contrat "
+                          f"{contract_id} : {str(e)}")
+            return {"error": "Erreur interne"}
@@ -0,0 +1,45 @@
+import logging
+from sqlalchemy.exc import SQLAlchemyError
+
+from repositories.dataset_repository import DatasetRepository
+from utils.copy_utils import EXPORT_CHUNK_SIZE
+from utils.permission_utils import require_permission
+
+
+class DatasetService:
+    """Export et import de l'ensemble des données (permission manage_data)"""
+    def __init__(self, dataset_repo: DatasetRepository, user_repo=None):
+        self.dataset_repo = dataset_repo
+        self.user_repo = user_repo
+
+    def _run(self, label: str, operation, *args):
+        try:
+            return operation(*args)
+
+        except (RuntimeError, ValueError, OSError) as e:
+            logging.error(f"Échec de l'{label} des données : {str(e)}")
+            return {"error": str(e)}
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur SQL lors de l'{label} des données : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
+    @require_permission("manage_data")
+    def export_dataset(self, directory: str, file_format: str = "csv",
+                       chunk_size: int = EXPORT_CHUNK_SIZE):
+        """
+        Exporte toutes les tables dans directory (un fichier par table)
+        Retourne {table: nombre de lignes}
+        """
+        return self._run("export", self.dataset_repo.export_dataset,
+                         directory, file_format, chunk_size)
+
+    @require_permission("manage_data")
+    def import_dataset(self, directory: str, file_format: str = "csv",
+                       chunk_size: int = EXPORT_CHUNK_SIZE):
+        """
+        Remplace toutes les données par l'export de directory
+        Retourne {table: nombre de lignes}
+        """
+        return self._run("import", self.dataset_repo.import_dataset,
+                         directory, file_format, chunk_size)
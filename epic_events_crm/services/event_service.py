@@ -1,13 +1,16 @@
+import asyncio
 import logging
 import uuid
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
+from sqlalchemy.orm import joinedload
+from datetime import date, datetime
 
-from repositories.event_repository import EventRepository
-from models.client import Client
+from repositories.event_repository import EVENT_FIELDS, EventRepository
 from models.contract import Contract
 from models.user import User
-from utils.permission_utils import require_permission
+from utils.batch_utils import DEFAULT_CHUNK_SIZE, chunked, new_report
+from utils.permission_utils import (require_permission, is_contact,
+                                    get_current_principal)
 
 
 class EventService:
@@ -15,36 +18,43 @@ class EventService:
         self.event_repo = event_repo
         self.user_repo = user_repo
 
-    @require_permission("create_event", check_ownership=True)
+    def owns(self, user_id: int, event_id: int = None, contract_id=None,
+             client_id: int = None) -> bool:
+        """Résolveur de responsabilité (require_permission)"""
+        return self.event_repo.is_owned_by(user_id, event_id, contract_id,
+                                           client_id)
+
+    @require_permission("create_event", check_ownership=False)
     def create_event(self, name: str, contract_id: int, client_id: int,
                      start_date: str, end_date: str, location: str,
                      attendees: int, contact: str, user_id: int, notes: str):
         """
         Crée un nouvel événement dans la base de données.
         Vérifie que le client, le contrat, et l'utilisateur existent
+        (une seule requête) puis la responsabilité sur ces mêmes objets
         """
         try:
-            contract = self.event_repo.db.query(Contract).filter(
-                Contract.id == contract_id
-                ).first()
+            contract, client, contact_user = (
+                self.event_repo.resolve_references(contract_id, client_id,
+                                                   user_id)
+                )
             if not contract:
                 logging.debug(f"Contrat introuvable : {contract_id}")
                 return {"error": "Contrat introuvable"}
-
-            client = self.event_repo.db.query(Client).filter(
-                Client.id == client_id
-                ).first()
             if not client:
                 logging.debug(f"Client introuvable : {client_id}")
                 return {"error": "Client introuvable"}
-
-            contact_user = self.event_repo.db.query(User).filter(
-                User.id == user_id
-                ).first()
             if not contact_user:
                 logging.debug(f"Utilisateur introuvable : {user_id}")
                 return {"error": "Utilisateur introuvable"}
 
+            principal = get_current_principal()
+            if not is_contact(principal, client=client, contract=contract):
+                logging.debug(f"Accès refusé pour {principal.email}, non "
+                              "responsable.")
+                return {"error": "Accès refusé : vous n'êtes pas "
+                        "responsable"}
+
             new_event = self.event_repo.create_event(
                 name, contract_id, client_id, start_date, end_date, location,
                 attendees, contact, user_id, notes
@@ -56,6 +66,105 @@ class EventService:
                           f"{str(e)}")
             return {"error": "Erreur interne"}
 
+    @require_permission("create_event", check_ownership=False)
+    def create_events(self, rows, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Crée des évènements par lots, une transaction par lot.
+        rows : itérable de (numéro de ligne, données validées)
+        Les lignes en erreur sont rapportées sans interrompre le batch.
+        """
+        principal = get_current_principal()
+        report = new_report()
+        for chunk in chunked(rows, chunk_size):
+            # Contrats et contacts du lot : une requête chacun par lot
+            contract_ids = {data["contract_id"] for _, data in chunk}
+            contracts = {
+                str(contract.id): contract
+                for contract in self.event_repo.db.query(Contract).options(
+                    joinedload(Contract.client)).filter(
+                    Contract.id.in_(contract_ids))
+                }
+            emails = {data["contact_email"] for _, data in chunk}
+            users = {
+                user.email: user for user in self.event_repo.db.query(
+                    User).filter(User.email.in_(emails))
+                }
+
+            valid = []
+            for line_number, data in chunk:
+                contract = contracts.get(data["contract_id"])
+                contact_user = users.get(data["contact_email"])
+                if not contract:
+                    error = "Contrat introuvable"
+                elif not contact_user:
+                    error = "Utilisateur introuvable"
+                # Même règle de responsabilité que create_event
+                elif not is_contact(principal, client=contract.client,
+                                    contract=contract):
+                    error = "Accès refusé : vous n'êtes pas responsable"
+                else:
+                    error = None
+                if error:
+                    report["errors"].append((line_number, error))
+                    continue
+                valid.append((line_number, {
+                    "name": data["name"],
+                    "contract_id": contract.id,
+                    "client_id": contract.client_id,
+                    "start_date": data["start_date"],
+                    "end_date": data["end_date"],
+                    "location": data["location"],
+                    "attendees": data["attendees"],
+                    "contact": contact_user.full_name,
+                    "user_id": contact_user.id,
+                    "notes": data["notes"],
+                }))
+
+            if not valid:
+                continue
+            try:
+                self.event_repo.bulk_create_events(
+                    [data for _, data in valid], chunk_size
+                    )
+                report["processed"] += len(valid)
+            except SQLAlchemyError as e:
+                self.event_repo.db.rollback()
+                logging.error("Erreur lors de la création d'un lot "
+                              f"d'évènements : {str(e)}")
+                report["errors"].extend(
+                    (line_number, "Erreur interne")
+                    for line_number, _ in valid
+                    )
+        return report
+
+    @require_permission("update_event", check_ownership=False)
+    def update_events(self, rows):
+        """
+        Met à jour des évènements identifiés par leur ID.
+        La responsabilité est vérifiée ligne par ligne (update_event).
+        """
+        report = new_report()
+        for line_number, data in rows:
+            contact_email = data.pop("contact_email", None)
+            if contact_email:
+                contact_user = self.event_repo.db.query(User).filter(
+                    User.email == contact_email
+                    ).first()
+                if not contact_user:
+                    report["errors"].append(
+                        (line_number, "Utilisateur introuvable")
+                        )
+                    continue
+                data["contact"] = contact_user.full_name
+                data["user_id"] = contact_user.id
+
+            result = self.update_event(**data)
+            if isinstance(result, dict) and "error" in result:
+                report["errors"].append((line_number, result["error"]))
+            else:
+                report["processed"] += 1
+        return report
+
     @require_permission("read_event", check_ownership=False)
     def get_events(self, event_id: int = None,
                    contract_id: str = None,
@@ -63,10 +172,19 @@ class EventService:
                    user_id: int = None,
                    start_date: datetime = None,
                    end_date: datetime = None,
-                   no_user: bool = False
+                   no_user: bool = False,
+                   profile: str = None,
+                   after_id: int = None,
+                   limit: int = None,
+                   stream: bool = False,
+                   start_from: date = None,
+                   start_to: date = None,
+                   overlaps: tuple = None
                    ):
         """
         Récupère les events selon les critères fournis
+        start_from, start_to : début dans l'intervalle (bornes incluses)
+        overlaps : (début, fin) events en cours sur la période
         Retourne une erreur si aucun event n'est trouvé.
         """
         try:
@@ -81,7 +199,14 @@ class EventService:
                                                 user_id=user_id,
                                                 start_date=start_date,
                                                 end_date=end_date,
-                                                no_user=no_user
+                                                no_user=no_user,
+                                                profile=profile,
+                                                after_id=after_id,
+                                                limit=limit,
+                                                stream=stream,
+                                                start_from=start_from,
+                                                start_to=start_to,
+                                                overlaps=overlaps
                                                 )
             if not events:
                 logging.debug("Aucun évènement trouvé pour les critères : "
@@ -102,6 +227,78 @@ class EventService:
                           f"{str(e)}")
             return {"error": "Erreur interne du serveur"}
 
+    @require_permission("read_event", check_ownership=False)
+    def get_event_listing(self, after_id: int = None, limit: int = None,
+                          stream: bool = False, **filters):
+        """
+        Events filtrés en DTO de lecture seule (cf. EventListing), pour
+        l'affichage en liste. filters : filtres de get_events
+        """
+        if filters.get("contract_id") is not None:
+            try:
+                uuid.UUID(str(filters["contract_id"]))
+            except ValueError:
+                return {"error": "ID du contrat invalide"}
+        try:
+            events = self.event_repo.get_event_listing(after_id, limit,
+                                                       stream, **filters)
+            if not stream and not events:
+                return {"error": "Aucun évènement trouvé"}
+            return events
+
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur lors de la récupération des évènements : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
+    @require_permission("read_event", check_ownership=False)
+    def get_event_rows(self, fields: list[str] = None, after_id: int = None,
+                       limit: int = None, **filters):
+        """
+        Lignes des events filtrés, limitées aux colonnes fields (cf.
+        EVENT_FIELDS, toutes par défaut), restituées au fil de l'eau
+        Retourne {"fields": noms des colonnes, "rows": lignes}
+        """
+        unknown = set(fields or ()) - EVENT_FIELDS.keys()
+        if unknown:
+            return {"error": "Champ(s) inconnu(s) : "
+                             f"{', '.join(sorted(unknown))} (disponibles : "
+                             f"{', '.join(EVENT_FIELDS)})"}
+        if filters.get("contract_id") is not None:
+            try:
+                uuid.UUID(str(filters["contract_id"]))
+            except ValueError:
+                return {"error": "ID du contrat invalide"}
+        try:
+            fields = fields or list(EVENT_FIELDS)
+            return {"fields": fields,
+                    "rows": self.event_repo.get_event_rows(
+                        fields, after_id, limit, **filters)}
+
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur lors de la récupération des évènements : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
+    @require_permission("read_event", check_ownership=False)
+    def get_calendar(self, start_from: date = None, start_to: date = None,
+                     user_id: int = None, no_user: bool = False):
+        """
+        Events de la période triés par date de début, restitués au fil de
+        l'eau (requête exécutée ici, résultat à regrouper par jour)
+        """
+        if start_from and start_to and start_to < start_from:
+            return {"error": "La date de fin précède la date de début"}
+        try:
+            return self.event_repo.get_calendar(start_from, start_to,
+                                                user_id, no_user,
+                                                profile="listing")
+
+        except SQLAlchemyError as e:
+            logging.error("Erreur lors de la lecture du calendrier : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
     @require_permission("update_event", check_ownership=True)
     def update_event(self, event_id: int, name: str = None,
                      start_date: str = None, end_date: str = None,
@@ -151,3 +348,103 @@ class EventService:
             logging.error("Erreur lors de la suppression de l'événement "
                           f"{event_id}: {str(e)}")
             return {"error": "Erreur interne"}
+
+
+class AsyncEventService:
+    """
+    Création et lecture des évènements en asynchrone
+    (AsyncEventRepository)
+    """
+    def __init__(self, event_repo, user_repo=None):
+        self.event_repo = event_repo
+        self.user_repo = user_repo
+
+    async def owns(self, user_id: int, event_id: int = None,
+                   contract_id=None, client_id: int = None) -> bool:
+        """Résolveur de responsabilité (require_permission)"""
+        return await self.event_repo.is_owned_by(user_id, event_id,
+                                                 contract_id, client_id)
+
+    @require_permission("create_event", check_ownership=False)
+    async def create_event(self, name: str, contract_id: int,
+                           client_id: int, start_date: str, end_date: str,
+                           location: str, attendees: int, contact: str,
+                           user_id: int, notes: str):
+        """
+        Crée un nouvel événement.
+        Le contrat, le client et l'utilisateur sont chargés en parallèle
+        puis réutilisés pour la vérification de responsabilité
+        """
+        try:
+            contract, client, contact_user = await asyncio.gather(
+                self.event_repo.get_contract(contract_id),
+                self.event_repo.get_client(client_id),
+                self.event_repo.get_user(user_id),
+                )
+            if not contract:
+                logging.debug(f"Contrat introuvable : {contract_id}")
+                return {"error": "Contrat introuvable"}
+            if not client:
+                logging.debug(f"Client introuvable : {client_id}")
+                return {"error": "Client introuvable"}
+            if not contact_user:
+                logging.debug(f"Utilisateur introuvable : {user_id}")
+                return {"error": "Utilisateur introuvable"}
+
+            principal = get_current_principal()
+            if not is_contact(principal, client=client, contract=contract):
+                logging.debug(f"Accès refusé pour {principal.email}, non "
+                              "responsable.")
+                return {"error": "Accès refusé : vous n'êtes pas "
+                        "responsable"}
+
+            return await self.event_repo.create_event(
+                name, contract_id, client_id, start_date, end_date, location,
+                attendees, contact, user_id, notes
+            )
+
+        except SQLAlchemyError as e:
+            logging.error("Erreur lors de la création de l'événement : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne"}
+
+    @require_permission("read_event", check_ownership=False)
+    async def get_events(self, event_id: int = None,
+                         contract_id: str = None,
+                         client_id: int = None,
+                         user_id: int = None,
+                         start_date: datetime = None,
+                         end_date: datetime = None,
+                         no_user: bool = False,
+                         profile: str = None,
+                         after_id: int = None,
+                         limit: int = None,
+                         start_from: date = None,
+                         start_to: date = None,
+                         overlaps: tuple = None):
+        """
+        Récupère les events selon les critères fournis
+        Retourne une erreur si aucun event n'est trouvé.
+        """
+        if contract_id is not None:
+            try:
+                uuid.UUID(str(contract_id))
+            except ValueError:
+                return {"error": "ID du contrat invalide"}
+        try:
+            events = await self.event_repo.get_events(
+                event_id=event_id, contract_id=contract_id,
+                client_id=client_id, user_id=user_id, start_date=start_date,
+                end_date=end_date, no_user=no_user, profile=profile,
+                after_id=after_id, limit=limit, start_from=start_from,
+                start_to=start_to, overlaps=overlaps
+                )
+            if not events:
+                logging.debug("Aucun évènement trouvé")
+                return {"error": "Aucun évènement trouvé"}
+            return events
+
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur lors de la récupération des évènements : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
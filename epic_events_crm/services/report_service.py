@@ -0,0 +1,75 @@
+import logging
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.report import (report_client_unpaid, report_commercial_totals,
+                           report_support_events, report_unassigned_events)
+from repositories.report_repository import ReportRepository
+from utils.permission_utils import (check_permission,
+                                    get_current_principal,
+                                    require_permission)
+
+
+class ReportService:
+    """
+    Tableau de bord : lectures des vues matérialisées en l'état. La vue lue
+    est rafraîchie au préalable, si une écriture l'a rendue obsolète, pour
+    les utilisateurs ayant la permission manage_data
+    """
+    def __init__(self, report_repo: ReportRepository, user_repo=None):
+        self.report_repo = report_repo
+        self.user_repo = user_repo
+
+    def _read(self, label: str, view, reader, *args, **kwargs):
+        try:
+            if check_permission(get_current_principal(), "manage_data"):
+                refreshed = self.report_repo.refresh([view.name])
+                if refreshed:
+                    logging.debug(f"Vue rafraîchie : {view.name}")
+            return reader(*args, **kwargs)
+
+        except SQLAlchemyError as e:
+            self.report_repo.db.rollback()
+            logging.error(f"Erreur SQL lors de la lecture du rapport {label} "
+                          f": {str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
+    @require_permission("read_contract")
+    def get_commercial_totals(self):
+        """Nombre et montants des contrats par commercial"""
+        return self._read("commercials", report_commercial_totals,
+                          self.report_repo.get_commercial_totals)
+
+    @require_permission("read_contract")
+    def get_client_unpaid(self, after_id: int = None, limit: int = None):
+        """Montants restant dus par client"""
+        return self._read("unpaid", report_client_unpaid,
+                          self.report_repo.get_client_unpaid,
+                          after_id, limit)
+
+    @require_permission("read_event")
+    def get_support_events(self):
+        """Nombre d'évènements par support"""
+        return self._read("support", report_support_events,
+                          self.report_repo.get_support_events)
+
+    @require_permission("read_event")
+    def get_unassigned_events(self, days: int = None):
+        """Évènements à venir sans support"""
+        return self._read("unassigned", report_unassigned_events,
+                          self.report_repo.get_unassigned_events, days)
+
+    @require_permission("manage_data")
+    def refresh(self, stale_only: bool = True):
+        """
+        Rafraîchit les vues obsolètes (toutes si stale_only est False).
+        Retourne l'état de rafraîchissement de chaque vue
+        """
+        try:
+            self.report_repo.refresh(stale_only=stale_only)
+            return self.report_repo.get_refresh_state()
+
+        except SQLAlchemyError as e:
+            self.report_repo.db.rollback()
+            logging.error("Erreur SQL lors du rafraîchissement des rapports "
+                          f": {str(e)}")
+            return {"error": "Erreur interne du serveur"}
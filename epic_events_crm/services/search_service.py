@@ -0,0 +1,45 @@
+import logging
+from sqlalchemy.exc import SQLAlchemyError
+
+from repositories.search_repository import SearchRepository
+from utils.permission_utils import require_permission
+
+
+# Longueur minimale du terme recherché
+MIN_TERM_LENGTH = 2
+
+
+class SearchService:
+    def __init__(self, search_repo: SearchRepository, user_repo=None):
+        self.search_repo = search_repo
+        self.user_repo = user_repo
+
+    def _search(self, kind: str, term: str, limit: int, offset: int):
+        term = (term or "").strip()
+        if len(term) < MIN_TERM_LENGTH:
+            return {"error": "Le terme recherché doit contenir au moins "
+                             f"{MIN_TERM_LENGTH} caractères"}
+        if (limit is not None and limit < 1) or offset < 0:
+            return {"error": "Pagination invalide"}
+        try:
+            return self.search_repo.search(kind, term, limit, offset)
+
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur SQL lors de la recherche ({kind}) : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
+    @require_permission("read_client")
+    def search_clients(self, term: str, limit: int = 10, offset: int = 0):
+        """Clients par nom, entreprise ou email (résultats classés)"""
+        return self._search("client", term, limit, offset)
+
+    @require_permission("read_user")
+    def search_users(self, term: str, limit: int = 10, offset: int = 0):
+        """Utilisateurs par nom (résultats classés)"""
+        return self._search("user", term, limit, offset)
+
+    @require_permission("read_event")
+    def search_events(self, term: str, limit: int = 10, offset: int = 0):
+        """Évènements par nom, lieu ou notes (résultats classés)"""
+        return self._search("event", term, limit, offset)
@@ -2,9 +2,12 @@ import logging
 
 from sqlalchemy.exc import SQLAlchemyError
 
-from utils.jwt_utils import create_access_token
+from utils.jwt_utils import create_access_token, build_permission_claims
 from repositories.user_repository import UserRepository
-from utils.auth_utils import clear_token, verify_password, set_password  # noqa: E501
+from utils.auth_utils import (clear_token, verify_password, set_password,
+                              needs_rehash, hash_passwords,
+                              password_hashing_pool)
+from utils.batch_utils import DEFAULT_CHUNK_SIZE, chunked, new_report
 from utils.permission_utils import require_permission
 
 
@@ -18,13 +21,16 @@ class UserService:
         """
         self.user_repo = user_repo
 
-    def authenticate(self, email: str, password: str):
+    def authenticate(self, email: str, password: str,
+                     embed_permissions: bool = True):
         """
         Authentification d'un utilisateur
 
         Args:
             email (str): Email de l'utilisateur
             password (str): Mot de passe de l'utilisateur
+            embed_permissions (bool): Embarque rôle et permissions signés
+                dans le token
 
         Returns:
             str or dict: Token si succès sinon message d'erreur.
@@ -48,8 +54,15 @@ class UserService:
                               "Mot de passe incorrect.")
                 return {"error": "Mot de passe incorrect"}
 
+            # Profil Argon2 modifié depuis le hachage : nouveau hash
+            if needs_rehash(user.hashed_password):
+                self._rehash_password(user, password)
+
             # Créé un token
-            token = create_access_token(data={"sub": str(user.id)})
+            data = {"sub": str(user.id)}
+            if embed_permissions:
+                data.update(build_permission_claims(user))
+            token = create_access_token(data=data)
 
             return token
 
@@ -58,6 +71,16 @@ class UserService:
                           f"{str(e)}")
             return {"error": "Erreur interne"}
 
+    def _rehash_password(self, user, password: str):
+        """Remplace le hash (un échec n'empêche pas la connexion)"""
+        try:
+            self.user_repo.update_user(user.id,
+                                       password=set_password(password))
+            logging.info(f"Mot de passe rehaché pour {user.email}")
+        except SQLAlchemyError as e:
+            self.user_repo.db.rollback()
+            logging.error(f"Échec du rehachage pour {user.email} : {str(e)}")
+
     def logout(self):
         """
         Déconnexion d'un utilisateur
@@ -123,6 +146,56 @@ class UserService:
                           f"{str(e)}")
             return {"error": "Erreur interne"}
 
+    @require_permission("create_user", check_ownership=False)
+    def create_users(self, rows, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     workers: int = None):
+        """
+        Crée des utilisateurs par lots, une transaction par lot.
+        rows : itérable de (numéro de ligne, données validées)
+        Les mots de passe d'un lot sont hachés en parallèle par un pool de
+        workers processus (nombre de CPU par défaut).
+        Les lignes en erreur sont rapportées sans interrompre le batch.
+        """
+        report = new_report()
+        with password_hashing_pool(workers) as pool:
+            for chunk in chunked(rows, chunk_size):
+                # Emails déjà utilisés : une requête par lot
+                used_emails = self.user_repo.get_existing_emails(
+                    [data["email"] for _, data in chunk]
+                    )
+                valid = []
+                for line_number, data in chunk:
+                    if data["email"] in used_emails:
+                        report["errors"].append(
+                            (line_number,
+                             "Cet adresse email est déjà utilisée")
+                            )
+                        continue
+                    used_emails.add(data["email"])
+                    valid.append((line_number, data))
+
+                if not valid:
+                    continue
+                hashes = hash_passwords(
+                    [data.pop("password") for _, data in valid], pool
+                    )
+                for (_, data), hashed_password in zip(valid, hashes):
+                    data["hashed_password"] = hashed_password
+                try:
+                    self.user_repo.bulk_create_users(
+                        [data for _, data in valid], chunk_size
+                        )
+                    report["processed"] += len(valid)
+                except SQLAlchemyError as e:
+                    self.user_repo.db.rollback()
+                    logging.error("Erreur SQL lors de la création d'un lot "
+                                  f"d'utilisateurs : {str(e)}")
+                    report["errors"].extend(
+                        (line_number, "Erreur interne du serveur")
+                        for line_number, _ in valid
+                        )
+        return report
+
     @require_permission("read_user", check_ownership=False)
     def get_user_by_id(self, user_id: int):
         """
@@ -161,13 +234,16 @@ class UserService:
             return {"error": "Erreur interne du serveur"}
 
     @require_permission("read_user", check_ownership=False)
-    def get_user_by_name(self, full_name: str):
+    def get_user_by_name(self, full_name: str, after_id: int = None,
+                         limit: int = None):
         """
         Récupère un utilisateur par son nom
         Retourne une erreur si n'existe pas.
         """
         try:
-            existing_user = self.user_repo.get_user_by_name(full_name)
+            existing_user = self.user_repo.get_user_by_name(
+                full_name, after_id=after_id, limit=limit
+                )
             if not existing_user:
                 logging.debug(f"Utilisateur introuvable depuis : {full_name}")
                 return {"error": "Utilisateur introuvable"}
@@ -179,6 +255,30 @@ class UserService:
                           f"{full_name} : {str(e)}")
             return {"error": "Erreur interne du serveur"}
 
+    @require_permission("read_user", check_ownership=False)
+    def get_user_listing(self, user_id: int = None, email: str = None,
+                         full_name: str = None, after_id: int = None,
+                         limit: int = None):
+        """
+        Utilisateurs par ID, email ou nom, en DTO de lecture seule
+        (cf. UserListing). Retourne une erreur si aucun ne correspond.
+        """
+        try:
+            users = self.user_repo.get_user_listing(
+                user_id, email, full_name, after_id=after_id, limit=limit
+                )
+            if not users:
+                logging.debug("Utilisateur introuvable depuis : "
+                              f"{user_id or email or full_name}")
+                return {"error": "Utilisateur introuvable"}
+
+            return users
+
+        except SQLAlchemyError as e:
+            logging.error("Erreur lors de la récupération des utilisateurs : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
     @require_permission("update_user", check_ownership=False)
     def update_user(self, user_id: str, full_name: str = None,
                     email: str = None, password: str = None,
@@ -230,3 +330,59 @@ class UserService:
             logging.error("Erreur lors de la suppression de l'utilisateur : "
                           f"{str(e)}")
             return {"error": "Erreur interne"}
+
+
+class AsyncUserService:
+    """
+    Lectures d'UserService en asynchrone (AsyncUserRepository)
+    """
+    def __init__(self, user_repo):
+        self.user_repo = user_repo
+
+    @require_permission("read_user", check_ownership=False)
+    async def get_user_by_id(self, user_id: int):
+        """Récupère un utilisateur par son ID."""
+        try:
+            existing_user = await self.user_repo.get_user_by_id(user_id)
+            if not existing_user:
+                logging.debug(f"Utilisateur introuvable avec l'ID {user_id}")
+                return {"error": "Utilisateur introuvable"}
+            return existing_user
+
+        except SQLAlchemyError as e:
+            logging.error("Erreur lors de la récupération de l'utilisateur : "
+                          f"{str(e)}")
+            return {"error": "Erreur interne"}
+
+    @require_permission("read_user", check_ownership=False)
+    async def get_user_by_email(self, email: str):
+        """Récupère un utilisateur par son email."""
+        try:
+            existing_user = await self.user_repo.get_user_by_email(email)
+            if not existing_user:
+                logging.debug(f"Utilisateur introuvable depuis : {email}")
+                return {"error": "Utilisateur introuvable"}
+            return existing_user
+
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur lors de la récupération de l'utilisateur "
+                          f"{email} : {str(e)}")
+            return {"error": "Erreur interne du serveur"}
+
+    @require_permission("read_user", check_ownership=False)
+    async def get_user_by_name(self, full_name: str, after_id: int = None,
+                               limit: int = None):
+        """Récupère les utilisateurs d'un nom donné (paginé)."""
+        try:
+            existing_user = await self.user_repo.get_user_by_name(
+                full_name, after_id=after_id, limit=limit
+                )
+            if not existing_user:
+                logging.debug(f"Utilisateur introuvable depuis : {full_name}")
+                return {"error": "Utilisateur introuvable"}
+            return existing_user
+
+        except SQLAlchemyError as e:
+            logging.error(f"Erreur lors de la récupération de l'utilisateur "
+                          f"{full_name} : {str(e)}")
+            return {"error": "Erreur interne du serveur"}
@@ -1,43 +1,207 @@
 import os
+import re
+import tempfile
 
-from argon2 import PasswordHasher
-from argon2.exceptions import Argon2Error, InvalidHashError
 
-
-ph = PasswordHasher()
+_ph = None
 
 TOKEN_FILE = os.path.expanduser("~/.epic_events_token")
+# Profil de connexion par défaut (surchargé par cli.py --profile)
+PROFILE_ENV = "EPIC_EVENTS_PROFILE"
+
+
+class TokenStore:
+    """
+    Token d'un profil de connexion, stocké dans un fichier et mémorisé
+    pour la durée du processus (un seul accès disque par processus).
+    Profil par défaut : ~/.epic_events_token ; profil nommé :
+    ~/.epic_events_token.<profil>
+    """
+    _unset = object()
+
+    def __init__(self, profile: str = None):
+        if profile and not re.fullmatch(r"[\w.-]+", profile):
+            raise ValueError(f"Nom de profil invalide : {profile}")
+        self.profile = profile or None
+        self.path = f"{TOKEN_FILE}.{profile}" if profile else TOKEN_FILE
+        self._token = self._unset
+
+    def get(self):
+        """Token du profil, None si aucun (lu une seule fois)"""
+        if self._token is self._unset:
+            try:
+                with open(self.path, "r") as f:
+                    self._token = f.read().strip() or None
+            except FileNotFoundError:
+                self._token = None
+        return self._token
+
+    def set(self, token: str):
+        """
+        Écrit le token de manière atomique : fichier temporaire (lisible
+        par le seul propriétaire) puis renommage, sans état intermédiaire
+        visible par un login concurrent
+        """
+        directory = os.path.dirname(self.path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".token-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(token)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._token = token
+
+    def clear(self):
+        """Supprime le token du profil"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self._token = None
+
+
+_token_store = None
+
+
+def get_token_store() -> TokenStore:
+    """Stockage du profil courant (EPIC_EVENTS_PROFILE par défaut)"""
+    global _token_store
+    if _token_store is None:
+        _token_store = TokenStore(os.getenv(PROFILE_ENV))
+    return _token_store
+
+
+def use_profile(profile: str = None) -> TokenStore:
+    """Sélectionne le profil de connexion du processus"""
+    global _token_store
+    _token_store = TokenStore(profile)
+    return _token_store
 
 
 def set_token(token: str):
-    """Stocke le token de manière persistante dans un fichier."""
-    with open(TOKEN_FILE, "w") as f:
-        f.write(token)
+    """Stocke le token du profil courant de manière persistante."""
+    get_token_store().set(token)
 
 
 def get_token():
-    """Récupère le token depuis le fichier, s'il existe."""
-    if not os.path.exists(TOKEN_FILE):
-        return None
-    with open(TOKEN_FILE, "r") as f:
-        token = f.read().strip()
-    return token
+    """Récupère le token du profil courant, s'il existe."""
+    return get_token_store().get()
 
 
 def clear_token():
-    """Supprime le token du fichier."""
-    if os.path.exists(TOKEN_FILE):
-        os.remove(TOKEN_FILE)
+    """Supprime le token du profil courant."""
+    get_token_store().clear()
+
+
+def get_password_hasher():
+    """
+    Importe argon2 et crée le hasheur à la première utilisation, avec le
+    profil de coût configuré (ARGON2_*, cf. calibrate_password_hasher)
+    """
+    global _ph
+    if _ph is None:
+        from argon2 import PasswordHasher
+        from config.config import (ARGON2_MEMORY_COST, ARGON2_PARALLELISM,
+                                   ARGON2_TIME_COST)
+        _ph = PasswordHasher(time_cost=ARGON2_TIME_COST,
+                             memory_cost=ARGON2_MEMORY_COST,
+                             parallelism=ARGON2_PARALLELISM)
+    return _ph
 
 
 def set_password(password: str) -> str:
     # Hash le mot de passe avant de le stocker
-    return ph.hash(password)
+    return get_password_hasher().hash(password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Vrai si le hash a été calculé avec un autre profil de coût"""
+    from argon2.exceptions import InvalidHashError
+
+    try:
+        return get_password_hasher().check_needs_rehash(hashed_password)
+    except InvalidHashError:
+        return True
+
+
+def password_hashing_pool(workers: int = None):
+    """
+    Pool de processus pour hacher des mots de passe en parallèle (Argon2
+    est limité par le CPU). Démarrage « spawn » : sûr depuis le démon
+    multi-thread
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers,
+                               mp_context=multiprocessing.get_context("spawn"))
+
+
+def hash_passwords(passwords: list[str], pool=None) -> list[str]:
+    """
+    Hache une liste de mots de passe, répartis sur pool s'il est fourni
+    (cf. password_hashing_pool), séquentiellement sinon
+    """
+    if pool is None or len(passwords) < 2:
+        return [set_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // ((os.cpu_count() or 1) * 4))
+    return list(pool.map(set_password, passwords, chunksize=chunksize))
+
+
+def calibrate_password_hasher(target_ms: float = 250,
+                              max_memory_cost: int = 65536,
+                              parallelism: int = 4,
+                              samples: int = 3) -> dict:
+    """
+    Mesure Argon2id sur la machine et retourne le profil le plus coûteux
+    dont le hachage reste sous target_ms : mémoire maximale d'abord
+    (divisée par deux tant qu'une seule passe dépasse la cible), puis
+    nombre de passes (time_cost) augmenté tant que la cible est tenue
+
+    Returns:
+        dict: time_cost, memory_cost (KiB), parallelism, elapsed_ms
+    """
+    import time
+    from argon2 import PasswordHasher
+
+    def measure(time_cost: int, memory_cost: int) -> float:
+        hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost,
+                                parallelism=parallelism)
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            hasher.hash("calibration-password")
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
+
+    # Minimum imposé par Argon2 : 8 KiB par voie
+    memory_cost = max(max_memory_cost, 8 * parallelism)
+    elapsed = measure(1, memory_cost)
+    while elapsed > target_ms and memory_cost // 2 >= 8 * parallelism:
+        memory_cost //= 2
+        elapsed = measure(1, memory_cost)
+
+    time_cost = 1
+    while True:
+        next_elapsed = measure(time_cost + 1, memory_cost)
+        if next_elapsed > target_ms:
+            break
+        time_cost += 1
+        elapsed = next_elapsed
+
+    return {"time_cost": time_cost, "memory_cost": memory_cost,
+            "parallelism": parallelism, "elapsed_ms": elapsed}
 
 
 def verify_password(hashed_password: str, password: str) -> bool:
     # Vérifie si le mot de passe correspond au hash stocké
+    from argon2.exceptions import Argon2Error, InvalidHashError
+
     try:
-        return ph.verify(hashed_password, password)
+        return get_password_hasher().verify(hashed_password, password)
     except (Argon2Error, InvalidHashError):
         return False
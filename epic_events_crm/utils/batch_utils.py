@@ -0,0 +1,135 @@
+import click
+import csv
+import json
+from itertools import islice
+
+from utils.validation_utils import validate_columns
+
+
+# Taille par défaut des lots (une transaction par lot)
+DEFAULT_CHUNK_SIZE = 500
+# Lignes validées ensemble par colonnes (validation vectorisée)
+VALIDATION_CHUNK_SIZE = 100_000
+
+
+def chunk_size_option(func):
+    """Option de taille des lots du mode batch des commandes create"""
+    return click.option("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        show_default=True,
+                        help="Nombre de lignes par transaction")(func)
+
+
+def batch_options(func):
+    """Options communes du mode batch des commandes create/update"""
+    func = click.option("--format", "file_format",
+                        type=click.Choice(["csv", "jsonl"]), default=None,
+                        help="Format du fichier (déduit de l'extension)")(func)
+    func = click.option("--from-file", "from_file",
+                        type=click.File("r", encoding="utf-8"), default=None,
+                        help="Fichier CSV ou JSON Lines à importer "
+                        "('-' pour l'entrée standard)")(func)
+    return func
+
+
+def read_rows(stream, file_format: str = None):
+    """
+    Lit un fichier CSV (avec en-tête) ou JSON Lines.
+    Retourne un itérateur de (numéro de ligne, dict)
+    """
+    if file_format is None:
+        name = getattr(stream, "name", "")
+        file_format = "jsonl" if name.endswith((".jsonl", ".json")) else "csv"
+
+    if file_format == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, None
+    else:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def validate_rows(rows, validator, report: dict):
+    """
+    Valide chaque ligne avec validator(row) -> dict de données.
+    Les lignes invalides (ValueError) sont ajoutées aux erreurs du rapport
+    """
+    for line_number, row in rows:
+        if not isinstance(row, dict):
+            report["errors"].append((line_number, "Ligne illisible"))
+            continue
+        try:
+            yield line_number, validator(row)
+        except (ValueError, KeyError, TypeError) as e:
+            report["errors"].append((line_number, str(e)))
+
+
+def validate_column_chunks(rows, rules: dict, report: dict,
+                           chunk_size: int = VALIDATION_CHUNK_SIZE):
+    """
+    Valide par colonnes entières (cf. validate_columns) des lots de lignes
+    déjà lues : rules {champ: "email" | "phone" | "date"}.
+    Les lignes invalides sont ajoutées aux erreurs du rapport
+    """
+    for chunk in chunked(rows, chunk_size):
+        mask, errors = validate_columns(
+            {name: [data.get(name) for _, data in chunk] for name in rules},
+            rules)
+        report["errors"].extend((chunk[index][0], reason)
+                                for index, reason in errors)
+        yield from (row for row, valid in zip(chunk, mask) if valid)
+
+
+def chunked(iterable, size: int):
+    """Découpe un itérable en listes de taille size"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def new_report() -> dict:
+    """Rapport d'exécution d'un batch"""
+    return {"processed": 0, "errors": []}
+
+
+def run_batch(from_file, file_format: str, validator, process, label: str,
+              column_rules: dict = None):
+    """
+    Lit et valide un fichier batch, le traite avec process(lignes valides)
+    puis affiche le rapport (lignes traitées et rejetées)
+    column_rules : formats vérifiés par colonnes après validator (cf.
+    validate_column_chunks) plutôt que ligne à ligne
+    """
+    rejected = new_report()
+    rows = validate_rows(read_rows(from_file, file_format), validator,
+                         rejected)
+    if column_rules:
+        rows = validate_column_chunks(rows, column_rules, rejected)
+    report = process(rows)
+    if isinstance(report, dict) and "errors" in report:
+        report["errors"].extend(rejected["errors"])
+    echo_report(report, label)
+
+
+def echo_report(report: dict, label: str):
+    """Affiche le rapport d'exécution d'un batch"""
+    if isinstance(report, dict) and "error" in report:
+        click.echo(f"❌ Erreur : {report['error']}")
+        return
+
+    click.echo(f"✅ {report['processed']} {label} traité(s).")
+    if "inserted" in report:
+        click.echo(f"   {report['inserted']} créé(s), "
+                   f"{report['updated']} mis à jour.")
+    if report["errors"]:
+        click.echo(f"❌ {len(report['errors'])} ligne(s) rejetée(s) :")
+        for line_number, error in sorted(report["errors"]):
+            click.echo(f"   Ligne {line_number} : {error}")
@@ -1,6 +1,32 @@
-import re
+import click
+import importlib
 from datetime import datetime
 
+from utils.validation_utils import EMAIL_PATTERN, PHONE_PATTERN
+
+
+class LazyGroup(click.Group):
+    """
+    Groupe Click qui n'importe le module d'une sous-commande qu'au moment
+    où elle est invoquée
+
+    lazy_commands : {nom de la commande: "module:attribut"}
+    """
+    def __init__(self, *args, lazy_commands: dict = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) |
+                      set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            module_name, attribute = self.lazy_commands[cmd_name].split(":")
+            module = importlib.import_module(module_name)
+            self.add_command(getattr(module, attribute), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
 
 def is_role_valid(role_name):
     # Mapping des rôles
@@ -14,8 +40,7 @@ def is_role_valid(role_name):
 
 def is_email_valid(email):
     """Vérifie si une adresse email est valide."""
-    email_regex = r"^[\w\.-]+@[\w\.-]+\.\w+$"
-    return re.match(email_regex, email) is not None
+    return EMAIL_PATTERN.match(email) is not None
 
 
 def is_phone_valid(phone: str) -> bool:
@@ -27,8 +52,7 @@ def is_phone_valid(phone: str) -> bool:
       - "0X-12-34-56-78"
       - "0X 23 45 67 89"
     """
-    pattern = r"^(?:\+33|0)[1-9](?:[\s.-]?\d{2}){4}$"
-    return bool(re.match(pattern, phone))
+    return PHONE_PATTERN.match(phone) is not None
 
 
 def is_password_valid(password):
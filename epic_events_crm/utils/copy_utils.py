@@ -0,0 +1,56 @@
+import csv
+import io
+from itertools import islice
+
+
+# Lignes converties en CSV à chaque remplissage du flux COPY
+CSV_STREAM_ROWS = 1000
+# Formats des fichiers d'export du jeu de données (un fichier par table)
+DATASET_FORMATS = ["csv", "parquet"]
+# Lignes lues par lot (curseur serveur) et par groupe de lignes Parquet
+EXPORT_CHUNK_SIZE = 50_000
+
+
+class CsvStream:
+    """
+    Flux lisible (read) produisant au fil de l'eau le CSV des lignes rows :
+    alimente un COPY ... FROM STDIN sans matérialiser le fichier
+    """
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._pending) < size:
+            chunk = list(islice(self._rows, CSV_STREAM_ROWS))
+            if not chunk:
+                break
+            self._writer.writerows(chunk)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+def copy_expert(session, statement: str, file) -> int:
+    """
+    Exécute un COPY ... STDIN/STDOUT avec le curseur psycopg2 de la
+    transaction de la session. Retourne le nombre de lignes copiées
+    """
+    connection = session.connection()
+    cursor = connection.connection.cursor()
+    try:
+        if not hasattr(cursor, "copy_expert"):
+            raise RuntimeError("COPY indisponible : le pilote psycopg2 est "
+                               "requis")
+        cursor.copy_expert(statement, file)
+        return cursor.rowcount
+    except connection.dialect.loaded_dbapi.Error as e:
+        raise RuntimeError(f"Échec du COPY : {e}") from e
+    finally:
+        cursor.close()
@@ -0,0 +1,199 @@
+import logging
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from sqlalchemy import inspect
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import configure_mappers
+
+from config.config import db_session, get_engine
+from utils.auth_utils import get_password_hasher
+from utils.daemon_utils import (SOCKET_PATH, DaemonClient, dumps, loads,
+                                encode_value, decode_value)
+from utils.jwt_utils import decode_access_token
+from utils.permission_utils import resolve_principal
+from utils.principal_utils import (Principal, set_current_principal,
+                                   clear_current_principal)
+from utils.query_utils import RowDTO
+from utils.service_utils import SERVICES, build_service
+
+
+# Relations transmises avec chaque modèle (affichées par les commandes)
+SERIALIZED_RELATIONSHIPS = {
+    "User": ("role",),
+    "Contract": ("client",),
+    "Event": ("contract", "user"),
+}
+# Colonnes jamais transmises (mot de passe, index de recherche)
+SERIALIZE_EXCLUDE = {"hashed_password", "search_vector"}
+# Opérations non exposées : fichier du token, résolveurs de responsabilité
+LOCAL_ONLY = {("user", "logout"), ("client", "owns"), ("contract", "owns"),
+              ("event", "owns")}
+# Nombre de tokens dont le principal est conservé en cache
+PRINCIPAL_CACHE_SIZE = 256
+
+
+def serialize(value):
+    """Convertit le résultat d'un service (modèles ORM compris) pour JSON"""
+    if hasattr(value, "__table__"):
+        return serialize_model(value)
+    if isinstance(value, (Principal, RowDTO)):
+        return {"$obj": {name: encode_value(getattr(value, name))
+                         for name in type(value).__slots__}}
+    if isinstance(value, dict):
+        return {str(key): serialize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, Row)) or hasattr(value, "__next__"):
+        return [serialize(item) for item in value]
+    return encode_value(value)
+
+
+def serialize_model(obj) -> dict:
+    """Colonnes du modèle et relations listées dans SERIALIZED_RELATIONSHIPS"""
+    mapper = inspect(obj).mapper
+    fields = {
+        attr.key: encode_value(getattr(obj, attr.key))
+        for attr in mapper.column_attrs
+        if attr.key not in SERIALIZE_EXCLUDE
+        }
+    for name in SERIALIZED_RELATIONSHIPS.get(type(obj).__name__, ()):
+        fields[name] = serialize(getattr(obj, name))
+    return {"$obj": fields}
+
+
+class CRMDaemon:
+    """
+    Exécute les opérations des services pour les clients CLI.
+    Conserve le pool de connexions, les mappers configurés et les
+    principaux déjà résolus entre les requêtes
+    """
+    def __init__(self):
+        self.services = {name: build_service(name) for name in SERVICES}
+        self.user_repo = self.services["user"].user_repo
+        self._principals = OrderedDict()  # token -> (principal, exp)
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        """Prépare les mappers, le pool de connexions et Argon2"""
+        configure_mappers()
+        with get_engine().connect():
+            pass
+        get_password_hasher()
+
+    def principal(self, token: str):
+        """Principal du token (cache jusqu'à expiration du token)"""
+        now = time.time()
+        with self._lock:
+            cached = self._principals.get(token)
+            if cached and cached[1] > now:
+                self._principals.move_to_end(token)
+                return cached[0]
+
+        clear_current_principal()
+        principal = resolve_principal(self.user_repo, token)
+        if isinstance(principal, Principal):
+            try:
+                expires = decode_access_token(token).get("exp", 0)
+            except jwt.InvalidTokenError:
+                expires = 0
+            with self._lock:
+                self._principals[token] = (principal, expires)
+                while len(self._principals) > PRINCIPAL_CACHE_SIZE:
+                    self._principals.popitem(last=False)
+        return principal
+
+    def call(self, request: dict):
+        """Appelle la méthode de service demandée pour le principal"""
+        name = request.get("service")
+        method_name = request.get("method") or ""
+        service = self.services.get(name)
+        if (service is None or method_name.startswith("_")
+                or (name, method_name) in LOCAL_ONLY
+                or not callable(getattr(type(service), method_name, None))):
+            raise ValueError(f"Opération inconnue : {name}.{method_name}")
+        method = getattr(service, method_name)
+
+        token = request.get("token")
+        if token:
+            principal = self.principal(token)
+            if isinstance(principal, Principal):
+                set_current_principal(principal)
+            elif getattr(method, "permission", None):
+                return principal
+        elif getattr(method, "permission", None):
+            return {"error": "Utilisateur non authentifié"}
+
+        args = decode_value(request.get("args") or [])
+        kwargs = decode_value(request.get("kwargs") or {})
+        return method(*args, **kwargs)
+
+    def handle(self, line: bytes) -> dict:
+        """Traite une requête et retourne la réponse à envoyer"""
+        try:
+            request = loads(line)
+            op = request.get("op")
+            if op == "call":
+                result = self.call(request)
+            elif op == "whoami":
+                token = request.get("token")
+                result = (self.principal(token) if token
+                          else {"error": "Authentification requise"})
+            elif op == "ping":
+                result = "pong"
+            else:
+                raise ValueError(f"Opération inconnue : {op}")
+            return {"result": serialize(result)}
+        except Exception as e:
+            logging.exception("Erreur lors du traitement d'une requête")
+            db_session.rollback()
+            return {"exception": str(e)}
+        finally:
+            clear_current_principal()
+            db_session.remove()
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Une connexion CLI : une requête JSON par ligne"""
+    def handle(self):
+        for line in self.rfile:
+            if line.strip():
+                self.wfile.write(dumps(self.server.crm.handle(line)))
+
+
+class DaemonServer(socketserver.ThreadingMixIn,
+                   socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, crm: CRMDaemon):
+        self.crm = crm
+        # Socket accessible au seul propriétaire du démon
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+
+def serve(path: str = SOCKET_PATH):
+    """Démarre le démon sur la socket path (bloquant)"""
+    if os.path.exists(path):
+        client = DaemonClient.connect(path)
+        if client is not None:
+            client.close()
+            raise RuntimeError(f"Un démon écoute déjà sur {path}")
+        # Socket orpheline d'un démon arrêté
+        os.remove(path)
+
+    crm = CRMDaemon()
+    crm.warm_up()
+    server = DaemonServer(path, crm)
+    logging.info(f"Démon CRM à l'écoute sur {path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
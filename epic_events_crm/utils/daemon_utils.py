@@ -0,0 +1,168 @@
+import datetime
+import json
+import os
+import socket
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+
+
+""" Protocole du démon CRM (socket Unix, une requête JSON par ligne) """
+
+# Chemin de la socket du démon (surchargeable par variable d'environnement)
+SOCKET_PATH = os.path.expanduser(
+    os.getenv("EPIC_EVENTS_SOCKET", "~/.epic_events.sock"))
+# Désactive l'utilisation du démon par la CLI
+NO_DAEMON = os.getenv("EPIC_EVENTS_NO_DAEMON", "").lower() in (
+    "1", "true", "yes")
+
+# Types transportés avec une étiquette : {"$<étiquette>": valeur}
+_TAGS = {
+    "$dec": Decimal,
+    "$uuid": uuid.UUID,
+    "$date": datetime.date.fromisoformat,
+    "$dt": datetime.datetime.fromisoformat,
+}
+
+
+class DaemonError(Exception):
+    """Erreur de transport ou exception non gérée côté démon"""
+
+
+class RemoteObject(SimpleNamespace):
+    """Objet renvoyé par le démon (attributs d'un modèle sérialisé)"""
+
+
+def encode_value(value):
+    """Convertit une valeur en structure JSON (types étiquetés)"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"$uuid": str(value)}
+    if isinstance(value, datetime.datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, RemoteObject):
+        return {"$obj": {key: encode_value(item)
+                         for key, item in vars(value).items()}}
+    if isinstance(value, dict):
+        return {str(key): encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)) or hasattr(
+            value, "__next__"):
+        return [encode_value(item) for item in value]
+    raise TypeError(f"Valeur non transportable : {type(value).__name__}")
+
+
+def decode_value(value):
+    """Reconstruit une valeur encodée par encode_value"""
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1:
+        (key, item), = value.items()
+        if key in _TAGS:
+            return _TAGS[key](item)
+        if key == "$obj":
+            return RemoteObject(**{name: decode_value(field)
+                                   for name, field in item.items()})
+    return {key: decode_value(item) for key, item in value.items()}
+
+
+def dumps(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def loads(line: bytes) -> dict:
+    return json.loads(line)
+
+
+class DaemonClient:
+    """Connexion persistante au démon, réutilisée par tous les appels"""
+    def __init__(self, sock: socket.socket, token: str = None):
+        self.sock = sock
+        self.stream = sock.makefile("rb")
+        self.token = token
+
+    @classmethod
+    def connect(cls, path: str = SOCKET_PATH, token: str = None):
+        """Se connecte au démon, None s'il ne répond pas"""
+        if not os.path.exists(path):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            return None
+        return cls(sock, token)
+
+    def request(self, op: str, **fields):
+        """Envoie une requête et retourne le résultat décodé"""
+        message = {"op": op, "token": self.token}
+        message.update(fields)
+        try:
+            self.sock.sendall(dumps(message))
+            line = self.stream.readline()
+        except OSError as e:
+            raise DaemonError(f"Démon injoignable : {e}")
+        if not line:
+            raise DaemonError("Connexion au démon interrompue")
+        response = loads(line)
+        if "exception" in response:
+            raise DaemonError(response["exception"])
+        return decode_value(response.get("result"))
+
+    def call(self, service: str, method: str, args=(), kwargs=None):
+        """Appelle une opération de service exposée par le démon"""
+        return self.request("call", service=service, method=method,
+                            args=encode_value(list(args)),
+                            kwargs=encode_value(kwargs or {}))
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+
+class RemoteService:
+    """Mandataire d'un service : chaque méthode est un appel au démon"""
+    def __init__(self, client: DaemonClient, name: str):
+        self._client = client
+        self._name = name
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def remote_call(*args, **kwargs):
+            return self._client.call(self._name, method, args, kwargs)
+        remote_call.__name__ = method
+        return remote_call
+
+
+_client = None
+
+
+def get_daemon_client():
+    """
+    Retourne la connexion au démon (ouverte une fois par processus),
+    None si le démon n'est pas démarré
+    """
+    global _client
+    if _client is None and NO_DAEMON:
+        _client = False
+    if _client is None:
+        from utils.auth_utils import get_token
+        _client = DaemonClient.connect(token=get_token()) or False
+    return _client or None
+
+
+def close_daemon_client():
+    """Ferme la connexion au démon si elle a été ouverte"""
+    global _client
+    if _client:
+        _client.close()
+    _client = None
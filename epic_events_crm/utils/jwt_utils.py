@@ -4,6 +4,8 @@ import logging
 
 from typing import Optional
 from config.config import SECRET_KEY
+from config.init_permissions import (PERMISSIONS_VERSION, permissions_to_mask,
+                                     mask_to_permissions)
 from repositories.user_repository import UserRepository
 
 # Définir la durée d'expiration par défaut du token
@@ -32,10 +34,49 @@ def create_access_token(data: dict,
     return encoded_jwt
 
 
+# Fonction pour construire les claims de permissions d'un User
+def build_permission_claims(user) -> dict:
+    """
+    Claims signés embarqués dans le token : rôle, masque de permissions et
+    version de la matrice rôles/permissions
+    """
+    role = user.role
+    permissions = [perm.name for perm in role.permissions] if role else []
+    return {
+        "email": user.email,
+        "name": user.full_name,
+        "role": role.name if role else None,
+        "perms": permissions_to_mask(permissions),
+        "pv": PERMISSIONS_VERSION,
+    }
+
+
+# Fonction pour décoder un token JWT (lève les erreurs jwt)
+def decode_access_token(token: str) -> dict:
+    return jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+
+
+# Fonction pour lire les permissions embarquées si elles sont à jour
+def get_permission_claims(payload: dict) -> Optional[dict]:
+    """
+    Retourne les claims de permissions du payload, None si absents ou si la
+    version ne correspond plus (retour à la base de données)
+    """
+    if "perms" not in payload or payload.get("pv") != PERMISSIONS_VERSION:
+        return None
+    return {
+        "id": int(payload["sub"]),
+        "email": payload.get("email"),
+        "full_name": payload.get("name"),
+        "role": payload.get("role"),
+        "permissions": mask_to_permissions(payload["perms"]),
+    }
+
+
 # Fonction pour vérifier un token JWT et récupérer un User
 def get_current_user(token: str, user_repo: UserRepository) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+        payload = decode_access_token(token)
         user_id = payload.get("sub")
         if not user_id:
             return {"error": "Utilisateur introuvable"}
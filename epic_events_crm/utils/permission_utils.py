@@ -1,17 +1,85 @@
 import functools
+import inspect
 import logging
 
-from utils.jwt_utils import get_current_user
+import jwt
+
+from utils.jwt_utils import (get_current_user, decode_access_token,
+                             get_permission_claims)
 from utils.auth_utils import get_token
-from repositories.client_repository import Client
-from repositories.contract_repository import Contract
-from repositories.event_repository import Event
+from utils.principal_utils import (  # noqa: F401
+    Principal, get_current_principal, set_current_principal,
+    clear_current_principal)
+
+
+def resolve_principal(user_repo, token: str = None):
+    """
+    Retourne le principal courant, le construit depuis le token si besoin
+    (token fourni, sinon celui du fichier).
+    Retourne un dict d'erreur si l'utilisateur ne peut pas être résolu.
+    """
+    principal = get_current_principal()
+    if principal is not None:
+        return principal
+
+    token = token or get_token()
+    if not token:
+        raise Exception("Authentification requise")
+
+    # Claims de permissions à jour dans le token : aucune requête en base
+    try:
+        claims = get_permission_claims(decode_access_token(token))
+    except jwt.InvalidTokenError:
+        claims = None
+    if claims:
+        return set_current_principal(Principal.from_claims(claims))
+
+    user = get_current_user(token, user_repo)
+    if isinstance(user, dict) and "error" in user:
+        return user
+    if not user:
+        return {"error": "Utilisateur non authentifié"}
+    return set_current_principal(user)
+
+
+async def aresolve_principal(user_repo, token: str = None):
+    """
+    Équivalent asynchrone de resolve_principal (user_repo asynchrone)
+    """
+    principal = get_current_principal()
+    if principal is not None:
+        return principal
+
+    token = token or get_token()
+    if not token:
+        raise Exception("Authentification requise")
+
+    try:
+        payload = decode_access_token(token)
+    except jwt.ExpiredSignatureError:
+        logging.debug("Le token a expiré")
+        return {"error": "Token expiré: Reconnectez-vous"}
+    except jwt.InvalidTokenError:
+        logging.debug("Token invalide")
+        return {"error": "Token invalide: Reconnectez-vous"}
+
+    claims = get_permission_claims(payload)
+    if claims:
+        return set_current_principal(Principal.from_claims(claims))
+
+    user_id = payload.get("sub")
+    user = await user_repo.get_user_by_id(user_id) if user_id else None
+    if not user:
+        return {"error": "Utilisateur non authentifié"}
+    return set_current_principal(user)
 
 
 def check_permission(user, permission_name: str):
     """
     Vérifie si l'utilisateur a une permission spécifique.
     """
+    if isinstance(user, Principal):
+        return user.has_permission(permission_name)
     if not user or not user.role or not user.role.permissions:
         return False  # Aucune permission disponible
     user_permissions = {perm.name for perm in user.role.permissions}
@@ -35,61 +103,83 @@ def is_contact(user, client=None, contract=None, event=None):
             contract = event.contract
             if contract.user_id == user.id:
                 return True
-    print(client)
-    print(contract)
-    print(event)
     return False
 
 
+# Arguments identifiant les objets dont la responsabilité est vérifiée
+OWNERSHIP_ARGUMENTS = ("event_id", "contract_id", "client_id")
+
+
+def ownership_binder(func):
+    """
+    Calcule une fois, à la décoration, les arguments de responsabilité de
+    func. Retourne bind(self, args, kwargs) -> {argument: valeur}
+    """
+    signature = inspect.signature(func)
+    names = [name for name in OWNERSHIP_ARGUMENTS
+             if name in signature.parameters]
+    if not names:
+        raise TypeError(f"{func.__qualname__} : aucun argument parmi "
+                        f"{', '.join(OWNERSHIP_ARGUMENTS)}")
+
+    def bind(self, args, kwargs) -> dict:
+        arguments = signature.bind_partial(self, *args, **kwargs).arguments
+        return {name: arguments.get(name) for name in names}
+    return bind
+
+
+def _deny_ownership(user):
+    logging.debug(f"Accès refusé pour {user.email}, non responsable.")
+    return {"error": "Accès refusé : vous n'êtes pas responsable"}
+
+
+def _check_access(user, permission):
+    """Dict d'erreur si le principal est absent ou sans la permission"""
+    if isinstance(user, dict) and "error" in user:
+        logging.debug("Utilisateur non authentifié")
+        return {"error": "Utilisateur non authentifié"}
+    if not check_permission(user, permission):
+        logging.debug(f"Permission refusée pour {user.email} : "
+                      f"{permission}")
+        return {"error": "Permission refusée"}
+    return None
+
+
 def require_permission(permission, check_ownership=False):
     """
     Décorateur pour vérifier une permission
+    check_ownership : vérifie aussi la responsabilité via self.owns(
+    user_id, **arguments de responsabilité), résolveur du service
     """
     def decorator(func):
-        @functools.wraps(func)
-        def wrapper(self, *args, **kwargs):
-            # Récupération de l'utilisateur à partir du contexte
-            token = get_token()
-            if not token:
-                raise Exception("Authentification requise")
-            user = get_current_user(token, self.user_repo)
-            if not user:
-                logging.debug("Utilisateur non authentifié")
-                return {"error": "Utilisateur non authentifié"}
-
-            # Vérifier la permission globale
-            if not check_permission(user, permission):
-                logging.debug("Permission refusée pour {user.email} : "
-                              f"{permission}")
-                return {"error": "Permission refusée"}
-
-            # Vérifier si l'utilisateur est responsable
-            if check_ownership:
-                contract_id = kwargs.get("contract_id") or (
-                    args[1] if len(args) > 1 else None)
-                event_id = kwargs.get("event_id") or (
-                    args[2] if len(args) > 2 else None)
-                client_id = kwargs.get("client_id") or (
-                    args[3] if len(args) > 3 else None)
-
-                contract = self.event_repo.db.query(Contract).filter(
-                    Contract.id == contract_id
-                ).first() if contract_id else None
-
-                event = self.event_repo.db.query(Event).filter(
-                    Event.id == event_id
-                ).first() if event_id else None
-
-                client = self.event_repo.db.query(Client).filter(
-                    Client.id == client_id
-                ).first() if client_id else None
-
-                if not is_contact(user, client=client, contract=contract,
-                                  event=event):
-                    logging.debug(f"Accès refusé pour {user.email}, non "
-                                  "responsable.")
-                    return {"error": "Accès refusé : vous n'êtes pas "
-                            "responsable"}
-            return func(self, *args, **kwargs)
+        bind = ownership_binder(func) if check_ownership else None
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(self, *args, **kwargs):
+                user = await aresolve_principal(self.user_repo)
+                error = _check_access(user, permission)
+                if error:
+                    return error
+                if bind and not await self.owns(user.id,
+                                                **bind(self, args, kwargs)):
+                    return _deny_ownership(user)
+                return await func(self, *args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(self, *args, **kwargs):
+                # Récupération du principal (résolu une fois par invocation)
+                user = resolve_principal(self.user_repo)
+                error = _check_access(user, permission)
+                if error:
+                    return error
+                # Responsabilité : une requête EXISTS du résolveur
+                if bind and not self.owns(user.id,
+                                          **bind(self, args, kwargs)):
+                    return _deny_ownership(user)
+                return func(self, *args, **kwargs)
+
+        # Permission requise, consultée par le démon avant l'appel
+        wrapper.permission = permission
         return wrapper
     return decorator
@@ -0,0 +1,63 @@
+import contextvars
+
+
+class Principal:
+    """
+    Instantané de l'utilisateur authentifié : ID, rôle et permissions figées.
+    Construit une seule fois par invocation (ou par requête)
+    """
+    __slots__ = ("id", "email", "full_name", "role", "permissions")
+
+    def __init__(self, id: int, email: str, full_name: str, role: str,
+                 permissions: frozenset):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.role = role
+        self.permissions = permissions
+
+    @classmethod
+    def from_user(cls, user):
+        """Construit le principal depuis un User et son rôle"""
+        role = user.role
+        permissions = frozenset(
+            perm.name for perm in role.permissions
+            ) if role else frozenset()
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=role.name if role else None,
+            permissions=permissions
+        )
+
+    @classmethod
+    def from_claims(cls, claims: dict):
+        """Construit le principal depuis les claims signés du token"""
+        return cls(**claims)
+
+    def has_permission(self, permission_name: str) -> bool:
+        return permission_name in self.permissions
+
+
+# Principal courant (un par invocation CLI ou par contexte de requête)
+_current_principal = contextvars.ContextVar("current_principal",
+                                            default=None)
+
+
+def get_current_principal():
+    """Retourne le principal courant, None si non résolu"""
+    return _current_principal.get()
+
+
+def set_current_principal(principal):
+    """Définit le principal courant (Principal, User ou None)"""
+    if principal is not None and not isinstance(principal, Principal):
+        principal = Principal.from_user(principal)
+    _current_principal.set(principal)
+    return principal
+
+
+def clear_current_principal():
+    """Oublie le principal courant (login/logout)"""
+    _current_principal.set(None)
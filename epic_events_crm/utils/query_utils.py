@@ -0,0 +1,129 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Query
+
+
+# Nombre de lignes chargées par lot en mode streaming
+STREAM_CHUNK_SIZE = 1000
+
+
+def stream_query(query: Query, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Exécute immédiatement la requête : les erreurs SQL sont levées à
+    l'appel, dans le service, et non pendant le parcours. Retourne le
+    résultat (entités ou lignes) lu par lots de chunk_size (yield_per)
+    """
+    result = query.session.execute(
+        query.statement.execution_options(yield_per=chunk_size))
+    return result.scalars() if query.is_single_entity else result
+
+
+def paginate(query: Query, key_column, after_id=None, limit: int = None,
+             stream: bool = False):
+    """
+    Applique une pagination par curseur (keyset) sur key_column.
+
+    Args:
+        query (Query): Requête à paginer
+        key_column: Colonne unique et ordonnée servant de curseur
+        after_id: Dernière clé de la page précédente
+        limit (int): Nombre maximum de lignes
+        stream (bool): Retourne le résultat lu au fil de l'eau (cf.
+            stream_query) au lieu d'une liste
+
+    Returns:
+        list or Result: Lignes de la page
+    """
+    query = keyset(query, key_column, after_id, limit)
+    if stream:
+        return stream_query(query)
+    return query.all()
+
+
+def keyset(query, key_column, after_id=None, limit: int = None):
+    """
+    Ordonne sur key_column, filtre après le curseur et limite
+    (Query ou select())
+    """
+    query = query.order_by(key_column)
+    if after_id is not None:
+        query = query.filter(key_column > after_id)
+    if limit:
+        query = query.limit(limit)
+    return query
+
+
+def project(query: Query, fields: dict, names, joins: dict = None):
+    """
+    Restreint la requête aux colonnes nommées (clés de fields), sans
+    charger d'objets ORM ni de relations.
+    joins : {modèle: ((cible, condition), ...)} jointures externes
+    ajoutées, dans l'ordre, si une colonne du modèle est demandée
+    """
+    query = query.with_entities(*(fields[name].label(name)
+                                  for name in names))
+    for model, steps in (joins or {}).items():
+        if any(fields[name].class_ is model for name in names):
+            for target, condition in steps:
+                query = query.outerjoin(target, condition)
+    return query
+
+
+class RowDTO:
+    """
+    Ligne en lecture seule d'une projection select() : un attribut par
+    colonne (__slots__), sans état ORM ni entrée dans l'identity map.
+    Les sous-classes déclarent __slots__ et COLUMNS dans le même ordre
+    """
+    __slots__ = ()
+    COLUMNS = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def select(cls):
+        """select() des colonnes du DTO"""
+        return select(*cls.COLUMNS)
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}"
+                           for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+def execute_stream(session, statement, key_column, after_id=None,
+                   limit: int = None):
+    """
+    Exécute immédiatement une requête paginée (keyset sur key_column ;
+    Query ou select()) : les erreurs SQL sont levées à l'appel, dans le
+    service, et non pendant le parcours. Retourne le Result, lu par lots
+    de STREAM_CHUNK_SIZE (curseur serveur)
+    """
+    statement = keyset(statement, key_column, after_id, limit)
+    if isinstance(statement, Query):
+        statement = statement.statement
+    return session.execute(
+        statement.execution_options(yield_per=STREAM_CHUNK_SIZE))
+
+
+def fetch_dtos(session, statement, dto: type, key_column, after_id=None,
+               limit: int = None, stream: bool = False):
+    """
+    Exécute une projection paginée (keyset sur key_column) et construit
+    un DTO par ligne. stream : générateur (lots de STREAM_CHUNK_SIZE)
+    """
+    if stream:
+        result = execute_stream(session, statement, key_column, after_id,
+                                limit)
+        return (dto(*row) for row in result)
+    statement = keyset(statement, key_column, after_id, limit)
+    return [dto(*row) for row in session.execute(statement)]
+
+
+async def apaginate(session, statement, key_column, after_id=None,
+                    limit: int = None) -> list:
+    """Équivalent asynchrone de paginate pour un select() (AsyncSession)"""
+    result = await session.scalars(
+        keyset(statement, key_column, after_id, limit))
+    return result.unique().all()
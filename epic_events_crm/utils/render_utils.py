@@ -0,0 +1,149 @@
+import click
+import csv
+import json
+from itertools import chain, islice
+
+
+# Formats de sortie des commandes get (--format)
+FORMATS = ["table", "json", "jsonl", "csv"]
+# Taille du tampon de sortie (caractères)
+OUTPUT_BUFFER_SIZE = 1 << 16
+# Lignes lues pour calculer la largeur des colonnes d'une table
+TABLE_SAMPLE_SIZE = 200
+
+
+def format_options(func):
+    """Options de rendu communes : --format et --fields"""
+    func = click.option("--fields", default=None,
+                        help="Colonnes affichées, séparées par des virgules "
+                             "(avec --format)")(func)
+    func = click.option("--format", "output_format",
+                        type=click.Choice(FORMATS), default=None,
+                        help="Sortie table, JSON, JSON Lines ou CSV "
+                             "(lisible par un script)")(func)
+    return func
+
+
+def parse_fields(fields: str):
+    """Liste des colonnes de --fields, None si toutes"""
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(",") if name.strip()]
+
+
+class BufferedOutput:
+    """
+    Regroupe les écritures sur la sortie standard : une écriture toutes
+    les OUTPUT_BUFFER_SIZE caractères au lieu d'un click.echo par ligne
+    """
+    def __init__(self, stream=None, size: int = OUTPUT_BUFFER_SIZE):
+        self.stream = stream or click.get_text_stream("stdout")
+        self.size = size
+        self._parts = []
+        self._length = 0
+
+    def write(self, text: str):
+        self._parts.append(text)
+        self._length += len(text)
+        if self._length >= self.size:
+            self.flush()
+
+    def flush(self):
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self._parts.clear()
+            self._length = 0
+        self.stream.flush()
+
+
+def cell(value) -> str:
+    """Valeur affichée dans une table ou un CSV"""
+    return "" if value is None else str(value)
+
+
+def render_table(rows, fields: list[str], out) -> int:
+    """Table alignée ; largeurs calculées sur les premières lignes"""
+    rows = iter(rows)
+    sample = [[cell(value) for value in row]
+              for row in islice(rows, TABLE_SAMPLE_SIZE)]
+    widths = [max([len(name)] + [len(row[i]) for row in sample])
+              for i, name in enumerate(fields)]
+
+    def line(values):
+        return "  ".join(value.ljust(width)
+                         for value, width in zip(values, widths)).rstrip()
+
+    out.write(line(fields) + "\n")
+    out.write(line("-" * width for width in widths) + "\n")
+    count = 0
+    for values in chain(sample, ([cell(value) for value in row]
+                                 for row in rows)):
+        out.write(line(values) + "\n")
+        count += 1
+    return count
+
+
+def render_json(rows, fields: list[str], out) -> int:
+    """Tableau JSON écrit objet par objet (mémoire constante)"""
+    count = 0
+    out.write("[")
+    for row in rows:
+        out.write(",\n" if count else "\n")
+        out.write(json.dumps(dict(zip(fields, row)), default=str,
+                             ensure_ascii=False))
+        count += 1
+    out.write("\n]\n" if count else "]\n")
+    return count
+
+
+def render_jsonl(rows, fields: list[str], out) -> int:
+    """Un objet JSON par ligne"""
+    count = 0
+    for row in rows:
+        out.write(json.dumps(dict(zip(fields, row)), default=str,
+                             ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def render_csv(rows, fields: list[str], out) -> int:
+    """CSV avec en-tête"""
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(fields)
+    count = 0
+    for row in rows:
+        writer.writerow([cell(value) for value in row])
+        count += 1
+    return count
+
+
+RENDERERS = {
+    "table": render_table,
+    "json": render_json,
+    "jsonl": render_jsonl,
+    "csv": render_csv,
+}
+
+
+def render(rows, fields: list[str], output_format: str,
+           stream=None) -> int:
+    """
+    Écrit rows (séquences de valeurs dans l'ordre de fields) au format
+    demandé sur une sortie tamponnée. Retourne le nombre de lignes
+    """
+    out = BufferedOutput(stream)
+    try:
+        return RENDERERS[output_format](rows, fields, out)
+    finally:
+        out.flush()
+
+
+def object_rows(objects, fields: list[str], getters: dict = None):
+    """
+    Lignes des attributs fields d'objets déjà chargés
+    getters : {champ: fonction(objet)} pour les valeurs calculées
+    """
+    getters = getters or {}
+    for obj in objects:
+        yield [getters[name](obj) if name in getters
+               else getattr(obj, name) for name in fields]
@@ -0,0 +1,82 @@
+import importlib
+
+from utils.daemon_utils import RemoteService, get_daemon_client
+
+
+# Services exposés aux commandes : nom -> (service, repository)
+SERVICES = {
+    "user": ("services.user_service:UserService",
+             "repositories.user_repository:UserRepository"),
+    "client": ("services.client_service:ClientService",
+               "repositories.client_repository:ClientRepository"),
+    "contract": ("services.contract_service:ContractService",
+                 "repositories.contract_repository:ContractRepository"),
+    "event": ("services.event_service:EventService",
+              "repositories.event_repository:EventRepository"),
+    "report": ("services.report_service:ReportService",
+               "repositories.report_repository:ReportRepository"),
+    "search": ("services.search_service:SearchService",
+               "repositories.search_repository:SearchRepository"),
+    "dataset": ("services.dataset_service:DatasetService",
+                "repositories.dataset_repository:DatasetRepository"),
+}
+
+# Variantes asynchrones (AsyncSession / asyncpg)
+ASYNC_SERVICES = {
+    "user": ("services.user_service:AsyncUserService",
+             "repositories.user_repository:AsyncUserRepository"),
+    "client": ("services.client_service:AsyncClientService",
+               "repositories.client_repository:AsyncClientRepository"),
+    "contract": ("services.contract_service:AsyncContractService",
+                 "repositories.contract_repository:AsyncContractRepository"),
+    "event": ("services.event_service:AsyncEventService",
+              "repositories.event_repository:AsyncEventRepository"),
+}
+
+_services = {}
+
+
+def _load(path: str):
+    module_name, attribute = path.split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def build_service(name: str):
+    """
+    Construit un service local sur la session partagée
+    (import de SQLAlchemy à la demande)
+    """
+    from config.config import db_session
+
+    service_path, repo_path = SERVICES[name]
+    user_repo = _load(SERVICES["user"][1])(db_session)
+    if name == "user":
+        return _load(service_path)(user_repo)
+    return _load(service_path)(_load(repo_path)(db_session), user_repo)
+
+
+def build_async_service(name: str):
+    """
+    Construit un service asynchrone ; ses repositories ouvrent une
+    AsyncSession par opération
+    """
+    from config.config import get_async_sessionmaker
+
+    sessions = get_async_sessionmaker()
+    service_path, repo_path = ASYNC_SERVICES[name]
+    user_repo = _load(ASYNC_SERVICES["user"][1])(sessions)
+    if name == "user":
+        return _load(service_path)(user_repo)
+    return _load(service_path)(_load(repo_path)(sessions), user_repo)
+
+
+def get_service(name: str):
+    """
+    Retourne le service demandé : mandataire du démon s'il est démarré,
+    service local sinon
+    """
+    if name not in _services:
+        client = get_daemon_client()
+        _services[name] = (RemoteService(client, name) if client
+                           else build_service(name))
+    return _services[name]
@@ -0,0 +1,159 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from models.user import User
+
+
+# Nombre maximum d'utilisateurs conservés en cache
+USER_DIRECTORY_SIZE = 1024
+# Durée de validité d'une entrée (secondes) : les écritures d'un autre
+# processus (CLI locale face au démon) sont vues après ce délai
+USER_DIRECTORY_TTL = float(os.getenv("EPIC_EVENTS_USER_CACHE_TTL", "30"))
+
+
+class UserEntry(NamedTuple):
+    """Données d'un utilisateur conservées en cache (hors session)"""
+    id: int
+    email: str
+    full_name: str
+
+
+class UserDirectory:
+    """
+    Annuaire en mémoire des utilisateurs, indexé par ID, email et nom complet
+    Éviction LRU et expiration après ttl secondes, invalidé par
+    UserRepository à chaque écriture du processus
+    """
+    def __init__(self, maxsize: int = USER_DIRECTORY_SIZE,
+                 ttl: float = USER_DIRECTORY_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # id -> (UserEntry, instant de chargement), ordre LRU
+        self._entries = OrderedDict()
+        self._by_email = {}
+        self._by_name = {}
+        self._lock = threading.RLock()
+
+    def _get(self, user_id) -> Optional[UserEntry]:
+        """Entrée en cache, None si absente ou expirée"""
+        cached = self._entries.get(user_id)
+        if cached is None:
+            return None
+        entry, loaded_at = cached
+        if time.monotonic() - loaded_at > self.ttl:
+            self._remove(user_id)
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    def _put(self, user, owns_name: bool = False) -> UserEntry:
+        """
+        Met un utilisateur en cache. owns_name : user est l'utilisateur de
+        plus petit ID portant ce nom (requête ordonnée par ID), seul cas
+        où le nom est indexé
+        """
+        entry = UserEntry(user.id, user.email, user.full_name)
+        self._remove(entry.id)
+        self._entries[entry.id] = (entry, time.monotonic())
+        self._by_email[entry.email] = entry.id
+        if owns_name:
+            self._by_name[entry.full_name] = entry.id
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+        return entry
+
+    def _remove(self, user_id):
+        cached = self._entries.pop(user_id, None)
+        if cached is None:
+            return
+        entry = cached[0]
+        if self._by_email.get(entry.email) == user_id:
+            del self._by_email[entry.email]
+        if self._by_name.get(entry.full_name) == user_id:
+            del self._by_name[entry.full_name]
+
+    def get_by_id(self, db, user_id: int) -> Optional[UserEntry]:
+        """Retourne l'utilisateur d'ID user_id (cache puis base)"""
+        with self._lock:
+            entry = self._get(user_id)
+            if entry is not None:
+                return entry
+        user = db.query(User).filter(User.id == user_id).first()
+        with self._lock:
+            return self._put(user) if user else None
+
+    def get_by_email(self, db, email: str) -> Optional[UserEntry]:
+        """Retourne l'utilisateur d'adresse email (cache puis base)"""
+        with self._lock:
+            user_id = self._by_email.get(email)
+            entry = self._get(user_id) if user_id is not None else None
+            if entry is not None:
+                return entry
+        user = db.query(User).filter(User.email == email).first()
+        with self._lock:
+            return self._put(user) if user else None
+
+    def get_by_name(self, db, full_name: str) -> Optional[UserEntry]:
+        """
+        Retourne l'utilisateur de nom complet full_name (cache puis base)
+        En cas d'homonymes, retourne celui de plus petit ID
+        """
+        with self._lock:
+            user_id = self._by_name.get(full_name)
+            entry = self._get(user_id) if user_id is not None else None
+            if entry is not None:
+                return entry
+        users = db.query(User).filter(User.full_name == full_name).order_by(
+            User.id).limit(2).all()
+        if len(users) > 1:
+            logging.warning(f"Plusieurs utilisateurs nommés {full_name}, "
+                            f"ID {users[0].id} retenu")
+        with self._lock:
+            return self._put(users[0], owns_name=True) if users else None
+
+    def resolve_names(self, db, names) -> dict:
+        """
+        Résout des noms complets en {nom: id}
+        Une seule requête pour les noms absents du cache
+        """
+        names = {name for name in names if name}
+        resolved = {}
+        with self._lock:
+            for name in names:
+                user_id = self._by_name.get(name)
+                if user_id is not None and self._get(user_id) is not None:
+                    resolved[name] = user_id
+        missing = names - resolved.keys()
+        if missing:
+            users = db.query(User).filter(User.full_name.in_(missing)
+                                          ).order_by(User.id.desc())
+            with self._lock:
+                for user in users:
+                    # Ordre décroissant : le plus petit ID l'emporte
+                    resolved[user.full_name] = self._put(
+                        user, owns_name=True).id
+        return resolved
+
+    def invalidate(self, user_id: int = None, names=()):
+        """Retire un utilisateur et/ou des noms du cache"""
+        with self._lock:
+            if user_id is not None:
+                self._remove(user_id)
+            for name in names:
+                owner = self._by_name.get(name)
+                if owner is not None:
+                    self._remove(owner)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_email.clear()
+            self._by_name.clear()
+
+
+# Annuaire partagé par les repositories du processus
+user_directory = UserDirectory()
@@ -0,0 +1,207 @@
+import functools
+import re
+from datetime import datetime
+from itertools import compress, count
+from operator import not_
+
+
+""" Validation par colonnes des fichiers d'import (mode batch) """
+
+# Motifs compilés une fois (cf. is_email_valid, is_phone_valid)
+EMAIL_PATTERN = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
+PHONE_PATTERN = re.compile(r"^(?:\+33|0)[1-9](?:[\s.-]?\d{2}){4}$")
+
+# Équivalents RE2 exacts des motifs sur les valeurs ASCII (\w, \s et $ de
+# Python), pour pyarrow.compute. Les valeurs non ASCII sont décidées par
+# les motifs compilés
+ARROW_PATTERNS = {
+    "email": r"^[A-Za-z0-9_.-]+@[A-Za-z0-9_.-]+\.[A-Za-z0-9_]+\n?$",
+    "phone": r"^(?:\+33|0)[1-9](?:[\t\n\v\f\r\x1c-\x1f .-]?[0-9]{2}){4}\n?$",
+}
+# Formes acceptées par strptime '%Y-%m-%d' (motifs %Y, %m et %d de
+# _strptime) sur les valeurs ASCII ; le calendrier est vérifié à part
+ARROW_DATE_PATTERN = (r"^(?P<year>[0-9]{4})-(?P<month>1[0-2]|0[1-9]|[1-9])"
+                      r"-(?P<day>3[01]|[12][0-9]|0[1-9]|[1-9]| [1-9])$")
+# Nombre de jours de chaque mois (index 1 à 12) hors année bissextile
+MONTH_DAYS = [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+# Raison d'un rejet par type de règle (mêmes messages que ligne à ligne)
+RULE_MESSAGES = {
+    "email": "L'email '{value}' est invalide",
+    "phone": "Le numéro '{value}' est invalide",
+    "date": "Date invalide : {value} Format attendu : YYYY-MM-DD",
+}
+
+
+def is_arrow(column) -> bool:
+    """Tableau pyarrow (Array ou ChunkedArray)"""
+    return type(column).__module__.startswith("pyarrow")
+
+
+@functools.cache
+def arrow_module():
+    """pyarrow s'il est installé (dépendance optionnelle), None sinon"""
+    try:
+        import pyarrow
+        import pyarrow.compute  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def as_column(column):
+    """
+    Colonne à valider : tableau pyarrow si pyarrow est installé (motifs
+    RE2 exécutés en C++), liste Python sinon. Accepte listes, séries
+    pandas, tableaux numpy ou pyarrow et tout itérable
+    """
+    if is_arrow(column):
+        return column
+    if not isinstance(column, list):
+        column = column.tolist() if hasattr(column, "tolist") else list(
+            column)
+    pa = arrow_module()
+    if pa is not None:
+        try:
+            return pa.array(column, type=pa.string())
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Valeurs non textuelles : validation en Python
+            pass
+    return column
+
+
+def value_at(column, index: int):
+    """Valeur d'une ligne (message d'erreur)"""
+    if is_arrow(column):
+        return column[index].as_py()
+    return column[index]
+
+
+def arrow_mask(result) -> list[bool]:
+    """Masque pyarrow -> liste de booléens (valeurs nulles invalides)"""
+    return arrow_module().compute.fill_null(result, False).to_pylist()
+
+
+def match_column(pattern, column) -> list[bool]:
+    """True pour chaque valeur texte reconnue par le motif compilé"""
+    match = pattern.match
+    return [isinstance(value, str) and match(value) is not None
+            for value in column]
+
+
+def pattern_valid(rule: str, pattern, column) -> list[bool]:
+    """
+    Masque des valeurs reconnues par le motif compilé : motif RE2 de
+    pyarrow (ARROW_PATTERNS) sur les valeurs ASCII, motif Python sur les
+    autres, pour accepter exactement les mêmes valeurs qu'en ligne à ligne
+    """
+    column = as_column(column)
+    if not is_arrow(column):
+        return match_column(pattern, column)
+    pc = arrow_module().compute
+    mask = arrow_mask(pc.match_substring_regex(column,
+                                               ARROW_PATTERNS[rule]))
+    non_ascii = arrow_mask(pc.invert(pc.string_is_ascii(column)))
+    for index in compress(count(), non_ascii):
+        mask[index] = pattern.match(column[index].as_py()) is not None
+    return mask
+
+
+def emails_valid(column) -> list[bool]:
+    """Masque des emails valides (cf. is_email_valid)"""
+    return pattern_valid("email", EMAIL_PATTERN, column)
+
+
+def phones_valid(column) -> list[bool]:
+    """Masque des numéros de téléphone valides (cf. is_phone_valid)"""
+    return pattern_valid("phone", PHONE_PATTERN, column)
+
+
+def is_date(value) -> bool:
+    """Date YYYY-MM-DD valide (mêmes règles que strptime, is_date_valid)"""
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def arrow_dates_valid(column) -> list[bool]:
+    """
+    Masque des dates valides calculé par pyarrow.compute : forme
+    (ARROW_DATE_PATTERN) puis calendrier (années bissextiles) en
+    arithmétique entière, sans conversion ligne à ligne. Les valeurs non
+    ASCII sont décidées par strptime
+    """
+    pa = arrow_module()
+    pc = pa.compute
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    # flatten : lignes non reconnues nulles (validité du struct)
+    year, month, day = (
+        pc.cast(pc.utf8_trim_whitespace(part), pa.int32())
+        for part in pc.extract_regex(column, ARROW_DATE_PATTERN).flatten())
+
+    def divisible(value, divisor):
+        return pc.equal(pc.multiply(pc.divide(value, divisor), divisor),
+                        value)
+
+    leap = pc.or_(pc.and_(divisible(year, 4),
+                          pc.invert(divisible(year, 100))),
+                  divisible(year, 400))
+    last_day = pc.add(pc.take(pa.array(MONTH_DAYS, pa.int32()), month),
+                      pc.cast(pc.and_(leap, pc.equal(month, 2)),
+                              pa.int32()))
+    mask = arrow_mask(pc.and_(pc.greater(year, 0),
+                              pc.less_equal(day, last_day)))
+    non_ascii = arrow_mask(pc.invert(pc.string_is_ascii(column)))
+    for index in compress(count(), non_ascii):
+        mask[index] = is_date(column[index].as_py())
+    return mask
+
+
+def dates_valid(column) -> list[bool]:
+    """
+    Masque des dates YYYY-MM-DD valides (cf. is_date_valid) : calcul
+    vectoriel si pyarrow est installé, sinon strptime une seule fois par
+    valeur distincte
+    """
+    column = as_column(column)
+    if is_arrow(column):
+        return arrow_dates_valid(column)
+    # Peu de dates distinctes dans un import : une vérification par valeur
+    checked = {value: is_date(value) for value in set(column)}
+    return list(map(checked.__getitem__, column))
+
+
+# Validateur de colonne par type de règle
+RULE_VALIDATORS = {
+    "email": emails_valid,
+    "phone": phones_valid,
+    "date": dates_valid,
+}
+
+
+def validate_columns(columns: dict, rules: dict):
+    """
+    Valide des colonnes entières (listes, séries pandas, tableaux pyarrow)
+    columns : {nom: colonne}, rules : {nom: "email" | "phone" | "date"}
+    Retourne (masque, erreurs) : masque[i] vaut True si la ligne i est
+    valide, erreurs liste les (i, raison) de la première règle en échec
+    """
+    columns = {name: as_column(columns[name]) for name in rules}
+    length = len(next(iter(columns.values()))) if columns else 0
+    mask = [True] * length
+    errors = []
+    for name, rule in rules.items():
+        column = columns[name]
+        message = RULE_MESSAGES[rule]
+        valid = RULE_VALIDATORS[rule](column)
+        # Parcours des seules lignes en échec (compress : boucle en C)
+        for index in compress(count(), map(not_, valid)):
+            if mask[index]:
+                mask[index] = False
+                value = value_at(column, index)
+                errors.append((index, message.format(
+                    value="" if value is None else value)))
+    return mask, errors